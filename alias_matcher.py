@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Resolves groundhelp `$Club` tokens against club names and aliases.
+
+All club names and aliases are compiled into one Aho-Corasick automaton.
+A message is scanned once; for every `$` the longest known name or alias
+that starts right after it (and ends at a word boundary) wins. The
+automaton is rebuilt lazily after clubs or aliases change.
+"""
+import threading
+from collections import deque
+
+from unidecode import unidecode
+
+from search_index import normalize_text
+
+
+def _normalize_with_positions(text):
+    """Normalizes text like normalize_text and maps every output char back to its source index."""
+    chars = []
+    positions = []
+    for index, char in enumerate(text):
+        for out in unidecode(char).casefold():
+            chars.append(out)
+            positions.append(index)
+    return ''.join(chars), positions
+
+
+class _Automaton:
+    """Aho-Corasick automaton over normalized patterns."""
+
+    def __init__(self, patterns):
+        """Args:
+            patterns: Dict normalized pattern -> value
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # (pattern length, value) of the longest pattern ending here
+        self.suffix_output = [0]  # nearest state on the fail chain with an output
+
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                nxt = self.goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                    self.suffix_output.append(0)
+                    self.goto[state][char] = nxt
+                state = nxt
+            self.output[state] = (len(pattern), value)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                failed = self.fail[nxt]
+                self.suffix_output[nxt] = failed if self.output[failed] else self.suffix_output[failed]
+
+    def iter_matches(self, text):
+        """Yields (end index, pattern length, value) for every pattern occurrence in text."""
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            match_state = state if self.output[state] else self.suffix_output[state]
+            while match_state:
+                length, value = self.output[match_state]
+                yield end, length, value
+                match_state = self.suffix_output[match_state]
+
+
+class ClubMatcher:
+    """Matches `$` tokens in a message against all club names and aliases.
+
+    Load it once with load() and register handle_event() as a
+    HopperDatabase listener.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = {}  # club_id -> normalized name
+        self._aliases = {}  # normalized alias -> club_id
+        self._automaton = None
+
+    def load(self, data):
+        """Replaces all names and aliases.
+
+        Args:
+            data: Dict from HopperDatabase.get_club_match_terms()
+        """
+        with self._lock:
+            self._names = {club_id: normalize_text(name) for club_id, name in data['names']}
+            self._aliases = {normalize_text(alias): club_id for alias, club_id in data['aliases']}
+            self._automaton = None
+
+    def handle_event(self, event, data):
+        """HopperDatabase listener: applies new club names and alias changes."""
+        with self._lock:
+            if event == 'club' and 'name' in data:
+                self._names[data['club_id']] = normalize_text(data['name'])
+            elif event == 'alias':
+                alias = normalize_text(data['alias'])
+                if data.get('club_id'):
+                    self._aliases[alias] = data['club_id']
+                else:
+                    self._aliases.pop(alias, None)
+            else:
+                return
+            self._automaton = None
+
+    def _get_automaton(self):
+        with self._lock:
+            if self._automaton is None:
+                patterns = dict(self._aliases)
+                by_name = {}
+                for club_id, name in self._names.items():
+                    by_name.setdefault(name, set()).add(club_id)
+                for name, club_ids in by_name.items():
+                    if not name:
+                        continue
+                    # A name shared by several clubs is ambiguous; leave it to the database search
+                    patterns[name] = next(iter(club_ids)) if len(club_ids) == 1 else None
+                self._automaton = _Automaton(patterns)
+            return self._automaton
+
+    def match_tokens(self, text):
+        """Resolves every `$` in text with the longest club name or alias following it.
+
+        Args:
+            text: The message content
+
+        Returns:
+            Dict {index of '$' in text: (matched original text, club_id)}
+        """
+        if '$' not in text:
+            return {}
+        normalized, positions = _normalize_with_positions(text)
+        best = {}
+        for end, length, club_id in self._get_automaton().iter_matches(normalized):
+            start = end - length + 1
+            if start == 0 or normalized[start - 1] != '$':
+                continue
+            if end + 1 < len(normalized) and normalized[end + 1].isalnum():
+                continue  # "$BVBfans" is not "$BVB"
+            dollar = positions[start - 1]
+            if dollar not in best or length > best[dollar][0]:
+                best[dollar] = (length, start, end, club_id)
+
+        results = {}
+        for dollar, (length, start, end, club_id) in best.items():
+            if club_id is None:
+                continue
+            results[dollar] = (text[positions[start]:positions[end] + 1], club_id)
+        return results
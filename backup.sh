@@ -4,7 +4,8 @@ dirname=$(date "+%a-%H")
 rm -rf backups/$dirname
 mkdir -p backups/$dirname
 for D in *.db; do
-    sqlite3 "$D" ".backup 'backups/$dirname/$D'"
+    # Wait for the bot's writer instead of failing with "database is locked"
+    sqlite3 -cmd ".timeout 10000" "$D" ".backup 'backups/$dirname/$D'"
 done
 cp .env* backups/$dirname/
 scp -i $HOME/.ssh/id_ed25519 -r backups/$dirname pi5:hopper_backup/
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Resident cache of formatted club information.
+
+Club rows are turned into compact ClubRecord objects once (with the
+discord.Color and logo URLs already resolved) and kept until a database
+change event for that club or its league arrives.
+"""
+import threading
+from dataclasses import dataclass
+
+import discord
+
+
+@dataclass(frozen=True, slots=True)
+class ClubRecord:
+    """Formatted club information, as shown in embeds and the line-up.
+
+    color falls back to the cache's default color; stored_color is the
+    club's own color, or None if none is stored.
+    """
+    club_id: int
+    name: str
+    league: str
+    country: str
+    tier: int
+    flag: str
+    club_logo: str
+    league_logo: str
+    color: discord.Color
+    stored_color: discord.Color | None
+    ticket_notes: str
+    ticket_price_range: str
+    ticket_url: str
+    no_league: bool
+    league_id: int
+    stadium_id: int
+
+
+class ClubCache:
+    """Read-through cache of ClubRecord objects keyed by club ID.
+
+    Misses are loaded from the database. Writes are not applied to the cache:
+    register handle_event() as a HopperDatabase listener, so a committed
+    change to a club or its league drops exactly the affected records and the
+    next read reloads them. Stadium details are not cached (ClubRecord only
+    keeps the stadium ID, which changes through a club event).
+
+    Args:
+        db: AsyncHopperDatabase used to load missing records
+        logo_url: Callable turning a stored logo value into a URL (or None)
+        default_color: discord.Color for clubs without a color
+    """
+
+    def __init__(self, db, logo_url, default_color):
+        self.db = db
+        self.logo_url = logo_url
+        self.default_color = default_color
+        self._records = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped on every invalidation
+
+    def _make_record(self, row):
+        color = None
+        raw = str(row[7] or '').strip().lstrip('#')
+        if raw.lower().startswith('0x'):
+            raw = raw[2:]
+        if len(raw) == 6:
+            try:
+                color = discord.Color(int(raw, 16))
+            except ValueError:
+                pass
+        return ClubRecord(
+            club_id=row[6],
+            name=row[0] or 'Unknown',
+            league=row[1] or 'Unknown',
+            country=row[2] or 'Unknown',
+            tier=row[4] or 99,
+            flag=row[5] or '',
+            club_logo=(self.logo_url(row[3]) or '') if row[3] else '',
+            league_logo=(self.logo_url(row[8]) or '') if row[8] else '',
+            color=color if color is not None else self.default_color,
+            stored_color=color,
+            ticket_notes=row[9] or '',
+            ticket_price_range=row[10] or '',
+            ticket_url=row[11] or '',
+            no_league=not row[1] or not row[2],
+            league_id=row[12],
+            stadium_id=row[13],
+        )
+
+    def _store(self, rows, generation):
+        records = {row[6]: self._make_record(row) for row in rows}
+        with self._lock:
+            # Skip the store if a change arrived while the rows were loading
+            if generation == self._generation:
+                self._records.update(records)
+        return records
+
+    def begin_load(self):
+        """Returns a token to take before club rows are read for from_rows().
+
+        A change committed after the token was taken makes from_rows() skip
+        the cache store, so rows read before the change are never cached.
+        """
+        with self._lock:
+            return self._generation
+
+    def from_rows(self, rows, token):
+        """Formats club info rows (CLUB_INFO_COLUMNS) and caches them.
+
+        Args:
+            rows: Club info rows
+            token: Value of begin_load() taken before the rows were read
+
+        Returns:
+            List of ClubRecord in the order of rows
+        """
+        records = self._store(rows, token)
+        return [records[row[6]] for row in rows]
+
+    async def get(self, club_id):
+        """Returns the ClubRecord of a club, or None if it does not exist."""
+        if not club_id:
+            return None
+        record = self._records.get(club_id)
+        if record is not None:
+            return record
+        return (await self.get_many([club_id])).get(club_id)
+
+    async def get_many(self, club_ids):
+        """Returns {club_id: ClubRecord} for the given clubs; unknown IDs are left out."""
+        records = {}
+        missing = []
+        for club_id in club_ids:
+            record = self._records.get(club_id)
+            if record is not None:
+                records[club_id] = record
+            elif club_id:
+                missing.append(club_id)
+        if missing:
+            token = self.begin_load()
+            rows = await self.db.get_club_infos(missing)
+            records.update(self._store(rows.values(), token))
+        return records
+
+    def invalidate(self, club_id=None):
+        """Drops one club, or every club when club_id is None."""
+        with self._lock:
+            self._generation += 1
+            if club_id is None:
+                self._records.clear()
+            else:
+                self._records.pop(club_id, None)
+
+    def handle_event(self, event, data):
+        """HopperDatabase listener: drops the records a committed change affects."""
+        with self._lock:
+            if event == 'club':
+                stale = [data['club_id']]
+            elif event == 'league':
+                stale = [cid for cid, r in self._records.items() if r.league_id == data['league_id']]
+            else:
+                return
+            self._generation += 1
+            for club_id in stale:
+                self._records.pop(club_id, None)
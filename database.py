@@ -1,26 +1,372 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
+import functools
+import json
+import math
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, timedelta
-from unidecode import unidecode
+from search_index import normalize_text, trigrams
+
+# Storage profile applied at startup. journal_mode is persisted in the
+# database file and set once by init_database; all other PRAGMAs are per
+# connection and applied when a pooled connection is opened.
+DEFAULT_STORAGE_PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,  # negative values are KiB, i.e. ~16 MB per connection
+    'mmap_size': 64 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,  # milliseconds
+}
+
+# Columns of a club info row, shared by every query that returns one:
+# (name, league_name, country, logo, tier, flag, id, color, league_logo,
+#  ticket_notes, ticket_price_range, ticket_url, league_id, stadium_id)
+CLUB_INFO_COLUMNS = (
+    'c.name, l.name, l.country, c.logo, l.tier, l.flag, c.id, c.color, l.logo, '
+    'c.ticket_notes, c.ticket_price_range, c.ticket_url, c.league_id, c.stadium_id'
+)
+
+# Fuzzy club search: matches within this coverage of the best one are kept
+FUZZY_SCORE_MARGIN = 0.1
+
+# Activity levels are based on distinct active days within this window
+LEVEL_WINDOW_DAYS = 14
+
+
+# (minimum active days, level), checked from the top
+LEVEL_THRESHOLDS = (
+    (5, "Ultra"),
+    (2, "Fan"),
+)
+
+
+def level_for_active_days(active_days):
+    """Maps the number of active days in the level window to a level name."""
+    for min_days, level in LEVEL_THRESHOLDS:
+        if active_days >= min_days:
+            return level
+    return "Casual"
+
+
+def _level_case_sql(column):
+    """SQL CASE expression that mirrors level_for_active_days() for a column."""
+    whens = ' '.join(f"WHEN {column} >= {min_days} THEN '{level}'" for min_days, level in LEVEL_THRESHOLDS)
+    return f"CASE {whens} ELSE 'Casual' END"
+
+
+_PRAGMA_KEYWORDS = {
+    'journal_mode': {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'},
+    'synchronous': {'OFF', 'NORMAL', 'FULL', 'EXTRA'},
+    'temp_store': {'DEFAULT', 'FILE', 'MEMORY'},
+}
+_PRAGMA_INTEGERS = {'cache_size', 'mmap_size', 'busy_timeout'}
+
+
+def _pragma_sql(name, value):
+    """Builds a PRAGMA statement for a storage profile entry.
+
+    PRAGMA values cannot be bound as parameters, so they are validated here
+    before being formatted into the statement.
+    """
+    if name in _PRAGMA_INTEGERS:
+        return f'PRAGMA {name} = {int(value)}'
+    if name in _PRAGMA_KEYWORDS:
+        keyword = str(value).strip().upper()
+        if keyword not in _PRAGMA_KEYWORDS[name]:
+            raise ValueError(f'Invalid value {value!r} for PRAGMA {name}')
+        return f'PRAGMA {name} = {keyword}'
+    raise ValueError(f'Unsupported storage profile setting: {name}')
+
+
+def _add_missing_columns(cursor, table, columns):
+    """Adds columns that an older database lacks.
+
+    Args:
+        cursor: Cursor inside the migration transaction
+        table: Table name
+        columns: List of (column name, SQL type) in the order they should be added
+    """
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {column[1] for column in cursor.fetchall()}
+    for name, sql_type in columns:
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {sql_type}')
+
+
+def _rebuild_user_levels(cursor, today):
+    """Recomputes the user_level table from activity inside the caller's transaction."""
+    window_start = (today - timedelta(days=LEVEL_WINDOW_DAYS)).isoformat()
+    cursor.execute('DELETE FROM user_level')
+    cursor.execute(f'''
+        INSERT INTO user_level (user_id, window_days, lifetime_days, level, last_active)
+        SELECT user_id, window_days, lifetime_days, {_level_case_sql('window_days')}, last_active
+        FROM (
+            SELECT user_id,
+                   SUM(date >= ?) AS window_days,
+                   COUNT(*) AS lifetime_days,
+                   MAX(date) AS last_active
+            FROM activity
+            GROUP BY user_id
+        )
+    ''', (window_start,))
+    cursor.execute('''
+        INSERT INTO bot_state (key, value) VALUES ('user_level_rolled_on', ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    ''', (today.isoformat(),))
+
+
+class ConnectionPool:
+    """Small pool of long-lived SQLite connections for the Hopper Bot.
+
+    Writes go through a single writer connection guarded by a lock, reads are
+    spread over a few reader connections. Every connection is configured once
+    when it is opened instead of on every query.
+    """
+
+    def __init__(self, database_name, readers=4, profile=None):
+        """Open the writer and reader connections.
+
+        Args:
+            database_name: Path to the SQLite database file
+            readers: Number of reader connections to keep open
+            profile: Storage profile dict (see DEFAULT_STORAGE_PROFILE)
+        """
+        self.database_name = database_name
+        self.readers = max(1, readers)
+        self.profile = dict(DEFAULT_STORAGE_PROFILE, **(profile or {}))
+        self._writer = self._connect()
+        self._writer_lock = threading.Lock()
+        self._readers = queue.Queue()
+        self._all = [self._writer]
+        for _ in range(self.readers):
+            conn = self._connect()
+            self._readers.put(conn)
+            self._all.append(conn)
+
+    def _connect(self):
+        """Opens and configures a single connection."""
+        busy_timeout = int(self.profile['busy_timeout'])
+        conn = sqlite3.connect(self.database_name, timeout=busy_timeout / 1000, check_same_thread=False)
+        for name, value in self.profile.items():
+            if name != 'journal_mode':
+                conn.execute(_pragma_sql(name, value))
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Borrows a reader connection for the duration of the block."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Locks the writer connection; commits on success, rolls back on error."""
+        with self._writer_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def close(self):
+        """Closes all pooled connections."""
+        with self._writer_lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+
+
+class ActivityBuffer:
+    """In-memory accumulator for activity hits, keyed by (user_id, date).
+
+    Hits are collected here and written to the activity table in batches by
+    HopperDatabase.flush_activity().
+    """
+
+    def __init__(self, max_entries=500):
+        """Create an empty buffer.
+
+        Args:
+            max_entries: Number of distinct (user_id, date) keys after which a flush is due
+        """
+        self.max_entries = max_entries
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hits)
+
+    def add(self, user_id, day, hits=1):
+        """Adds hits for a user and day. Returns True when the buffer is full."""
+        key = (user_id, day)
+        with self._lock:
+            self._hits[key] = self._hits.get(key, 0) + hits
+            return len(self._hits) >= self.max_entries
+
+    def drain(self):
+        """Removes and returns all buffered hits as {(user_id, date): hits}."""
+        with self._lock:
+            hits = self._hits
+            self._hits = {}
+        return hits
+
+    def restore(self, hits):
+        """Puts drained hits back, e.g. after a failed flush."""
+        with self._lock:
+            for key, count in hits.items():
+                self._hits[key] = self._hits.get(key, 0) + count
+
 
 class HopperDatabase:
     """Database handler for the Hopper Bot."""
 
-    def __init__(self, database_name):
-        """Initialize the database connection.
+    def __init__(self, database_name, readers=4, storage_profile=None, activity_buffer_size=500):
+        """Initialize the database connection pool.
 
         Args:
             database_name: Path to the SQLite database file
+            readers: Number of pooled reader connections
+            storage_profile: Optional overrides for DEFAULT_STORAGE_PROFILE
+            activity_buffer_size: Buffered (user, day) activity keys that trigger a flush
         """
         self.database_name = database_name
+        self.pool = ConnectionPool(database_name, readers=readers, profile=storage_profile)
+        self.activity_buffer = ActivityBuffer(max_entries=activity_buffer_size)
+        self._levels_lock = threading.Lock()
+        self._levels_rolled_on = None
+        self._listeners = []
         self.init_database()
 
+    def add_listener(self, callback):
+        """Registers a callback for committed changes to leagues, clubs and tags.
+
+        The callback is called as callback(event, data) on the thread that ran
+        the write, after the transaction was committed. Events:
+            'league': league_id, name, country, tier
+            'club': club_id and the changed columns (name, league_id, logo, color, ...)
+            'stadium': stadium_id of an updated stadium
+            'alias': alias, club_id (None when the alias was removed)
+            'tags': user_id, old (tags before), new (tags after)
+
+        Args:
+            callback: Callable taking (event, data)
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, event, **data):
+        for callback in self._listeners:
+            try:
+                callback(event, data)
+            except Exception as e:
+                print(f'Error in database listener for {event}: {e}')
+
+    def close(self):
+        """Flushes buffered activity and closes all pooled connections."""
+        try:
+            self.flush_activity()
+        finally:
+            self.pool.close()
+
+    def checkpoint(self, mode='PASSIVE'):
+        """Runs a WAL checkpoint so the -wal file does not grow unbounded.
+
+        Args:
+            mode: PASSIVE (never blocks readers or writers), FULL, RESTART or TRUNCATE
+
+        Returns:
+            Tuple: (busy, wal_frames, checkpointed_frames)
+        """
+        mode = str(mode).upper()
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f'Invalid checkpoint mode: {mode}')
+        with self.pool.writer() as conn:
+            result = conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+        return result
+
     def init_database(self):
-        """Creates the SQLite database and tables for user profiles and clubs."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        """Sets the journal mode and applies pending schema migrations.
 
+        An up-to-date database costs a single schema_version read at startup.
+        """
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            # Journal mode is stored in the database file, so set it once here
+            cursor.execute(_pragma_sql('journal_mode', self.pool.profile['journal_mode']))
+            journal_mode = cursor.fetchone()[0]
+
+        version = self.get_schema_version()
+        for step_version, description, step in self._migrations():
+            if step_version > version:
+                self._apply_migration(step_version, description, step)
+
+        print(f'Database initialized (journal_mode={journal_mode}, schema_version={self.get_schema_version()}).')
+
+    def get_schema_version(self):
+        """Returns the version of the newest applied schema migration (0 for a new database)."""
+        with self.pool.reader() as conn:
+            try:
+                result = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+            except sqlite3.OperationalError:
+                return 0  # schema_version does not exist yet
+        return result[0] or 0
+
+    def _migrations(self):
+        """Returns the schema migrations as (version, description, step), in order.
+
+        Each step is called with a cursor inside its own transaction. Append new
+        steps with the next version number; never change a released step.
+        Steps 1-7 also run on databases created before schema versioning, so
+        they tolerate tables, columns and indexes that already exist.
+        """
+        return [
+            (1, 'base tables', self._migrate_base_tables),
+            (2, 'bot state and line-up messages', self._migrate_bot_state),
+            (3, 'activity summary', self._migrate_user_level),
+            (4, 'normalized club names', self._migrate_club_name_norm),
+            (5, 'fuzzy club search', self._migrate_club_trigrams),
+            (6, 'club aliases', self._migrate_club_aliases),
+            (7, 'secondary indexes', self._migrate_secondary_indexes),
+            (8, 'active user level index', self._migrate_active_user_levels),
+        ]
+
+    def _apply_migration(self, version, description, step):
+        """Runs one migration step and records it, all in one transaction."""
+        started = time.monotonic()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            # DDL does not open a transaction implicitly; IMMEDIATE also keeps
+            # other processes from migrating the same file at the same time
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute('SELECT MAX(version) FROM schema_version')
+            if (cursor.fetchone()[0] or 0) >= version:
+                return
+            step(cursor)
+            cursor.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (version, description))
+        print(f'Applied schema migration {version} ({description}) in {time.monotonic() - started:.2f}s.')
+
+    @staticmethod
+    def _migrate_base_tables(cursor):
         # Table for leagues
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS leagues (
@@ -29,6 +375,7 @@ class HopperDatabase:
                 country TEXT NOT NULL,
                 logo TEXT,
                 tier INTEGER DEFAULT 99,
+                flag TEXT,
                 UNIQUE(name, country)
             )
         ''')
@@ -66,26 +413,16 @@ class HopperDatabase:
             )
         ''')
 
-        # Add color column if it doesn't exist (for existing databases)
-        cursor.execute("PRAGMA table_info(clubs)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'stadium_id' not in columns:
-            cursor.execute('ALTER TABLE clubs ADD COLUMN stadium_id INTEGER')
-        if 'color' not in columns:
-            cursor.execute('ALTER TABLE clubs ADD COLUMN color TEXT')
-        # Add ticketing columns if missing
-        if 'ticket_notes' not in columns:
-            cursor.execute('ALTER TABLE clubs ADD COLUMN ticket_notes TEXT')
-        if 'ticket_price_range' not in columns:
-            cursor.execute('ALTER TABLE clubs ADD COLUMN ticket_price_range TEXT')
-        if 'ticket_url' not in columns:
-            cursor.execute('ALTER TABLE clubs ADD COLUMN ticket_url TEXT')
-
-        # Add stadium columns if missing
-        cursor.execute("PRAGMA table_info(stadiums)")
-        stadium_columns = [column[1] for column in cursor.fetchall()]
-        if 'notes' not in stadium_columns:
-            cursor.execute('ALTER TABLE stadiums ADD COLUMN notes TEXT')
+        # Columns added after the first release (older databases lack them)
+        _add_missing_columns(cursor, 'leagues', [('flag', 'TEXT')])
+        _add_missing_columns(cursor, 'clubs', [
+            ('stadium_id', 'INTEGER'),
+            ('color', 'TEXT'),
+            ('ticket_notes', 'TEXT'),
+            ('ticket_price_range', 'TEXT'),
+            ('ticket_url', 'TEXT'),
+        ])
+        _add_missing_columns(cursor, 'stadiums', [('notes', 'TEXT')])
 
         # Table for user profiles
         cursor.execute('''
@@ -131,166 +468,521 @@ class HopperDatabase:
             )
         ''')
 
-        conn.commit()
-        conn.close()
-        print('Database initialized.')
+    @staticmethod
+    def _migrate_bot_state(cursor):
+        # Small key/value store for bot bookkeeping
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bot_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+
+        # Posted line-up messages per channel, in display order
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lineup_messages (
+                channel_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                section_key TEXT NOT NULL,
+                message_id INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (channel_id, position)
+            )
+        ''')
+
+    @staticmethod
+    def _migrate_user_level(cursor):
+        # Materialized activity summary per user, maintained by flush_activity
+        # and rolled forward once a day by roll_user_levels
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_level (
+                user_id INTEGER PRIMARY KEY,
+                window_days INTEGER NOT NULL DEFAULT 0,
+                lifetime_days INTEGER NOT NULL DEFAULT 0,
+                level TEXT NOT NULL DEFAULT 'Casual',
+                last_active DATE
+            )
+        ''')
+
+        # Backfill the summary for databases that predate it
+        cursor.execute('SELECT EXISTS(SELECT 1 FROM user_level), EXISTS(SELECT 1 FROM activity)')
+        has_levels, has_activity = cursor.fetchone()
+        if has_activity and not has_levels:
+            _rebuild_user_levels(cursor, date.today())
+
+    @staticmethod
+    def _migrate_club_name_norm(cursor):
+        # Accent-free, case-folded club name for searching (see normalize_text)
+        _add_missing_columns(cursor, 'clubs', [('name_norm', 'TEXT COLLATE NOCASE')])
+        cursor.execute('SELECT id, name FROM clubs WHERE name_norm IS NULL')
+        missing_norm = cursor.fetchall()
+        if missing_norm:
+            cursor.executemany('UPDATE clubs SET name_norm = ? WHERE id = ?',
+                               [(normalize_text(name), club_id) for club_id, name in missing_norm])
+            print(f'Backfilled normalized names for {len(missing_norm)} clubs.')
+        # Covering index: searches read (name_norm, name, id) without touching the table
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clubs_name_norm ON clubs(name_norm, name)')
+
+    def _migrate_club_trigrams(self, cursor):
+        # Trigram index for typo-tolerant club search: one row per searchable
+        # term of a club (its name; more sources can be added), plus postings
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS club_search_terms (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                club_id INTEGER NOT NULL,
+                term TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT 'name',
+                trigram_count INTEGER NOT NULL,
+                UNIQUE(club_id, source, term)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS club_trigrams (
+                trigram TEXT NOT NULL,
+                term_id INTEGER NOT NULL,
+                PRIMARY KEY (trigram, term_id)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute('''
+            SELECT c.id, c.name FROM clubs c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM club_search_terms t WHERE t.club_id = c.id AND t.source = 'name'
+            )
+        ''')
+        unindexed = cursor.fetchall()
+        for club_id, name in unindexed:
+            self._index_club_term(cursor, club_id, name)
+        if unindexed:
+            print(f'Indexed {len(unindexed)} club names for fuzzy search.')
+
+    @staticmethod
+    def _migrate_club_aliases(cursor):
+        # Nicknames, abbreviations and transliterations of clubs ("BVB")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS club_aliases (
+                alias_norm TEXT PRIMARY KEY,
+                alias TEXT NOT NULL,
+                club_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    @staticmethod
+    def _migrate_secondary_indexes(cursor):
+        # Secondary indexes for the per-guild, per-user and per-country lookups
+        # (perf/query_plans.py checks that hot queries use them)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_profiles_guild_club ON user_profiles(guild_id, club_id, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_expert_clubs_guild_club ON expert_clubs(guild_id, club_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_user ON tags(user_id, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_leagues_country_tier ON leagues(country, tier)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_club_trigrams_term ON club_trigrams(term_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_club_aliases_club ON club_aliases(club_id, alias)')
+
+    @staticmethod
+    def _migrate_active_user_levels(cursor):
+        # Partial index over the users that still have active days in the level
+        # window; the daily roll_user_levels reads only these
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_level_active ON user_level(user_id, window_days) WHERE window_days > 0')
+
+    def get_state(self, key, default=None):
+        """Returns a value from the bot_state table."""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM bot_state WHERE key = ?', (key,))
+            result = cursor.fetchone()
+        return result[0] if result else default
+
+    def set_state(self, key, value):
+        """Stores a value in the bot_state table."""
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO bot_state (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            ''', (key, value))
+
+    def get_lineup_messages(self, channel_id):
+        """Returns the posted line-up messages of a channel as a list of (section_key, message_id, content_hash)."""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT section_key, message_id, content_hash
+                FROM lineup_messages
+                WHERE channel_id = ?
+                ORDER BY position
+            ''', (channel_id,))
+            results = cursor.fetchall()
+        return results
+
+    def save_lineup_messages(self, channel_id, rows):
+        """Replaces the stored line-up messages of a channel.
+
+        Args:
+            channel_id: The line-up channel ID
+            rows: List of (section_key, message_id, content_hash) in display order
+        """
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM lineup_messages WHERE channel_id = ?', (channel_id,))
+            cursor.executemany('''
+                INSERT INTO lineup_messages (channel_id, position, section_key, message_id, content_hash)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(channel_id, position, key, message_id, content_hash)
+                  for position, (key, message_id, content_hash) in enumerate(rows)])
 
     def get_or_create_league(self, name, country, tier=99):
         """Finds a league or creates it if it doesn't exist yet."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        # Check if league already exists
-        cursor.execute('SELECT id FROM leagues WHERE name = ? AND country = ?', (name, country))
-        result = cursor.fetchone()
+            # Check if league already exists
+            cursor.execute('SELECT id FROM leagues WHERE name = ? AND country = ?', (name, country))
+            result = cursor.fetchone()
 
-        if result:
-            league_id = result[0]
-        else:
-            # Create new league
-            cursor.execute('INSERT INTO leagues (name, country, tier) VALUES (?, ?, ?)', (name, country, tier))
-            league_id = cursor.lastrowid
-            conn.commit()
+            if result:
+                league_id = result[0]
+                created = False
+            else:
+                # Create new league
+                cursor.execute('INSERT INTO leagues (name, country, tier) VALUES (?, ?, ?)', (name, country, tier))
+                league_id = cursor.lastrowid
+                created = True
 
-        conn.close()
+        if created:
+            self._notify('league', league_id=league_id, name=name, country=country, tier=tier)
         return league_id
 
     def get_or_create_club(self, name):
         """Finds a club or creates it if it doesn't exist yet."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-
-        # Check if club already exists
-        cursor.execute('SELECT id, league_id FROM clubs WHERE name = ?', (name,))
-        result = cursor.fetchone()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        if result:
-            club_id = result[0]
-            league_id = result[1]
-        else:
-            # Create new club
-            cursor.execute('INSERT INTO clubs (name) VALUES (?)', (name,))
-            club_id = cursor.lastrowid
-            league_id = None
-            conn.commit()
+            # Check if club already exists
+            cursor.execute('SELECT id, league_id FROM clubs WHERE name = ?', (name,))
+            result = cursor.fetchone()
 
-        conn.close()
+            if result:
+                club_id = result[0]
+                league_id = result[1]
+                created = False
+            else:
+                # Create new club
+                cursor.execute('INSERT INTO clubs (name, name_norm) VALUES (?, ?)', (name, normalize_text(name)))
+                club_id = cursor.lastrowid
+                self._index_club_term(cursor, club_id, name)
+                league_id = None
+                created = True
+
+        if created:
+            self._notify('club', club_id=club_id, name=name, league_id=None)
         return club_id, league_id
 
     def save_user_profile(self, guild_id, user_id, club_id):
         """Saves the user profile to the database."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_profiles
-            (user_id, guild_id, club_id)
-            VALUES (?, ?, ?)
-        ''', (user_id, guild_id, club_id))
-
-        conn.commit()
-        conn.close()
+            cursor.execute('''
+                INSERT OR REPLACE INTO user_profiles
+                (user_id, guild_id, club_id)
+                VALUES (?, ?, ?)
+            ''', (user_id, guild_id, club_id))
 
     def get_user_profile(self, guild_id, user_id):
         """Loads the user profile from the database."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT club_id, created_at FROM user_profiles
-            WHERE user_id = ? AND guild_id = ?
-        ''', (user_id, guild_id))
+            cursor.execute('''
+                SELECT club_id, created_at FROM user_profiles
+                WHERE user_id = ? AND guild_id = ?
+            ''', (user_id, guild_id))
 
-        result = cursor.fetchone()
-        conn.close()
+            result = cursor.fetchone()
         if not result:
             return None, None
         return result[0], result[1]
 
     def get_leagues_by_country(self, country):
         """Fetches all leagues from a country from the database."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT name FROM leagues WHERE country = ? ORDER BY tier', (country,))
-        results = [row[0] for row in cursor.fetchall()]
+            cursor.execute('SELECT name FROM leagues WHERE country = ? ORDER BY tier', (country,))
+            results = [row[0] for row in cursor.fetchall()]
 
-        conn.close()
         return results
 
     def get_clubs_by_country_and_league(self, country, league):
         """Fetches all clubs from a country and league from the database."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT c.name FROM clubs c
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE (l.country = ? OR l.country IS NULL)
+                  AND (l.name = ? OR l.name IS NULL)
+                ORDER BY c.name
+            ''', (country, league))
+            results = [row[0] for row in cursor.fetchall()]
 
-        cursor.execute('''
-            SELECT c.name FROM clubs c
-            LEFT JOIN leagues l ON c.league_id = l.id
-            WHERE (l.country = ? OR l.country IS NULL)
-              AND (l.name = ? OR l.name IS NULL)
-            ORDER BY c.name
-        ''', (country, league))
-        results = [row[0] for row in cursor.fetchall()]
-
-        conn.close()
         return results
 
     def get_clubs_by_country(self, country):
         """Fetches all clubs from a country from the database."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT c.name FROM clubs c
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE (l.country = ? OR l.country IS NULL)
+                ORDER BY c.name
+            ''', (country,))
+            results = [row[0] for row in cursor.fetchall()]
 
-        cursor.execute('''
-            SELECT c.name FROM clubs c
-            LEFT JOIN leagues l ON c.league_id = l.id
-            WHERE (l.country = ? OR l.country IS NULL)
-            ORDER BY c.name
-        ''', (country,))
-        results = [row[0] for row in cursor.fetchall()]
-
-        conn.close()
         return results
 
     def get_all_countries(self):
         """Fetches all countries from the database."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT DISTINCT country FROM leagues ORDER BY country')
+            results = [row[0] for row in cursor.fetchall()]
 
-        cursor.execute('SELECT DISTINCT country FROM leagues ORDER BY country')
-        results = [row[0] for row in cursor.fetchall()]
+        return results
+
+    def get_club_infos(self, club_ids):
+        """Fetches club info rows for several clubs at once.
 
-        conn.close()
+        Returns:
+            Dict {club_id: club info tuple (CLUB_INFO_COLUMNS)}
+        """
+        club_ids = list(club_ids)
+        if not club_ids:
+            return {}
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(f'''
+                SELECT {CLUB_INFO_COLUMNS}
+                FROM clubs c
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE c.id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(club_ids),))
+            results = {row[6]: row for row in cursor.fetchall()}
         return results
 
     def get_club_id_by_name(self, club_name):
         """Fetches the club ID by club name."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT id FROM clubs WHERE name = ?', (club_name,))
-        result = cursor.fetchone()
+            cursor.execute('SELECT id FROM clubs WHERE name = ?', (club_name,))
+            result = cursor.fetchone()
 
-        conn.close()
         return result[0] if result else None
 
-    def search_clubs_by_name_like(self, query, limit=50):
-        """Search clubs by name using case-insensitive LIKE. Returns list of (id, name).
+    def rename_club(self, club_id, name):
+        """Renames a club and updates its normalized search name."""
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('UPDATE clubs SET name = ?, name_norm = ? WHERE id = ?', (name, normalize_text(name), club_id))
+            self._unindex_club_terms(cursor, club_id)
+            self._index_club_term(cursor, club_id, name)
+
+        self._notify('club', club_id=club_id, name=name)
+
+    @staticmethod
+    def _index_club_term(cursor, club_id, text, source='name'):
+        """Adds a searchable term of a club to the trigram index (inside the caller's transaction)."""
+        grams = trigrams(text)
+        if not grams:
+            return
+        cursor.execute('''
+            INSERT OR IGNORE INTO club_search_terms (club_id, term, source, trigram_count)
+            VALUES (?, ?, ?, ?)
+        ''', (club_id, normalize_text(text), source, len(grams)))
+        if cursor.rowcount == 0:
+            return
+        term_id = cursor.lastrowid
+        cursor.executemany('INSERT INTO club_trigrams (trigram, term_id) VALUES (?, ?)',
+                           [(gram, term_id) for gram in grams])
+
+    @staticmethod
+    def _unindex_club_terms(cursor, club_id, source='name', text=None):
+        """Removes terms of a club from the trigram index; all terms of `source` unless `text` is given."""
+        if text is None:
+            cursor.execute('SELECT id FROM club_search_terms WHERE club_id = ? AND source = ?', (club_id, source))
+        else:
+            cursor.execute('SELECT id FROM club_search_terms WHERE club_id = ? AND source = ? AND term = ?',
+                           (club_id, source, normalize_text(text)))
+        term_ids = [(row[0],) for row in cursor.fetchall()]
+        cursor.executemany('DELETE FROM club_trigrams WHERE term_id = ?', term_ids)
+        cursor.executemany('DELETE FROM club_search_terms WHERE id = ?', term_ids)
+
+    def add_club_alias(self, club_id, alias):
+        """Adds an alias for a club.
 
         Args:
-            query: substring to search for
-            limit: maximum number of results to return
+            club_id: The club ID
+            alias: Nickname, abbreviation or transliteration
+
+        Returns:
+            Tuple (ok, reason): reason is 'empty', 'is_club_name' or the club ID
+            that already uses the alias when ok is False
+        """
+        alias = alias.strip()
+        alias_norm = normalize_text(alias)
+        if not alias_norm:
+            return False, 'empty'
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT club_id FROM club_aliases WHERE alias_norm = ?', (alias_norm,))
+            result = cursor.fetchone()
+            if result:
+                return False, result[0]
+            cursor.execute('SELECT id FROM clubs WHERE name_norm = ?', (alias_norm,))
+            if cursor.fetchone():
+                return False, 'is_club_name'
+
+            cursor.execute('INSERT INTO club_aliases (alias_norm, alias, club_id) VALUES (?, ?, ?)',
+                           (alias_norm, alias, club_id))
+            self._index_club_term(cursor, club_id, alias, source='alias')
+
+        self._notify('alias', alias=alias, club_id=club_id)
+        return True, None
+
+    def remove_club_alias(self, alias):
+        """Removes an alias. Returns the club ID it pointed to, or None if it did not exist."""
+        alias_norm = normalize_text(alias.strip())
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT club_id FROM club_aliases WHERE alias_norm = ?', (alias_norm,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+            cursor.execute('DELETE FROM club_aliases WHERE alias_norm = ?', (alias_norm,))
+            self._unindex_club_terms(cursor, result[0], source='alias', text=alias)
+
+        self._notify('alias', alias=alias, club_id=None)
+        return result[0]
+
+    def get_club_aliases(self, club_id=None):
+        """Returns (alias, club_id) pairs, for one club or all clubs."""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            if club_id is None:
+                cursor.execute('SELECT alias, club_id FROM club_aliases ORDER BY alias')
+            else:
+                cursor.execute('SELECT alias, club_id FROM club_aliases WHERE club_id = ? ORDER BY alias', (club_id,))
+            results = cursor.fetchall()
+        return results
+
+    def get_club_match_terms(self):
+        """Loads all club names and aliases for the groundhelp token matcher.
+
+        Returns:
+            Dict with names [(club_id, name)] and aliases [(alias, club_id)]
         """
-        conn = sqlite3.connect(self.database_name)
-        conn.create_function("unidecode", 1, unidecode)
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT id, name FROM clubs')
+            names = cursor.fetchall()
+            cursor.execute('SELECT alias, club_id FROM club_aliases')
+            aliases = cursor.fetchall()
+
+        return {'names': names, 'aliases': aliases}
+
+    def search_clubs_fuzzy(self, query, limit=10, min_coverage=0.5, country=None, league=None):
+        """Typo-tolerant club search over the trigram index, best match first.
 
-        cursor = conn.cursor()
+        Clubs are ranked by the share of the query's trigrams found in one of
+        their terms (coverage), then by the Dice similarity of query and term,
+        so "Armina" finds "Arminia Bielefeld".
 
-        pattern = f"%{query}%"
-        cursor.execute('SELECT id, name FROM clubs WHERE unidecode(LOWER(name)) LIKE unidecode(LOWER(?)) LIMIT ?', (pattern, limit))
-        results = cursor.fetchall()
-        conn.close()
+        Args:
+            query: Search text as typed by the user
+            limit: Maximum number of results
+            min_coverage: Minimum share (0..1) of query trigrams a match must contain
+            country: Only clubs of this country (or without league)
+            league: Only clubs of this league (or without league)
+
+        Returns:
+            List of (club_id, name, coverage), best match first
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT c.id, c.name,
+                       MAX(m.shared * 1.0 / ?) AS coverage,
+                       MAX(2.0 * m.shared / (? + t.trigram_count)) AS similarity
+                FROM (
+                    SELECT term_id, COUNT(*) AS shared
+                    FROM club_trigrams
+                    WHERE trigram IN (SELECT value FROM json_each(?))
+                    GROUP BY term_id
+                ) m
+                JOIN club_search_terms t ON t.id = m.term_id
+                JOIN clubs c ON c.id = t.club_id
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE m.shared >= ?
+                  AND (? IS NULL OR l.country = ? OR l.country IS NULL)
+                  AND (? IS NULL OR l.name = ? OR l.name IS NULL)
+                GROUP BY c.id
+                ORDER BY coverage DESC, similarity DESC, c.name
+                LIMIT ?
+            ''', (len(grams), len(grams), json.dumps(sorted(grams)),
+                  max(1, math.ceil(len(grams) * min_coverage)),
+                  country, country, league, league, limit))
+            results = [(club_id, name, coverage) for club_id, name, coverage, _ in cursor.fetchall()]
         return results
 
+    def search_clubs_by_name_like(self, query, limit=50):
+        """Search clubs by name, ignoring case and accents. Returns list of (id, name).
+
+        Matches on the stored name_norm column; names starting with the query come first.
+        Without a substring match, falls back to search_clubs_fuzzy and keeps only
+        the matches that score close to the best one.
+
+        Args:
+            query: substring to search for
+            limit: maximum number of results to return
+        """
+        # name_norm is plain ASCII, so the built-in LIKE is accent- and case-insensitive here
+        needle = normalize_text(query).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT id, name FROM clubs
+                WHERE name_norm LIKE ? ESCAPE '\\'
+                ORDER BY name_norm NOT LIKE ? ESCAPE '\\', name_norm
+                LIMIT ?
+            ''', (f'%{needle}%', f'{needle}%', limit))
+            results = cursor.fetchall()
+        if results:
+            return results
+
+        fuzzy = self.search_clubs_fuzzy(query, limit=limit)
+        if not fuzzy:
+            return []
+        best = fuzzy[0][2]
+        return [(club_id, name) for club_id, name, score in fuzzy if score >= best - FUZZY_SCORE_MARGIN]
+
     def get_club_info(self, club_id):
         """Fetches club information including league and country.
 
@@ -298,66 +990,64 @@ class HopperDatabase:
             club_id: The club ID to fetch
 
         Returns:
-            Tuple: (name, league_name, country, logo, tier, flag, id, color, league_logo, ticket_notes, ticket_price_range, ticket_url) or None
+            Tuple: (name, league_name, country, logo, tier, flag, id, color, league_logo, ticket_notes, ticket_price_range, ticket_url, league_id, stadium_id) or None
         """
         if not club_id:
             return None
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT c.name, l.name, l.country, c.logo, l.tier, l.flag, c.id, c.color, l.logo, c.ticket_notes, c.ticket_price_range, c.ticket_url
-            FROM clubs c
-            LEFT JOIN leagues l ON c.league_id = l.id
-            WHERE c.id = ?
-        ''', (club_id,))
-
-        result = cursor.fetchone()
-        conn.close()
+            cursor.execute(f'''
+                SELECT {CLUB_INFO_COLUMNS}
+                FROM clubs c
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE c.id = ?
+            ''', (club_id,))
+
+            result = cursor.fetchone()
         return result
 
     def get_members_by_club_id(self, guild_id, club_id):
         """Fetches all members of a specific club in a guild."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT user_id
-            FROM user_profiles
-            WHERE guild_id = ? AND club_id = ?
-            ORDER BY created_at
-        ''', (guild_id, club_id))
-
-        results = cursor.fetchall()
-        conn.close()
+            cursor.execute('''
+                SELECT user_id
+                FROM user_profiles
+                WHERE guild_id = ? AND club_id = ?
+                ORDER BY created_at
+            ''', (guild_id, club_id))
+
+            results = cursor.fetchall()
         return results
 
     def update_club_league(self, club_id, league_id):
         """Updates the league_id of a club."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('UPDATE clubs SET league_id = ? WHERE id = ?', (league_id, club_id))
 
-        cursor.execute('UPDATE clubs SET league_id = ? WHERE id = ?', (league_id, club_id))
-        conn.commit()
-        conn.close()
+        self._notify('club', club_id=club_id, league_id=league_id)
 
     def update_club_logo(self, club_id, logo_url):
         """Updates the logo URL of a club."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('UPDATE clubs SET logo = ? WHERE id = ?', (logo_url, club_id))
 
-        cursor.execute('UPDATE clubs SET logo = ? WHERE id = ?', (logo_url, club_id))
-        conn.commit()
-        conn.close()
+        self._notify('club', club_id=club_id, logo=logo_url)
 
     def update_club_color(self, club_id, color):
         """Updates the color of a club."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('UPDATE clubs SET color = ? WHERE id = ?', (color, club_id))
-        conn.commit()
-        conn.close()
+            cursor.execute('UPDATE clubs SET color = ? WHERE id = ?', (color, club_id))
+
+        self._notify('club', club_id=club_id, color=color)
 
     def update_club_ticket_info(self, club_id, ticket_notes, ticket_price_range, ticket_url):
         """Updates ticketing information for a club.
@@ -368,15 +1058,16 @@ class HopperDatabase:
             ticket_price_range: Ticket price range text
             ticket_url: URL to the official ticketing website
         """
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(
-            'UPDATE clubs SET ticket_notes = ?, ticket_price_range = ?, ticket_url = ? WHERE id = ?',
-            (ticket_notes, ticket_price_range, ticket_url, club_id)
-        )
-        conn.commit()
-        conn.close()
+            cursor.execute(
+                'UPDATE clubs SET ticket_notes = ?, ticket_price_range = ?, ticket_url = ? WHERE id = ?',
+                (ticket_notes, ticket_price_range, ticket_url, club_id)
+            )
+
+        self._notify('club', club_id=club_id, ticket_notes=ticket_notes,
+                     ticket_price_range=ticket_price_range, ticket_url=ticket_url)
 
     def get_or_create_stadium(self, name):
         """Finds a stadium by name or creates it if it doesn't exist yet."""
@@ -387,44 +1078,41 @@ class HopperDatabase:
         if not stadium_name:
             return None
 
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT id FROM stadiums WHERE name = ?', (stadium_name,))
-        result = cursor.fetchone()
-        if result:
-            stadium_id = result[0]
-        else:
-            cursor.execute('INSERT INTO stadiums (name) VALUES (?)', (stadium_name,))
-            stadium_id = cursor.lastrowid
-            conn.commit()
+            cursor.execute('SELECT id FROM stadiums WHERE name = ?', (stadium_name,))
+            result = cursor.fetchone()
+            if result:
+                stadium_id = result[0]
+            else:
+                cursor.execute('INSERT INTO stadiums (name) VALUES (?)', (stadium_name,))
+                stadium_id = cursor.lastrowid
 
-        conn.close()
         return stadium_id
 
     def link_club_to_stadium(self, club_id, stadium_id):
         """Links a club to a stadium ID."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('UPDATE clubs SET stadium_id = ? WHERE id = ?', (stadium_id, club_id))
 
-        cursor.execute('UPDATE clubs SET stadium_id = ? WHERE id = ?', (stadium_id, club_id))
-        conn.commit()
-        conn.close()
+        self._notify('club', club_id=club_id, stadium_id=stadium_id)
 
     def get_stadium_info(self, stadium_id):
         """Returns stadium tuple for a given stadium ID."""
         if not stadium_id:
             return None
 
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, name, image_url, capacity, built_year, plan_image_url, block_description, how_to_get_there, notes
-            FROM stadiums
-            WHERE id = ?
-        ''', (stadium_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, name, image_url, capacity, built_year, plan_image_url, block_description, how_to_get_there, notes
+                FROM stadiums
+                WHERE id = ?
+            ''', (stadium_id,))
+            result = cursor.fetchone()
         return result
 
     def get_stadium_info_for_club(self, club_id):
@@ -432,16 +1120,15 @@ class HopperDatabase:
         if not club_id:
             return None
 
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT s.id, s.name, s.image_url, s.capacity, s.built_year, s.plan_image_url, s.block_description, s.how_to_get_there, s.notes
-            FROM clubs c
-            LEFT JOIN stadiums s ON c.stadium_id = s.id
-            WHERE c.id = ?
-        ''', (club_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.id, s.name, s.image_url, s.capacity, s.built_year, s.plan_image_url, s.block_description, s.how_to_get_there, s.notes
+                FROM clubs c
+                LEFT JOIN stadiums s ON c.stadium_id = s.id
+                WHERE c.id = ?
+            ''', (club_id,))
+            result = cursor.fetchone()
 
         if not result or result[0] is None:
             return None
@@ -473,84 +1160,83 @@ class HopperDatabase:
                 'not_found': True,
             }
 
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT name, image_url, capacity, built_year, plan_image_url, block_description, how_to_get_there, notes
-            FROM stadiums
-            WHERE id = ?
-        ''', (stadium_id,))
-        current = cursor.fetchone()
-        if not current:
-            conn.close()
-            return {
-                'updated_fields': [],
-                'overwritten_fields': [],
-                'unchanged_fields': [],
-                'skipped_empty_fields': [],
-                'not_found': True,
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT name, image_url, capacity, built_year, plan_image_url, block_description, how_to_get_there, notes
+                FROM stadiums
+                WHERE id = ?
+            ''', (stadium_id,))
+            current = cursor.fetchone()
+            if not current:
+                return {
+                    'updated_fields': [],
+                    'overwritten_fields': [],
+                    'unchanged_fields': [],
+                    'skipped_empty_fields': [],
+                    'not_found': True,
+                }
+
+            current_map = {
+                'name': current[0],
+                'image_url': current[1],
+                'capacity': current[2],
+                'built_year': current[3],
+                'plan_image_url': current[4],
+                'block_description': current[5],
+                'how_to_get_there': current[6],
+                'notes': current[7],
             }
 
-        current_map = {
-            'name': current[0],
-            'image_url': current[1],
-            'capacity': current[2],
-            'built_year': current[3],
-            'plan_image_url': current[4],
-            'block_description': current[5],
-            'how_to_get_there': current[6],
-            'notes': current[7],
-        }
-
-        incoming_map = {
-            'name': name,
-            'image_url': image_url,
-            'capacity': capacity,
-            'built_year': built_year,
-            'plan_image_url': plan_image_url,
-            'block_description': block_description,
-            'how_to_get_there': how_to_get_there,
-            'notes': notes,
-        }
+            incoming_map = {
+                'name': name,
+                'image_url': image_url,
+                'capacity': capacity,
+                'built_year': built_year,
+                'plan_image_url': plan_image_url,
+                'block_description': block_description,
+                'how_to_get_there': how_to_get_there,
+                'notes': notes,
+            }
 
-        set_clauses = []
-        values = []
-        updated_fields = []
-        overwritten_fields = []
-        unchanged_fields = []
-        skipped_empty_fields = []
-
-        for field, raw_value in incoming_map.items():
-            if isinstance(raw_value, str):
-                value = raw_value.strip()
-                if value == '':
-                    skipped_empty_fields.append(field)
-                    continue
-            else:
-                value = raw_value
-                if value is None:
-                    skipped_empty_fields.append(field)
+            set_clauses = []
+            values = []
+            updated_fields = []
+            overwritten_fields = []
+            unchanged_fields = []
+            skipped_empty_fields = []
+
+            for field, raw_value in incoming_map.items():
+                if isinstance(raw_value, str):
+                    value = raw_value.strip()
+                    if value == '':
+                        skipped_empty_fields.append(field)
+                        continue
+                else:
+                    value = raw_value
+                    if value is None:
+                        skipped_empty_fields.append(field)
+                        continue
+
+                current_value = current_map.get(field)
+                if value == current_value:
+                    unchanged_fields.append(field)
                     continue
 
-            current_value = current_map.get(field)
-            if value == current_value:
-                unchanged_fields.append(field)
-                continue
+                set_clauses.append(f'{field} = ?')
+                values.append(value)
+                updated_fields.append(field)
 
-            set_clauses.append(f'{field} = ?')
-            values.append(value)
-            updated_fields.append(field)
+                if current_value not in (None, ''):
+                    overwritten_fields.append(field)
 
-            if current_value not in (None, ''):
-                overwritten_fields.append(field)
+            if set_clauses:
+                values.append(stadium_id)
+                cursor.execute(f"UPDATE stadiums SET {', '.join(set_clauses)} WHERE id = ?", tuple(values))
 
-        if set_clauses:
-            values.append(stadium_id)
-            cursor.execute(f"UPDATE stadiums SET {', '.join(set_clauses)} WHERE id = ?", tuple(values))
-            conn.commit()
-
-        conn.close()
+        if updated_fields:
+            self._notify('stadium', stadium_id=stadium_id)
         return {
             'updated_fields': updated_fields,
             'overwritten_fields': overwritten_fields,
@@ -561,137 +1247,390 @@ class HopperDatabase:
 
     def update_league_tier(self, league_id, tier):
         """Updates the tier of a league."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('UPDATE leagues SET tier = ? WHERE id = ?', (tier, league_id))
+            cursor.execute('SELECT name, country FROM leagues WHERE id = ?', (league_id,))
+            result = cursor.fetchone()
 
-        cursor.execute('UPDATE leagues SET tier = ? WHERE id = ?', (tier, league_id))
-        conn.commit()
-        conn.close()
+        if result:
+            self._notify('league', league_id=league_id, name=result[0], country=result[1], tier=tier)
 
     def get_user_tags(self, user_id):
         """Fetches all tags for a user."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT tag FROM tags WHERE user_id = ? ORDER BY created_at', (user_id,))
-        results = [row[0] for row in cursor.fetchall()]
+            cursor.execute('SELECT tag FROM tags WHERE user_id = ? ORDER BY created_at', (user_id,))
+            results = [row[0] for row in cursor.fetchall()]
 
-        conn.close()
         return results
 
     def save_user_tags(self, user_id, tags):
         """Saves tags for a user. Replaces existing tags."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT tag FROM tags WHERE user_id = ?', (user_id,))
+            old_tags = [row[0] for row in cursor.fetchall()]
 
-        # Delete existing tags
-        cursor.execute('DELETE FROM tags WHERE user_id = ?', (user_id,))
+            # Delete existing tags
+            cursor.execute('DELETE FROM tags WHERE user_id = ?', (user_id,))
 
-        # Insert new tags
-        for tag in tags:
-            if tag.strip():  # Only save non-empty tags
-                cursor.execute('INSERT INTO tags (user_id, tag) VALUES (?, ?)', (user_id, tag.strip()))
+            # Insert new tags
+            new_tags = []
+            for tag in tags:
+                if tag.strip():  # Only save non-empty tags
+                    cursor.execute('INSERT INTO tags (user_id, tag) VALUES (?, ?)', (user_id, tag.strip()))
+                    new_tags.append(tag.strip())
 
-        conn.commit()
-        conn.close()
+        self._notify('tags', user_id=user_id, old=old_tags, new=new_tags)
 
     def add_user_tags(self, user_id, tags):
         """Adds tags to a user's existing tags."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        # Get existing tags to avoid duplicates
-        cursor.execute('SELECT tag FROM tags WHERE user_id = ?', (user_id,))
-        existing_tags = set(row[0] for row in cursor.fetchall())
+            # Get existing tags to avoid duplicates
+            cursor.execute('SELECT tag FROM tags WHERE user_id = ?', (user_id,))
+            existing_tags = set(row[0] for row in cursor.fetchall())
 
-        # Insert new tags if they don't exist
-        for tag in tags:
-            if tag.strip() and tag.strip() not in existing_tags:
-                cursor.execute('INSERT INTO tags (user_id, tag) VALUES (?, ?)', (user_id, tag.strip()))
+            # Insert new tags if they don't exist
+            new_tags = set(existing_tags)
+            for tag in tags:
+                if tag.strip() and tag.strip() not in new_tags:
+                    cursor.execute('INSERT INTO tags (user_id, tag) VALUES (?, ?)', (user_id, tag.strip()))
+                    new_tags.add(tag.strip())
 
-        conn.commit()
-        conn.close()
+        self._notify('tags', user_id=user_id, old=list(existing_tags), new=list(new_tags))
+
+    def get_search_index_data(self):
+        """Loads the data for the autocomplete index in one read transaction.
+
+        Returns:
+            Dict with leagues (id, name, country, tier), clubs (id, name, league_id)
+            and tags (tag, number of users)
+        """
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT id, name, country, tier FROM leagues')
+            leagues = cursor.fetchall()
+            cursor.execute('SELECT id, name, league_id FROM clubs')
+            clubs = cursor.fetchall()
+            cursor.execute('SELECT tag, COUNT(*) FROM tags GROUP BY tag')
+            tags = cursor.fetchall()
+
+        return {'leagues': leagues, 'clubs': clubs, 'tags': tags}
 
     def get_all_tags(self):
         """Fetches all unique tags from all users."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT DISTINCT tag FROM tags ORDER BY tag')
-        results = [row[0] for row in cursor.fetchall()]
+            cursor.execute('SELECT DISTINCT tag FROM tags ORDER BY tag')
+            results = [row[0] for row in cursor.fetchall()]
 
-        conn.close()
         return results
 
     def increment_activity(self, user_id):
-        """Increments the activity counter for a user for today."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        """Increments the activity counter for a user for today.
 
+        The hit is buffered in memory; it reaches the activity table with the
+        next flush_activity() (periodic, on shutdown or when the buffer is full).
+        """
+        if self.activity_buffer.add(user_id, date.today().isoformat()):
+            self.flush_activity()
+
+    def flush_activity(self):
+        """Writes all buffered activity hits in one transaction. Returns the number of rows written."""
+        hits = self.activity_buffer.drain()
+        if not hits:
+            return 0
+
+        window_start = (date.today() - timedelta(days=LEVEL_WINDOW_DAYS)).isoformat()
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+
+                for (user_id, day), count in hits.items():
+                    # Insert a new day, or increment the existing record
+                    cursor.execute('''
+                        INSERT INTO activity (user_id, date, hits)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(user_id, date) DO NOTHING
+                    ''', (user_id, day, count))
+                    if cursor.rowcount == 0:
+                        cursor.execute(
+                            'UPDATE activity SET hits = hits + ? WHERE user_id = ? AND date = ?',
+                            (count, user_id, day)
+                        )
+                        continue
+
+                    # First hit on this day: move the user's summary forward by one day
+                    in_window = 1 if day >= window_start else 0
+                    cursor.execute(f'''
+                        INSERT INTO user_level (user_id, window_days, lifetime_days, level, last_active)
+                        VALUES (?, ?, 1, ?, ?)
+                        ON CONFLICT(user_id) DO UPDATE SET
+                            window_days = window_days + excluded.window_days,
+                            lifetime_days = lifetime_days + 1,
+                            level = {_level_case_sql('window_days + excluded.window_days')},
+                            last_active = MAX(COALESCE(last_active, ''), excluded.last_active)
+                    ''', (user_id, in_window, level_for_active_days(in_window), day))
+        except Exception:
+            # Keep the hits for the next attempt
+            self.activity_buffer.restore(hits)
+            raise
+        return len(hits)
+
+    def rebuild_user_levels(self):
+        """Recomputes the whole user_level summary from the activity table."""
+        self.flush_activity()
         today = date.today()
+        with self._levels_lock:
+            with self.pool.writer() as conn:
+                _rebuild_user_levels(conn.cursor(), today)
+            self._levels_rolled_on = today.isoformat()
 
-        # Try to increment existing record, or insert new one
-        cursor.execute('''
-            INSERT INTO activity (user_id, date, hits)
-            VALUES (?, ?, 1)
-            ON CONFLICT(user_id, date)
-            DO UPDATE SET hits = hits + 1
-        ''', (user_id, today))
+    def roll_user_levels(self, force=False):
+        """Moves the level window forward to today.
 
-        conn.commit()
-        conn.close()
+        Only users that still have active days in the window can change, so
+        only their window counts are recomputed. Runs at most once per day
+        unless `force` is set.
+        """
+        today = date.today().isoformat()
+        if not force and self._levels_rolled_on == today:
+            return False
+
+        with self._levels_lock:
+            if self._levels_rolled_on is None:
+                self._levels_rolled_on = self.get_state('user_level_rolled_on')
+            if not force and self._levels_rolled_on == today:
+                return False
+
+            window_start = (date.today() - timedelta(days=LEVEL_WINDOW_DAYS)).isoformat()
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                # Reads the idx_user_level_active partial index, then rewrites only the rows that changed
+                cursor.execute('''
+                    SELECT u.user_id, u.window_days, (
+                        SELECT COUNT(*) FROM activity a
+                        WHERE a.user_id = u.user_id AND a.date >= ?
+                    )
+                    FROM user_level u
+                    WHERE u.window_days > 0
+                ''', (window_start,))
+                changed = [(days, level_for_active_days(days), user_id)
+                           for user_id, old_days, days in cursor.fetchall() if days != old_days]
+                cursor.executemany(
+                    'UPDATE user_level SET window_days = ?, level = ? WHERE user_id = ?', changed)
+                cursor.execute('''
+                    INSERT INTO bot_state (key, value) VALUES ('user_level_rolled_on', ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                ''', (today,))
+            self._levels_rolled_on = today
+        return True
+
+    def refresh_levels(self):
+        """Brings the user_level summary up to date: writes buffered hits and rolls the window to today.
+
+        This writes; the level reads below do not call it and return the state
+        of the last refresh (the bot runs it with every activity flush).
+        """
+        self.flush_activity()
+        self.roll_user_levels()
 
     def get_user_level(self, user_id):
-        """Calculates user level based on activity in the last 2 weeks."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        """Returns the user level based on activity in the last 2 weeks (as of the last refresh_levels())."""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT level FROM user_level WHERE user_id = ?', (user_id,))
+            result = cursor.fetchone()
 
-        today = date.today()
-        two_weeks_ago = today - timedelta(days=14)
+        return result[0] if result else "Casual"
 
-        # Count distinct days with activity in the last 2 weeks
-        cursor.execute('''
-            SELECT COUNT(DISTINCT date)
-            FROM activity
-            WHERE user_id = ? AND date >= ?
-        ''', (user_id, two_weeks_ago))
+    def get_user_levels(self, user_ids=None):
+        """Returns levels for many users with one lookup.
 
-        result = cursor.fetchone()
-        conn.close()
+        Args:
+            user_ids: Iterable of user IDs, or None for every user with activity
 
-        active_days = result[0] if result else 0
+        Returns:
+            Dict: {user_id: level}. Requested users without activity are "Casual".
+        """
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            if not user_ids:
+                return {}
 
-        # Determine level based on active days
-        if active_days >= 5:
-            return "Ultra"
-        elif active_days >= 2:
-            return "Fan"
-        else:
-            return "Casual"
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            if user_ids is None:
+                cursor.execute('SELECT user_id, level FROM user_level')
+            else:
+                # Pass the ID list as one JSON parameter to avoid SQLite's variable limit
+                cursor.execute('''
+                    SELECT user_id, level
+                    FROM user_level
+                    WHERE user_id IN (SELECT value FROM json_each(?))
+                ''', (json.dumps(user_ids),))
+            levels = dict(cursor.fetchall())
+
+        if user_ids is None:
+            return levels
+        return {user_id: levels.get(user_id, "Casual") for user_id in user_ids}
 
     def get_club_ids_sorted_by_country_and_tier(self):
         """Returns a list of club IDs sorted by country and league tier."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT c.id FROM clubs AS c
-            LEFT JOIN leagues AS l
-            ON c.league_id = l.id
-            WHERE l.country IS NOT NULL
-            ORDER BY l.country, l.tier
-        ''')
-        results = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT c.id FROM clubs AS c
+                LEFT JOIN leagues AS l
+                ON c.league_id = l.id
+                WHERE l.country IS NOT NULL
+                ORDER BY l.country, l.tier
+            ''')
+            results = [row[0] for row in cursor.fetchall()]
         return results
 
+    def get_lineup_snapshot(self, guild_id):
+        """Loads everything the line-up of a guild needs in one read transaction.
+
+        Args:
+            guild_id: The guild ID
+
+        Returns:
+            Dict with:
+                clubs: List of club info tuples (CLUB_INFO_COLUMNS) for clubs
+                    with members or experts, in display order (country, tier, league,
+                    club ID; clubs without league last)
+                profiles: List of (user_id, club_id) home club assignments
+                experts: List of (user_id, club_id) expert assignments
+                levels: Dict {user_id: level} for users with activity
+        """
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            # All reads below see the same database state
+            cursor.execute('BEGIN')
+
+            cursor.execute('''
+                SELECT user_id, club_id FROM user_profiles
+                WHERE guild_id = ? AND club_id IS NOT NULL
+            ''', (guild_id,))
+            profiles = cursor.fetchall()
+
+            cursor.execute('SELECT user_id, club_id FROM expert_clubs WHERE guild_id = ?', (guild_id,))
+            experts = cursor.fetchall()
+
+            cursor.execute(f'''
+                SELECT {CLUB_INFO_COLUMNS}
+                FROM clubs c
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE c.id IN (
+                    SELECT club_id FROM user_profiles WHERE guild_id = ?
+                    UNION
+                    SELECT club_id FROM expert_clubs WHERE guild_id = ?
+                )
+                ORDER BY l.name IS NULL OR l.country IS NULL, l.country, l.tier, l.name, c.id
+            ''', (guild_id, guild_id))
+            clubs = cursor.fetchall()
+
+            cursor.execute('''
+                SELECT user_id, level FROM user_level
+                WHERE user_id IN (
+                    SELECT user_id FROM user_profiles WHERE guild_id = ?
+                    UNION
+                    SELECT user_id FROM expert_clubs WHERE guild_id = ?
+                )
+            ''', (guild_id, guild_id))
+            levels = dict(cursor.fetchall())
+
+        return {
+            'clubs': clubs,
+            'profiles': profiles,
+            'experts': experts,
+            'levels': levels,
+        }
+
+    def get_groundhelp_data(self, guild_id, club_ids):
+        """Loads club info, members, experts and levels for several clubs in one read transaction.
+
+        Args:
+            guild_id: The guild ID
+            club_ids: Club IDs referenced by a groundhelp message
+
+        Returns:
+            Dict with:
+                clubs: {club_id: club info tuple (CLUB_INFO_COLUMNS)}
+                members: {club_id: [user_id, ...]} ordered by profile creation
+                experts: {club_id: [user_id, ...]}
+                levels: {user_id: level} for all members and experts
+        """
+        club_ids = list(dict.fromkeys(club_ids))
+        data = {
+            'clubs': {},
+            'members': {club_id: [] for club_id in club_ids},
+            'experts': {club_id: [] for club_id in club_ids},
+            'levels': {},
+        }
+        if not club_ids:
+            return data
+        ids_param = json.dumps(club_ids)
+
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+
+            cursor.execute(f'''
+                SELECT {CLUB_INFO_COLUMNS}
+                FROM clubs c
+                LEFT JOIN leagues l ON c.league_id = l.id
+                WHERE c.id IN (SELECT value FROM json_each(?))
+            ''', (ids_param,))
+            for row in cursor.fetchall():
+                data['clubs'][row[6]] = row
+
+            cursor.execute('''
+                SELECT club_id, user_id
+                FROM user_profiles
+                WHERE guild_id = ? AND club_id IN (SELECT value FROM json_each(?))
+                ORDER BY created_at
+            ''', (guild_id, ids_param))
+            for club_id, user_id in cursor.fetchall():
+                data['members'][club_id].append(user_id)
+
+            cursor.execute('''
+                SELECT club_id, user_id
+                FROM expert_clubs
+                WHERE guild_id = ? AND club_id IN (SELECT value FROM json_each(?))
+            ''', (guild_id, ids_param))
+            for club_id, user_id in cursor.fetchall():
+                data['experts'][club_id].append(user_id)
+
+            user_ids = {user_id for users in data['members'].values() for user_id in users}
+            user_ids.update(user_id for users in data['experts'].values() for user_id in users)
+            cursor.execute('''
+                SELECT user_id, level
+                FROM user_level
+                WHERE user_id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(sorted(user_ids)),))
+            levels = dict(cursor.fetchall())
+
+        data['levels'] = {user_id: levels.get(user_id, "Casual") for user_id in user_ids}
+        return data
+
     def get_user_activity_days(self, user_id):
-        """Returns the total number of distinct active days for a user."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(DISTINCT date) FROM activity WHERE user_id = ?', (user_id,))
-        active_days = cursor.fetchone()[0]
-        conn.close()
-        return active_days
+        """Returns the total number of distinct active days for a user (as of the last refresh_levels())."""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT lifetime_days FROM user_level WHERE user_id = ?', (user_id,))
+            result = cursor.fetchone()
+        return result[0] if result else 0
 
     def add_expert_club(self, guild_id, user_id, club_id):
         """Adds an expert club for a user. Returns (True, None) on success, (False, reason) on failure."""
@@ -700,69 +1639,137 @@ class HopperDatabase:
         if home_club == club_id:
             return False, 'home_club'
 
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-
-        # Check if already exists
-        cursor.execute('SELECT 1 FROM expert_clubs WHERE guild_id = ? AND user_id = ? AND club_id = ?', (guild_id, user_id, club_id))
-        if cursor.fetchone():
-            conn.close()
-            return False, 'already_exists'
-
-        # Check limit
-        cursor.execute('SELECT COUNT(*) FROM expert_clubs WHERE guild_id = ? AND user_id = ?', (guild_id, user_id))
-        count = cursor.fetchone()[0]
-        if count >= 10:
-            conn.close()
-            return False, 'limit_reached'
-
-        # Insert
-        cursor.execute('INSERT INTO expert_clubs (user_id, guild_id, club_id) VALUES (?, ?, ?)', (user_id, guild_id, club_id))
-        conn.commit()
-        conn.close()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            # Check if already exists
+            cursor.execute('SELECT 1 FROM expert_clubs WHERE guild_id = ? AND user_id = ? AND club_id = ?', (guild_id, user_id, club_id))
+            if cursor.fetchone():
+                return False, 'already_exists'
+
+            # Check limit
+            cursor.execute('SELECT COUNT(*) FROM expert_clubs WHERE guild_id = ? AND user_id = ?', (guild_id, user_id))
+            count = cursor.fetchone()[0]
+            if count >= 10:
+                return False, 'limit_reached'
+
+            # Insert
+            cursor.execute('INSERT INTO expert_clubs (user_id, guild_id, club_id) VALUES (?, ?, ?)', (user_id, guild_id, club_id))
         return True, None
 
     def remove_expert_club(self, guild_id, user_id, club_id):
         """Removes an expert club for a user. Returns True if removed, False otherwise."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('DELETE FROM expert_clubs WHERE guild_id = ? AND user_id = ? AND club_id = ?', (guild_id, user_id, club_id))
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+            cursor.execute('DELETE FROM expert_clubs WHERE guild_id = ? AND user_id = ? AND club_id = ?', (guild_id, user_id, club_id))
+            deleted = cursor.rowcount
         return deleted > 0
 
     def get_expert_users_for_club(self, guild_id, club_id):
         """Returns a list of user_ids who are experts for the given club in the guild."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT user_id FROM expert_clubs WHERE guild_id = ? AND club_id = ?', (guild_id, club_id))
-        results = [row[0] for row in cursor.fetchall()]
-        conn.close()
+            cursor.execute('SELECT user_id FROM expert_clubs WHERE guild_id = ? AND club_id = ?', (guild_id, club_id))
+            results = [row[0] for row in cursor.fetchall()]
         return results
 
     def get_expert_clubs(self, guild_id, user_id):
         """Returns a list of club_ids the user is marked as expert for in the guild."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT c.name FROM expert_clubs e
-            LEFT JOIN clubs c ON e.club_id = c.id
-            WHERE e.guild_id = ? AND e.user_id = ?''', (guild_id, user_id))
-        results = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT c.name FROM expert_clubs e
+                LEFT JOIN clubs c ON e.club_id = c.id
+                WHERE e.guild_id = ? AND e.user_id = ?''', (guild_id, user_id))
+            results = [row[0] for row in cursor.fetchall()]
         return results
 
     def get_all_expert_clubs(self, guild_id):
         """Returns a list of user_ids and club_ids the user is marked as expert for in the guild."""
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT user_id, club_id FROM expert_clubs WHERE guild_id = ?', (guild_id,))
-        results = cursor.fetchall()
-        conn.close()
+            cursor.execute('SELECT user_id, club_id FROM expert_clubs WHERE guild_id = ?', (guild_id,))
+            results = cursor.fetchall()
         return results
 
+
+class AsyncHopperDatabase:
+    """Awaitable facade for HopperDatabase.
+
+    Every HopperDatabase method is available as a coroutine with the same
+    name and arguments. Reads run on a thread pool sized to the number of
+    pooled reader connections; writes run on a single worker thread so they
+    are applied one at a time and in submission order. The event loop never
+    waits on SQLite itself.
+    """
+
+    WRITE_METHODS = frozenset({
+        'init_database',
+        'get_or_create_league',
+        'get_or_create_club',
+        'save_user_profile',
+        'update_club_league',
+        'rename_club',
+        'add_club_alias',
+        'remove_club_alias',
+        'update_club_logo',
+        'update_club_color',
+        'update_club_ticket_info',
+        'get_or_create_stadium',
+        'link_club_to_stadium',
+        'update_stadium_info_partial',
+        'update_league_tier',
+        'save_user_tags',
+        'add_user_tags',
+        'increment_activity',
+        'flush_activity',
+        'rebuild_user_levels',
+        'roll_user_levels',
+        'refresh_levels',
+        'set_state',
+        'save_lineup_messages',
+        'add_expert_club',
+        'remove_expert_club',
+        'checkpoint',
+    })
+
+    def __init__(self, database, max_readers=None):
+        """Wrap a HopperDatabase.
+
+        Args:
+            database: The HopperDatabase instance to run queries on
+            max_readers: Maximum number of concurrent reads (defaults to the pool's reader count)
+        """
+        self.database = database
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=max_readers or database.pool.readers,
+            thread_name_prefix='hopper-db-read',
+        )
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hopper-db-write')
+
+    def __getattr__(self, name):
+        method = getattr(self.database, name)
+        if name.startswith('_') or not callable(method):
+            return method
+
+        executor = self._write_executor if name in self.WRITE_METHODS else self._read_executor
+
+        async def _call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(method, *args, **kwargs))
+
+        _call.__name__ = name
+        _call.__doc__ = method.__doc__
+        # Cache the wrapper so __getattr__ only runs once per method
+        setattr(self, name, _call)
+        return _call
+
+    def close(self):
+        """Waits for queued queries to finish and closes the database."""
+        self._write_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+        self.database.close()
@@ -8,7 +8,14 @@ from dotenv import load_dotenv
 import asyncio
 import re
 from datetime import datetime, timedelta, time as dtime
-from database import HopperDatabase
+from database import AsyncHopperDatabase, HopperDatabase
+from alias_matcher import ClubMatcher
+from club_cache import ClubCache
+from lineup import parse_lineup_shards, render_lineup, sync_lineup_channel
+from outbound import BULK, INTERACTIVE, NORMAL, OutboundQueue
+from lineup_export import LineupExporter, lineup_dataset
+from lineup_scheduler import LineupScheduler
+from search_index import AutocompleteIndex
 from pathlib import Path
 from urllib.parse import urlsplit, urlunsplit
 
@@ -52,6 +59,32 @@ EXCLUSIVE_ACTIVITY_ROLE_IDS = [r for r in (CASUAL_ROLE_ID, FAN_ROLE_ID, ULTRA_RO
 
 LOGO_URL = os.getenv('LOGO_URL')
 DATABASE_NAME = os.getenv('DATABASE_NAME')
+# Number of pooled SQLite reader connections
+DATABASE_READERS = int(os.getenv('DATABASE_READERS') or 4)
+# Optional SQLite storage profile overrides (defaults: DEFAULT_STORAGE_PROFILE in database.py)
+STORAGE_PROFILE = {
+    key: value for key, value in {
+        'journal_mode': os.getenv('DB_JOURNAL_MODE'),
+        'synchronous': os.getenv('DB_SYNCHRONOUS'),
+        'cache_size': os.getenv('DB_CACHE_SIZE'),
+        'mmap_size': os.getenv('DB_MMAP_SIZE'),
+        'temp_store': os.getenv('DB_TEMP_STORE'),
+        'busy_timeout': os.getenv('DB_BUSY_TIMEOUT'),
+    }.items() if value
+}
+# Interval for the periodic WAL checkpoint
+DB_CHECKPOINT_INTERVAL_SECONDS = int(os.getenv('DB_CHECKPOINT_INTERVAL_SECONDS') or 300)
+# Activity hits are buffered in memory and written in batches
+ACTIVITY_FLUSH_INTERVAL_SECONDS = int(os.getenv('ACTIVITY_FLUSH_INTERVAL_SECONDS') or 60)
+ACTIVITY_BUFFER_SIZE = int(os.getenv('ACTIVITY_BUFFER_SIZE') or 500)
+# Line-up rebuilds are coalesced: wait for a quiet window, cap the number per hour
+LINEUP_QUIET_SECONDS = int(os.getenv('LINEUP_QUIET_SECONDS') or 30)
+LINEUP_MAX_DELAY_SECONDS = int(os.getenv('LINEUP_MAX_DELAY_SECONDS') or 300)
+LINEUP_MAX_REBUILDS_PER_HOUR = int(os.getenv('LINEUP_MAX_REBUILDS_PER_HOUR') or 12)
+# Optional line-up spread over several channels: "Germany=123;England,Scotland=456;*=789"
+LINE_UP_SHARDS = parse_lineup_shards(os.getenv('LINE_UP_SHARDS') or '')
+# Optional directory for a static JSON/HTML line-up snapshot, refreshed after every rebuild
+LINEUP_EXPORT_DIR = os.getenv('LINEUP_EXPORT_DIR')
 
 if not TOKEN or not DATABASE_NAME:
     print("Error: DISCORD_TOKEN and DATABASE_NAME must be set in the .env file.")
@@ -59,15 +92,33 @@ if not TOKEN or not DATABASE_NAME:
 
 print(f"Starting Hopper Bot... (version {version}) on server ID {GUILD_ID} with database {DATABASE_NAME}")
 
-# Initialize database
-db = HopperDatabase(DATABASE_NAME)
+# Initialize database. Queries run off the event loop through the async facade.
+db = AsyncHopperDatabase(HopperDatabase(
+    DATABASE_NAME,
+    readers=DATABASE_READERS,
+    storage_profile=STORAGE_PROFILE,
+    activity_buffer_size=ACTIVITY_BUFFER_SIZE,
+))
+
+# Autocomplete answers from memory; database writes keep the index current
+DEFAULT_COUNTRIES = ['Germany', 'Austria', 'Switzerland', 'England', 'Spain', 'Italy', 'France', 'Netherlands', 'Portugal', 'Belgium']
+search_index = AutocompleteIndex(extra_countries=DEFAULT_COUNTRIES)
+db.database.add_listener(search_index.handle_event)
+search_index.load(db.database.get_search_index_data())
+# Groundhelp resolves $ tokens against club names and aliases in memory
+club_matcher = ClubMatcher()
+db.database.add_listener(club_matcher.handle_event)
+club_matcher.load(db.database.get_club_match_terms())
 
 # Create bot with intents
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True  # Required to fetch members
 intents.reactions = True  # Required to receive reaction events
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Line-up, groundhelp, forwarding, cleanup and role sync share one rate-limit-aware queue;
+# the trace hook feeds it Discord's rate-limit headers
+outbound = OutboundQueue()
+bot = commands.Bot(command_prefix='!', intents=intents, http_trace=outbound.trace_config())
 
 default_color = discord.Color.blue()
 
@@ -111,7 +162,8 @@ class ConfirmPingView(discord.ui.View):
         # send public message
         try:
             content = ' '.join(m.mention for m in self.mentions)
-            sent = await self.channel.send(content=content, embed=self.public_embed, allowed_mentions=self.allowed_mentions)
+            sent = await outbound.send(self.channel, content=content, embed=self.public_embed,
+                                       allowed_mentions=self.allowed_mentions, priority=INTERACTIVE)
             await interaction.response.send_message('Message has been sent.', ephemeral=True)
             # optionally create thread
             if CREATE_THREAD_ON_PING and self.matched_query:
@@ -126,7 +178,7 @@ class ConfirmPingView(discord.ui.View):
         # disable buttons
         for child in list(self.children):
             child.disabled = True
-        await interaction.message.edit(view=self)
+        await outbound.edit(interaction.message, view=self, priority=INTERACTIVE)
 
     @discord.ui.button(label='Cancel', style=discord.ButtonStyle.grey)
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -136,7 +188,7 @@ class ConfirmPingView(discord.ui.View):
         await interaction.response.send_message('Cancelled.', ephemeral=True)
         for child in list(self.children):
             child.disabled = True
-        await interaction.message.edit(view=self)
+        await outbound.edit(interaction.message, view=self, priority=INTERACTIVE)
 
 
 class MembershipDenyReasonModal(discord.ui.Modal, title='Deny Application'):
@@ -170,7 +222,7 @@ class MembershipDenyReasonModal(discord.ui.Modal, title='Deny Application'):
         dm_status = 'not sent'
         if member is not None:
             try:
-                await member.send(f'Application denied\n\nReason: {self.reason.value}')
+                await outbound.send(member, f'Application denied\n\nReason: {self.reason.value}', priority=INTERACTIVE)
                 dm_status = 'sent'
             except Exception:
                 dm_status = 'failed (DM closed)'
@@ -201,7 +253,7 @@ class MembershipReviewView(discord.ui.View):
             if channel is None:
                 return
             msg = await channel.fetch_message(self.application_message_id)
-            await msg.delete()
+            await outbound.delete(msg, priority=NORMAL)
         except discord.NotFound:
             pass
         except Exception as e:
@@ -213,7 +265,7 @@ class MembershipReviewView(discord.ui.View):
             if channel is None:
                 return
             msg = await channel.fetch_message(message_id)
-            await msg.delete()
+            await outbound.delete(msg, priority=NORMAL)
         except discord.NotFound:
             pass
         except Exception as e:
@@ -240,18 +292,18 @@ class MembershipReviewView(discord.ui.View):
         apprentice_role = guild.get_role(APPRENTICE_ROLE_ID) if APPRENTICE_ROLE_ID else None
         try:
             if apprentice_role and apprentice_role in member.roles:
-                await member.remove_roles(apprentice_role, reason='Membership application approved')
-            await assign_exclusive_activity_role(member, CASUAL_ROLE_ID if CASUAL_ROLE_ID else None)
+                await outbound.remove_roles(member, apprentice_role, reason='Membership application approved', priority=INTERACTIVE)
+            await assign_exclusive_activity_role(member, CASUAL_ROLE_ID if CASUAL_ROLE_ID else None, INTERACTIVE)
             casual_role = guild.get_role(CASUAL_ROLE_ID) if CASUAL_ROLE_ID else None
             if casual_role and casual_role not in member.roles:
-                await member.add_roles(casual_role, reason='Membership application approved')
+                await outbound.add_roles(member, casual_role, reason='Membership application approved', priority=INTERACTIVE)
         except Exception as e:
             await interaction.followup.send(f'Error while approving application: {e}', ephemeral=True)
             return
 
         dm_status = 'sent'
         try:
-            await member.send('Application accepted')
+            await outbound.send(member, 'Application accepted', priority=INTERACTIVE)
         except Exception:
             dm_status = 'failed (DM closed)'
 
@@ -299,7 +351,7 @@ class MembershipApplicationView(discord.ui.View):
             if channel is None:
                 return
             msg = await channel.fetch_message(message_id)
-            await msg.delete()
+            await outbound.delete(msg, priority=NORMAL)
         except discord.NotFound:
             pass
         except Exception as e:
@@ -325,10 +377,6 @@ class MembershipApplicationView(discord.ui.View):
         await interaction.followup.send('Application aborted and removed.', ephemeral=True)
 
 
-def nbsp(text):
-    """Replaces all regular spaces with non-breaking spaces."""
-    return text.replace(' ', '\u00A0')
-
 def logo2URL(logo_suffix):
     """Converts a logo suffix to a full URL."""
     if not logo_suffix:
@@ -433,35 +481,6 @@ def rewrite_social_links_in_text(content: str):
     rewritten = URL_REGEX.sub(_replacer, content)
     return rewritten, replacements
 
-def format_club_info(result):
-    """Formats raw club info tuple into a dictionary.
-
-    Args:
-        result: Tuple from database (name, league_name, country, logo, tier, flag, id, color, league_logo, ticket_notes, ticket_price_range, ticket_url)
-
-    Returns:
-        Dictionary with formatted club information or None
-    """
-    if not result:
-        return None
-
-    data = {}
-    data["name"] = result[0] if result[0] else 'Unknown'
-    data["league"] = result[1] if result[1] else 'Unknown'
-    data["country"] = result[2] if result[2] else 'Unknown'
-    data["club_logo"] = logo2URL(result[3]) if result[3] else ''
-    data["tier"] = result[4] if result[4] else 99
-    data["flag"] = result[5] if result[5] else ''
-    data["club_id"] = result[6]
-    data["color"] = discord.Color(int(result[7], 16)) if result[7] else default_color
-    data["league_logo"] = logo2URL(result[8]) if result[8] else ''
-    # optional ticketing info (may not exist on older DBs)
-    data["ticket_notes"] = result[9] if len(result) > 9 and result[9] else ''
-    data["ticket_price_range"] = result[10] if len(result) > 10 and result[10] else ''
-    data["ticket_url"] = result[11] if len(result) > 11 and result[11] else ''
-    data["no_league"] = not result[1] or not result[2]
-    return data
-
 def format_stadium_info(result):
     """Formats raw stadium info tuple into a dictionary."""
     if not result:
@@ -479,159 +498,124 @@ def format_stadium_info(result):
         "notes": result[8] if len(result) > 8 and result[8] else '',
     }
 
-def embed_for_club(club: dict):
-    """Creates a Discord embed for a club."""
+def embed_for_club(club):
+    """Creates a Discord embed for a club (ClubRecord)."""
     embed = discord.Embed(
-        color=club['color']
+        color=club.color
     )
-    if club['club_logo'] != "":
-        embed.set_thumbnail(url=club['club_logo'])
+    if club.club_logo != "":
+        embed.set_thumbnail(url=club.club_logo)
     # ticketing info is added by the caller (show_club_info) to control ordering
     return embed
 
-def post_embeds(channel, msg, embeds):
-    """Posts a list of embeds to the specified channel, handling Discord's limit of 10 embeds per message."""
-    async def _post():
-        for i in range(0, len(embeds), 10):
-            if len(msg) > 0 and i == 0:
-                await channel.send(msg, embeds=embeds[i:i + 10], allowed_mentions=discord.AllowedMentions.none())
-            else:
-                await channel.send(embeds=embeds[i:i + 10], allowed_mentions=discord.AllowedMentions.none())
-    return _post()
-
-def post_member_list(guild):
-    """ checks if a member list is already posted and queues it if necessary."""
-    async def _post():
-        # Check if there's already a posting task running
-        if hasattr(bot, 'posting_task') and bot.posting_task and not bot.posting_task.done():
-            print('A member list posting is already in progress. Queuing the new request.')
-            # Wait for the existing task to finish
-            await bot.posting_task
-            print('Previous posting task completed. Starting the queued task.')
-
-        # Start a new posting task
-        bot.posting_task = asyncio.create_task(_post_member_list(guild))
-        await bot.posting_task
+async def post_member_list(guild, immediate=False):
+    """Marks the line-up as dirty; the scheduler coalesces requests into one rebuild.
 
-    return _post()
+    Args:
+        guild: The guild whose line-up changed
+        immediate: Skip the quiet window (used at startup)
+    """
+    lineup_scheduler.request(guild, immediate=immediate)
 
 default_color = discord.Color.blue()
 
-async def _post_member_list(guild):
-    """Posts the member list sorted by country, league (by tier), and club to the specified channel."""
-    # Find the channel
-    channel = bot.get_channel(LINE_UP_CHANNEL_ID)
+lineup_exporter = LineupExporter(LINEUP_EXPORT_DIR) if LINEUP_EXPORT_DIR else None
 
-    if not channel:
-        print(f'Channel with ID {LINE_UP_CHANNEL_ID} not found.')
-        return
+# Formatted club info stays in memory until the club or its league changes
+club_cache = ClubCache(db, logo2URL, default_color)
+db.database.add_listener(club_cache.handle_event)
 
-    # Delete all messages in the channel
-    try:
-        await channel.purge(limit=100)
-        print(f'Messages in channel {channel.name} deleted.')
-    except Exception as e:
-        print(f'Error deleting messages: {e}')
+async def _post_member_list(guild):
+    """Posts the member list sorted by country, league (by tier), and club to the line-up channel(s).
 
-    # Group members by country, league, and club with league tier information
-    clubs = {}  # Cache club info
-    no_league_clubs = set()
+    With LINE_UP_SHARDS set, every channel gets the countries mapped to it.
+    Only line-up messages whose content changed are edited, so a channel
+    whose clubs did not change is skipped; see lineup.sync_lineup_channel.
+    """
+    # Levels include the latest activity; the refresh runs on the writer thread
+    await db.refresh_levels()
+    # One consistent snapshot; everything below works in memory
+    club_token = club_cache.begin_load()
+    snapshot = await db.get_lineup_snapshot(guild.id)
     apprentice_role = guild.get_role(APPRENTICE_ROLE_ID) if APPRENTICE_ROLE_ID else None
     apprentice_user_ids = set(m.id for m in apprentice_role.members) if apprentice_role else set()
 
-    def get_club(club_id):
-        if club_id not in clubs:
-            club = format_club_info(db.get_club_info(club_id))
-            if not club:
-                return None
-            clubs[club_id] = club
-            if club["no_league"]:
-                no_league_clubs.add(club_id)
-            club["members"] = []
-            club["experts"] = []
-            club["apprentices"] = []
-        return clubs[club_id]
-
-    for member in guild.members:
-        if member.bot:
-            continue  # Skip bots
-        club_id, _ = db.get_user_profile(guild.id, member.id)
-        club = get_club(club_id)
-        if not club:
-            continue  # Skip members without a club
-
-        lvl = db.get_user_level(member.id)
-        if member.id in apprentice_user_ids:
-            club["apprentices"].append(nbsp(f'{member.mention} {lvl}'))
-        else:
-            club["members"].append(nbsp(f'{member.mention} 🥇 {lvl}'))
-
-    expert_data = db.get_all_expert_clubs(guild.id)
-    for (user_id, club_id) in expert_data:
-        member_obj = guild.get_member(user_id)
-        if not member_obj:
-            continue
-        club = get_club(club_id)
-        if not club:
+    # Group members by country, league, and club and render every line-up channel
+    clubs, club_ids, channel_sections = render_lineup(
+        guild, snapshot, club_cache.from_rows(snapshot['clubs'], club_token), apprentice_user_ids,
+        LINE_UP_SHARDS, LINE_UP_CHANNEL_ID)
+    print(f'Total clubs with members: {len(club_ids)}')
+
+    # The first sync after a restart checks that the stored messages still exist
+    verify = not getattr(bot, 'lineup_verified', False)
+    verified = True
+    retry = False
+    for channel_id, sections in channel_sections.items():
+        channel = bot.get_channel(channel_id)
+        if not channel:
+            print(f'Channel with ID {channel_id} not found.')
             continue
 
-        lvl = db.get_user_level(user_id)
-        if user_id in apprentice_user_ids:
-            club["apprentices"].append(nbsp(f'{member_obj.mention} {lvl}'))
-        else:
-            club["experts"].append(nbsp(f'{member_obj.mention} 🥈 {lvl}'))
-
-    # Send header message
-    await channel.send(f"**Server: {guild.name}**\n**Number of members: {guild.member_count}**")
-
-    club_ids = db.get_club_ids_sorted_by_country_and_tier()
-    print(f'Total clubs: {len(club_ids)}, Total clubs with members: {len(clubs)}')
-    club_ids.extend(no_league_clubs - set(club_ids))
-    country = ""
-    league = ""
-    msg = ""
-
-    embeds = []
-    for club_id in club_ids:
-        if not club_id in clubs:
+        try:
+            stats = await sync_lineup_channel(channel, sections, db, verify=verify, outbound=outbound)
+        except Exception as e:
+            print(f'Error updating line-up in channel {channel.name}: {e}')
+            verified = False
             continue
-        club = clubs[club_id]
-
-        if club["league"] != league or club["country"] != country:
-            if len(embeds) > 0:
-                await post_embeds(channel, msg, embeds)
-                embeds = []
-
-        if club["country"] != country:
-            country = club["country"]
-            await channel.send(f'═══ {country} {club["flag"]} ═══\n')
-
-        if club["league"] != league:
-            league = club["league"]
-            msg = f"\n**{league}**\n"
+        if stats['skipped']:
+            print(f'Line-up in channel {channel.name} is up to date.')
+        else:
+            print(f'Line-up sync in channel {channel.name}: {stats}')
+        retry = retry or stats['failed'] > 0
+    bot.lineup_verified = verified
+    if retry:
+        # Skipped calls kept their old state; another pass after the quiet window retries them
+        lineup_scheduler.request(guild)
+
+    if lineup_exporter:
+        # Plain data is taken here; rendering and file writes run in a worker thread
+        dataset = lineup_dataset(clubs, club_ids)
+        try:
+            stats = await asyncio.to_thread(lineup_exporter.export, guild.name, dataset)
+            print(f'Line-up export to {LINEUP_EXPORT_DIR}: {stats}')
+        except Exception as e:
+            print(f'Error exporting line-up: {e}')
 
-        # Create embed with club logo
-        embed = embed_for_club(club)
-        embed.description = ", ".join(club["members"])
-        if "experts" in club and len(club["experts"]) > 0:
-            embed.add_field(name=f'Experts ({len(club["experts"])})',
-                value=", ".join(club["experts"]), inline=False)
-        if "apprentices" in club and len(club["apprentices"]) > 0:
-            embed.add_field(name=f'Apprentice ({len(club["apprentices"])})',
-                value=", ".join(club["apprentices"]), inline=False)
-        embed.set_author(name=f"{club['name']} ({len(club['members'])})")
-        embeds.append(embed)
-
-    if len(embeds) > 0:
-        await post_embeds(channel, msg, embeds)
-        embeds = []
-
-    await asyncio.sleep(10)  # To avoid hitting rate limits
-    print(f'Member list sent to channel {channel.name}.')
+lineup_scheduler = LineupScheduler(
+    _post_member_list,
+    quiet_seconds=LINEUP_QUIET_SECONDS,
+    max_delay_seconds=LINEUP_MAX_DELAY_SECONDS,
+    max_per_hour=LINEUP_MAX_REBUILDS_PER_HOUR,
+)
 
 @bot.command()
 async def ping(ctx):
-    await ctx.send(f'Yes, {ctx.author.mention}, I\'m here ! :robot: :saluting_face: ({version})')
+    await outbound.send(ctx.channel, f'Yes, {ctx.author.mention}, I\'m here ! :robot: :saluting_face: ({version})', priority=INTERACTIVE)
+
+@bot.command(name='lineup-status')
+async def lineup_status(ctx):
+    """Shows the state of the line-up rebuild scheduler."""
+    status = lineup_scheduler.status()
+    lines = [f'**Line-up scheduler** ({version})']
+    for key, value in status.items():
+        if isinstance(value, datetime):
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        elif isinstance(value, float):
+            value = f'{value:.1f}s'
+        lines.append(f'{key}: {value}')
+    await outbound.send(ctx.channel, "\n".join(lines), priority=INTERACTIVE)
+
+
+@bot.command(name='outbound-status')
+async def outbound_status(ctx):
+    """Shows queue depth, wait times and rate-limit counters of the outbound queue."""
+    status = outbound.status()
+    lines = [f'**Outbound queue** ({version})']
+    for key, value in status.items():
+        if key == 'wait':
+            value = ', '.join(f"{name} avg {w['avg']:.2f}s / max {w['max']:.2f}s" for name, w in value.items()) or '-'
+        lines.append(f'{key}: {value}')
+    await outbound.send(ctx.channel, "\n".join(lines), priority=INTERACTIVE)
 
 
 def _is_bot_command_overview_message(message: discord.Message) -> bool:
@@ -670,6 +654,8 @@ def _build_bot_command_overview_embed(synced_commands):
         'add-stadiuminfo': 'Club Management',
         'add-expert-club': 'Expert Clubs',
         'remove-expert-club': 'Expert Clubs',
+        'add-club-alias': 'Club Management',
+        'remove-club-alias': 'Club Management',
     }
 
     grouped = {name: [] for name in category_order}
@@ -729,7 +715,7 @@ async def _delete_message_after_delay(message: discord.Message, delay_seconds: i
         await asyncio.sleep(delay_seconds)
         if message.id == BOT_COMMAND_OVERVIEW_MESSAGE_ID or _is_bot_command_overview_message(message):
             return
-        await message.delete()
+        await outbound.delete(message)
     except discord.NotFound:
         pass
     except Exception as e:
@@ -784,15 +770,15 @@ async def ensure_bot_command_overview_message(synced_commands):
         messages_to_delete.append(msg)
 
     if overview_message is None:
-        overview_message = await channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+        overview_message = await outbound.send(channel, embed=embed, allowed_mentions=discord.AllowedMentions.none(), priority=BULK)
     else:
-        await overview_message.edit(content='', embed=embed)
+        await outbound.edit(overview_message, content='', embed=embed, priority=BULK)
 
     BOT_COMMAND_OVERVIEW_MESSAGE_ID = overview_message.id
 
     try:
         if not overview_message.pinned:
-            await overview_message.pin(reason='Keep command overview visible')
+            await outbound.pin(overview_message, reason='Keep command overview visible', priority=BULK)
     except Exception as e:
         print(f'Could not pin command overview message: {e}')
 
@@ -800,7 +786,7 @@ async def ensure_bot_command_overview_message(synced_commands):
         if msg.id == BOT_COMMAND_OVERVIEW_MESSAGE_ID:
             continue
         try:
-            await msg.delete()
+            await outbound.delete(msg)
         except discord.NotFound:
             pass
         except Exception as e:
@@ -825,7 +811,7 @@ async def migrate_users_without_club_to_newcomer(guild: discord.Guild):
         checked_count += 1
 
         try:
-            club_id, _ = db.get_user_profile(guild.id, member.id)
+            club_id, _ = await db.get_user_profile(guild.id, member.id)
         except Exception as e:
             print(f'Error checking profile for {member.id}: {e}')
             continue
@@ -844,10 +830,10 @@ async def migrate_users_without_club_to_newcomer(guild: discord.Guild):
         changed = False
         try:
             if roles_to_remove:
-                await member.remove_roles(*roles_to_remove, reason='No club set: move member to newcomer')
+                await outbound.remove_roles(member, *roles_to_remove, reason='No club set: move member to newcomer', priority=BULK)
                 changed = True
             if newcomer_role not in member.roles:
-                await member.add_roles(newcomer_role, reason='No club set: move member to newcomer')
+                await outbound.add_roles(member, newcomer_role, reason='No club set: move member to newcomer', priority=BULK)
                 changed = True
         except Exception as e:
             print(f'Error migrating member {member.id} to newcomer: {e}')
@@ -903,7 +889,7 @@ async def on_ready():
         print(f'Error during newcomer migration: {e}')
 
     # Post the member list
-    await post_member_list(guild)
+    await post_member_list(guild, immediate=True)
 
     # Sync activity roles once at startup (map existing status to roles)
     try:
@@ -918,6 +904,20 @@ async def on_ready():
     except Exception as e:
         print(f'Error starting activity sync scheduler: {e}')
 
+    # Start a background task that checkpoints the SQLite WAL periodically
+    try:
+        if not hasattr(bot, 'wal_checkpoint_task') or bot.wal_checkpoint_task.done():
+            bot.wal_checkpoint_task = asyncio.create_task(schedule_wal_checkpoint())
+    except Exception as e:
+        print(f'Error starting WAL checkpoint scheduler: {e}')
+
+    # Start a background task that writes buffered activity hits in batches
+    try:
+        if not hasattr(bot, 'activity_flush_task') or bot.activity_flush_task.done():
+            bot.activity_flush_task = asyncio.create_task(schedule_activity_flush())
+    except Exception as e:
+        print(f'Error starting activity flush scheduler: {e}')
+
 @bot.event
 async def on_member_join(member):
     """When a new member joins the server:
@@ -936,7 +936,7 @@ async def on_member_join(member):
 
     # Assign the role to the new member
     try:
-        await member.add_roles(role, reason='Assign newcomer role')
+        await outbound.add_roles(member, role, reason='Assign newcomer role')
         print(f'Role "{role.name}" assigned to {member}')
     except Exception as e:
         print(f'Error assigning role to {member}: {e}')
@@ -948,17 +948,18 @@ async def on_member_join(member):
             if channel.id == WELCOME_CHANNEL_ID:
                 welcome_channel = channel
                 # Allow visibility and messages in welcome channel
-                await channel.set_permissions(role, view_channel=True, send_messages=True, read_message_history=True)
+                await outbound.set_permissions(channel, role, view_channel=True, send_messages=True, read_message_history=True)
             else:
                 # Hide all other channels for this role
-                await channel.set_permissions(role, view_channel=False)
+                await outbound.set_permissions(channel, role, view_channel=False)
         except Exception as e:
             print(f'Error setting permissions for channel {getattr(channel, "name", channel.id)}: {e}')
 
     # Ask questions in the welcome channel
     if welcome_channel:
         support_user_mention = f'<@{SUPPORT_USER_ID}>'
-        await welcome_channel.send(
+        await outbound.send(
+            welcome_channel,
             f"👋 **Welcome {member.mention} to {guild.name}!**\n\n"
             "**1) Set your home club (required for full access)**\n"
             f"Use {SET_CLUB_COMMAND_MENTION} by clicking it in this message or typing it below.\n"
@@ -1009,9 +1010,11 @@ async def on_message(message):
             if len(outgoing_text) > 1900:
                 outgoing_text = outgoing_text[:1890] + '\n…'
 
-            await message.channel.send(
+            await outbound.send(
+                message.channel,
                 outgoing_text,
-                allowed_mentions=discord.AllowedMentions.none()
+                allowed_mentions=discord.AllowedMentions.none(),
+                priority=INTERACTIVE
             )
             # Remove original message to avoid duplicate unfixed/fixed links when possible
             try:
@@ -1021,7 +1024,7 @@ async def on_message(message):
                     if me:
                         can_manage_messages = message.channel.permissions_for(me).manage_messages
                 if can_manage_messages:
-                    await message.delete()
+                    await outbound.delete(message, priority=NORMAL)
                 else:
                     print(
                         f"SocialFix: missing manage_messages permission in channel={getattr(message.channel, 'id', 'unknown')} "
@@ -1040,7 +1043,7 @@ async def on_message(message):
 
     # Increment activity counter for the user
     try:
-        db.increment_activity(message.author.id)
+        await db.increment_activity(message.author.id)
     except Exception as e:
         print(f'Error incrementing activity: {e}')
 
@@ -1109,15 +1112,12 @@ async def on_message(message):
             # Allow only one active application per apprentice
             existing = ACTIVE_MEMBERSHIP_APPLICATIONS.get(message.author.id)
             if existing:
-                warning = await message.channel.send('application already in progress. abort current application to send a new one')
+                warning = await outbound.send(message.channel, 'application already in progress. abort current application to send a new one', priority=INTERACTIVE)
                 try:
-                    await message.delete()
-                except Exception:
-                    pass
-                try:
-                    await warning.delete(delay=10)
+                    await outbound.delete(message, priority=NORMAL)
                 except Exception:
                     pass
+                asyncio.create_task(_delete_message_after_delay(warning, 10))
                 return
 
             apprentice_role = guild.get_role(APPRENTICE_ROLE_ID) if APPRENTICE_ROLE_ID else None
@@ -1147,7 +1147,8 @@ async def on_message(message):
                 application_channel_id=message.channel.id,
                 application_message_id=0
             )
-            reposted = await message.channel.send(
+            reposted = await outbound.send(
+                message.channel,
                 embeds=app_embeds,
                 files=app_files,
                 view=app_view,
@@ -1167,7 +1168,8 @@ async def on_message(message):
                 application_channel_id=message.channel.id,
                 application_message_id=reposted.id
             )
-            verification_msg = await mod_channel.send(
+            verification_msg = await outbound.send(
+                mod_channel,
                 embeds=mod_embeds,
                 files=mod_files,
                 view=review_view,
@@ -1183,7 +1185,7 @@ async def on_message(message):
             }
 
             try:
-                await message.delete()
+                await outbound.delete(message, priority=NORMAL)
             except Exception:
                 pass
         except Exception as e:
@@ -1195,7 +1197,11 @@ async def on_message(message):
             content = message.content
             import re
             # Match $ followed by club name (allow spaces, stop at newline, punctuation or next $). Minimum length 3
-            matches = re.findall(r'\$([^\n!?\.,;:\$]{3,})', content)
+            # Known club names and aliases resolve in memory; other tokens go through the DB search
+            resolved = club_matcher.match_tokens(content)
+            raw_tokens = {m.start(): m.group(1) for m in re.finditer(r'\$([^\n!?\.,;:\$]{3,})', content)}
+            tokens = [resolved.get(pos) or (raw_tokens[pos], None) for pos in sorted(set(resolved) | set(raw_tokens))]
+            matches = [token for token, _ in tokens]
             if matches:
                 guild = message.guild
                 print(f'Groundhelp: matches={matches} from={message.author} channel={getattr(message.channel, "name", message.channel.id)}')
@@ -1212,26 +1218,31 @@ async def on_message(message):
                 league_logo_map = {}
                 league_logo_candidate = None
                 had_error = False
-                for raw in matches:
+                # Resolve every token to a club first; errors are reported per token
+                resolved_tokens = []
+                for raw, club_id in tokens:
                     query = raw.strip()
                     if not query:
                         continue
                     matched_query = query
 
-                    # Prefer exact match via DB wrapper
-                    club_id = db.get_club_id_by_name(query)
-                    print(f'Groundhelp: lookup club "{query}" -> club_id={club_id}')
+                    if club_id:
+                        print(f'Groundhelp: matched club "{query}" -> club_id={club_id}')
+                    else:
+                        # Prefer exact match via DB wrapper
+                        club_id = await db.get_club_id_by_name(query)
+                        print(f'Groundhelp: lookup club "{query}" -> club_id={club_id}')
                     if not club_id:
                         # Try fuzzy search (LIKE)
-                        like_matches = db.search_clubs_by_name_like(query, limit=10)
+                        like_matches = await db.search_clubs_by_name_like(query, limit=10)
                         print(f'Groundhelp: like search for "{query}" -> {len(like_matches)} matches')
                         if len(like_matches) == 0:
                             # No club found at all
-                            await message.channel.send(f'{query} not found')
+                            await outbound.send(message.channel, f'{query} not found', priority=INTERACTIVE)
                             had_error = True
                             continue
                         if len(like_matches) > 5:
-                            await message.channel.send(f'{query} matches too many clubs')
+                            await outbound.send(message.channel, f'{query} matches too many clubs', priority=INTERACTIVE)
                             had_error = True
                             continue
                         if len(like_matches) == 1:
@@ -1239,56 +1250,54 @@ async def on_message(message):
                         else:
                             # Multiple (but <=5) matches: ask user to be more specific
                             names = ', '.join([m[1] for m in like_matches])
-                            await message.channel.send(f'{query} matches multiple clubs: {names}')
+                            await outbound.send(message.channel, f'{query} matches multiple clubs: {names}', priority=INTERACTIVE)
                             had_error = True
                             continue
-
-                    members_data = db.get_members_by_club_id(guild.id, club_id)
+                    resolved_tokens.append((query, club_id))
+
+                # One round trip for all clubs; reused by every branch below
+                club_token = club_cache.begin_load()
+                groundhelp_data = await db.get_groundhelp_data(guild.id, [cid for _, cid in resolved_tokens])
+                groundhelp_clubs = {club.club_id: club for club in club_cache.from_rows(
+                    list(groundhelp_data['clubs'].values()), club_token)}
+                club_id = None
+                for query, club_id in resolved_tokens:
+                    members_data = groundhelp_data['members'].get(club_id, [])
                     # fetch display name and logo from DB if possible
-                    info = db.get_club_info(club_id)
-                    if info and info[0]:
-                        if info[0] not in club_display_names:
-                            club_display_names.append(info[0])
-                        token_to_name[query] = info[0]
-                        try:
-                            club_ids.append(club_id)
-                            # league name at index 1, league logo at index 8 (if present)
-                            league_name = info[1] if len(info) > 1 else None
-                            if league_name:
-                                league_names.add(league_name)
-                            if expert_mentions:
-                                embed.add_field(name=f'Experts ({len(expert_mentions)})', value=', '.join(expert_mentions), inline=False)
-                            await interaction.followup.send(embed=embed)
-                            return
-
-                        
-                            if len(info) > 8 and info[8] and not league_logo_candidate:
-                                league_logo_candidate = info[8]
-                        except Exception:
-                            pass
+                    info = groundhelp_clubs.get(club_id)
+                    if info:
+                        if info.name not in club_display_names:
+                            club_display_names.append(info.name)
+                        token_to_name[query] = info.name
+                        club_ids.append(club_id)
+                        if info.league_id is not None:
+                            league_name = info.league
+                            league_names.add(league_name)
+                            league_list.append(league_name)
+                            if info.league_logo:
+                                league_logo_map.setdefault(league_name, info.league_logo)
+                        if info.league_logo and not league_logo_candidate:
+                            league_logo_candidate = info.league_logo
                     else:
                         token_to_name[query] = None
-                    if info and len(info) > 3 and info[3]:
+                    if info and info.club_logo:
                         # prefer first club logo if multiple
                         if not club_logo_url:
-                            club_logo_url = logo2URL(info[3])
-                    for (uid,) in members_data:
+                            club_logo_url = info.club_logo
+                    for uid in members_data:
                         member = guild.get_member(uid)
                         if member:
                             notified.append(member)
                     print(f'Groundhelp: found {len(members_data)} members, appended {len(notified)} so far')
 
                     # include experts for this club (exclude duplicates later)
-                    try:
-                        expert_user_ids = db.get_expert_users_for_club(guild.id, club_id)
-                        for uid in expert_user_ids:
-                            member = guild.get_member(uid)
-                            if member:
-                                notified.append(member)
-                                notified_expert_ids.add(uid)
-                        print(f'Groundhelp: added {len(expert_user_ids)} expert ids, total appended {len(notified)} so far')
-                    except Exception as e:
-                        print(f'Error fetching expert users for club {club_id}: {e}')
+                    expert_user_ids = groundhelp_data['experts'].get(club_id, [])
+                    for uid in expert_user_ids:
+                        member = guild.get_member(uid)
+                        if member:
+                            notified.append(member)
+                            notified_expert_ids.add(uid)
+                    print(f'Groundhelp: added {len(expert_user_ids)} expert ids, total appended {len(notified)} so far')
 
                 # Deduplicate
                 unique = []
@@ -1304,15 +1313,14 @@ async def on_message(message):
                         # Show club profile for clubs that were resolved (no mentions)
                         for cid in club_ids:
                             try:
-                                info_c = db.get_club_info(cid)
-                                club_dict = format_club_info(info_c) if info_c else None
-                                members_data_c = db.get_members_by_club_id(guild.id, cid)
+                                club_dict = groundhelp_clubs.get(cid)
+                                members_data_c = groundhelp_data['members'].get(cid, [])
                                 member_names = []
-                                for (uid,) in members_data_c:
+                                for uid in members_data_c:
                                     m = guild.get_member(uid)
                                     if m:
                                         member_names.append(m.display_name)
-                                expert_user_ids_c = db.get_expert_users_for_club(guild.id, cid)
+                                expert_user_ids_c = groundhelp_data['experts'].get(cid, [])
                                 expert_names = []
                                 for uid in expert_user_ids_c:
                                     m = guild.get_member(uid)
@@ -1321,8 +1329,8 @@ async def on_message(message):
 
                                 if club_dict:
                                     club_embed = embed_for_club(club_dict)
-                                    club_embed.title = f"⚽ {club_dict['name']}"
-                                    club_embed.description = f"**League:** {club_dict['league']} (Tier {club_dict['tier']})\n**Country:** {club_dict['country']} {club_dict['flag']}"
+                                    club_embed.title = f"⚽ {club_dict.name}"
+                                    club_embed.description = f"**League:** {club_dict.league} (Tier {club_dict.tier})\n**Country:** {club_dict.country} {club_dict.flag}"
                                     if member_names:
                                         # show plain display names to avoid pings
                                         club_embed.add_field(name=f"Members ({len(member_names)})", value=", ".join(member_names), inline=False)
@@ -1330,7 +1338,7 @@ async def on_message(message):
                                         club_embed.add_field(name="Members (0)", value="No members", inline=False)
                                     if expert_names:
                                         club_embed.add_field(name=f"Experts ({len(expert_names)})", value=", ".join(expert_names), inline=False)
-                                    await message.channel.send(embed=club_embed, allowed_mentions=discord.AllowedMentions.none())
+                                    await outbound.send(message.channel, embed=club_embed, allowed_mentions=discord.AllowedMentions.none(), priority=INTERACTIVE)
                             except Exception as e:
                                 print(f'Error sending club profile for cid={cid}: {e}')
                     except Exception as e:
@@ -1340,7 +1348,7 @@ async def on_message(message):
                 if not unique:
                     # No regular members found; check if there are experts to ping
                     try:
-                        expert_user_ids = db.get_expert_users_for_club(guild.id, club_id)
+                        expert_user_ids = groundhelp_data['experts'].get(club_id, [])
                         expert_members = []
                         for uid in expert_user_ids:
                             m = guild.get_member(uid)
@@ -1353,15 +1361,15 @@ async def on_message(message):
                             # Club exists but truly no active members in this guild
                             name_to_show = (club_display_names[0] if club_display_names else matched_query)
                             # Build and show club profile embed with 0 members
-                            club_dict = format_club_info(info) if info else None
+                            club_dict = info
                             if club_dict:
                                 try:
                                     club_embed = embed_for_club(club_dict)
-                                    club_embed.title = f"⚽ {club_dict['name']}"
-                                    club_embed.description = f"**League:** {club_dict['league']} (Tier {club_dict['tier']})\n**Country:** {club_dict['country']} {club_dict['flag']}"
+                                    club_embed.title = f"⚽ {club_dict.name}"
+                                    club_embed.description = f"**League:** {club_dict.league} (Tier {club_dict.tier})\n**Country:** {club_dict.country} {club_dict.flag}"
                                     club_embed.add_field(name="Members (0)", value="No members", inline=False)
                                     # experts (should be none here)
-                                    expert_user_ids = db.get_expert_users_for_club(guild.id, club_dict['club_id'])
+                                    expert_user_ids = groundhelp_data['experts'].get(club_dict.club_id, [])
                                     expert_mentions = []
                                     for uid in expert_user_ids:
                                         m = guild.get_member(uid)
@@ -1369,15 +1377,15 @@ async def on_message(message):
                                             expert_mentions.append(m.mention)
                                     if expert_mentions:
                                         club_embed.add_field(name=f"Experts ({len(expert_mentions)})", value=", ".join(expert_mentions), inline=False)
-                                    await message.channel.send('No members', embed=club_embed)
+                                    await outbound.send(message.channel, 'No members', embed=club_embed, priority=INTERACTIVE)
                                 except Exception as e:
                                     print(f'Error showing club profile for no-members case: {e}')
-                                    await message.channel.send(f'{name_to_show} has no active members')
+                                    await outbound.send(message.channel, f'{name_to_show} has no active members', priority=INTERACTIVE)
                             else:
-                                await message.channel.send(f'{name_to_show} has no active members')
+                                await outbound.send(message.channel, f'{name_to_show} has no active members', priority=INTERACTIVE)
                     except Exception as e:
                         print(f'Error checking experts for club {club_id}: {e}')
-                        await message.channel.send('No members')
+                        await outbound.send(message.channel, 'No members', priority=INTERACTIVE)
                 else:
                     limited = unique[:MAX_MENTIONS]
                     mentions = ' '.join(m.mention for m in limited)
@@ -1386,19 +1394,7 @@ async def on_message(message):
                     combined_club_name = ', '.join(club_display_names) if club_display_names else None
                     embed_title = f'Groundhelp — {combined_club_name}' if combined_club_name else 'Groundhelp'
                     # Determine embed color from DB if available
-                    club_color = discord.Color.orange()
-                    try:
-                        if info and len(info) > 7 and info[7]:
-                            raw = str(info[7]).strip()
-                            # remove leading # or 0x if present
-                            if raw.startswith('#'):
-                                raw = raw[1:]
-                            if raw.lower().startswith('0x'):
-                                raw = raw[2:]
-                            if len(raw) == 6 and all(c in '0123456789abcdefABCDEF' for c in raw):
-                                club_color = discord.Color(int(raw, 16))
-                    except Exception:
-                        club_color = discord.Color.orange()
+                    club_color = info.stored_color if info and info.stored_color is not None else discord.Color.orange()
 
                     # Build embed description: replace $club tokens inline with DB names when available
                     try:
@@ -1432,7 +1428,7 @@ async def on_message(message):
                             league_name, league_count = most_common_league
                             # require strict majority (> half) or at least 2 clubs
                             if league_name and league_count >= 2 and league_name in league_logo_map and league_logo_map[league_name]:
-                                club_logo_url = logo2URL(league_logo_map[league_name])
+                                club_logo_url = league_logo_map[league_name]
                                 chosen_league = league_name
                             # else, keep first-seen club logo (club_logo_url)
                     except Exception:
@@ -1469,11 +1465,9 @@ async def on_message(message):
                         # Show users to be pinged (count in parentheses) and list them below with medal+status
                         try:
                             user_lines = []
+                            preview_levels = groundhelp_data['levels']
                             for m in limited:
-                                try:
-                                    lvl = db.get_user_level(m.id)
-                                except Exception:
-                                    lvl = ''
+                                lvl = preview_levels.get(m.id, '')
                                 medal = '🥈' if getattr(m, 'id', None) in notified_expert_ids else '🥇'
                                 user_lines.append(f"{m.mention} {medal} {lvl}")
                             preview.add_field(name=f'Users to be pinged ({len(limited)})', value='\n'.join(user_lines) if user_lines else 'None', inline=False)
@@ -1484,7 +1478,7 @@ async def on_message(message):
                         if len(unique) < 3:
                             try:
                                 content = ' '.join(m.mention for m in limited)
-                                sent = await message.channel.send(content=content, embed=embed, allowed_mentions=allowed)
+                                sent = await outbound.send(message.channel, content=content, embed=embed, allowed_mentions=allowed, priority=INTERACTIVE)
                                 # optionally create thread
                                 if CREATE_THREAD_ON_PING and matched_query:
                                     try:
@@ -1494,32 +1488,32 @@ async def on_message(message):
                                         print(f'Could not create thread after immediate send: {e}')
                             except Exception as e:
                                 print(f'Error sending immediate groundhelp mentions: {e}')
-                                await message.channel.send('Error sending the Groundhelp message directly.')
+                                await outbound.send(message.channel, 'Error sending the Groundhelp message directly.', priority=INTERACTIVE)
                         else:
                             view = ConfirmPingView(author=message.author, channel=message.channel, mentions=limited, public_embed=embed, allowed_mentions=allowed, matched_query=matched_query)
 
                             try:
                                 # Send a short DM header and the embed (embed already contains the message preview)
                                 dm_text = 'Message Preview:'
-                                await message.author.send(content=dm_text, embed=preview, view=view)
+                                await outbound.send(message.author, content=dm_text, embed=preview, view=view, priority=INTERACTIVE)
                             except Exception as e:
                                 # Could not send DM (privacy settings); fallback: send temporary preview in channel (visible) then continue
                                 print(f'Could not DM preview: {e}; sending temporary preview in channel')
                                 temp_header = f'{message.author.mention} Message Preview:'
-                                temp = await message.channel.send(f'{temp_header}', embed=preview)
-                                await temp.delete(delay=20)
+                                temp = await outbound.send(message.channel, f'{temp_header}', embed=preview, priority=INTERACTIVE)
+                                asyncio.create_task(_delete_message_after_delay(temp, 20))
 
                     except Exception as e:
                         print(f'Error preparing preview/confirmation: {e}')
-                        await message.channel.send('Error creating preview.')
+                        await outbound.send(message.channel, 'Error creating preview.', priority=INTERACTIVE)
                         return
 
                     # Inform if we truncated the list (still inform the author via DM or fallback)
                     if len(unique) > MAX_MENTIONS:
                         try:
-                            await message.author.send(f'Found {len(unique)} members — only the first {MAX_MENTIONS} will be mentioned after confirmation.')
+                            await outbound.send(message.author, f'Found {len(unique)} members — only the first {MAX_MENTIONS} will be mentioned after confirmation.', priority=INTERACTIVE)
                         except Exception:
-                            await message.channel.send(f'Found {len(unique)} members — only the first {MAX_MENTIONS} will be mentioned.')
+                            await outbound.send(message.channel, f'Found {len(unique)} members — only the first {MAX_MENTIONS} will be mentioned.', priority=INTERACTIVE)
 
                 return
         except Exception as e:
@@ -1538,12 +1532,12 @@ async def on_reaction_add(reaction, user):
     print(f'Reaction added by {user} to message ID {reaction.message.id}')
     # Increment activity counter for the user
     try:
-        db.increment_activity(user.id)
+        await db.increment_activity(user.id)
     except Exception as e:
         print(f'Error incrementing activity on reaction: {e}')
 
 # Helper: assign exclusive activity role (remove other activity roles)
-async def assign_exclusive_activity_role(member: discord.Member, role_id: int | None):
+async def assign_exclusive_activity_role(member: discord.Member, role_id: int | None, priority: int = NORMAL):
     if not EXCLUSIVE_ACTIVITY_ROLE_IDS:
         return
     guild = member.guild
@@ -1565,16 +1559,17 @@ async def assign_exclusive_activity_role(member: discord.Member, role_id: int |
             if r in member.roles and (role_id is None or rid != role_id):
                 roles_to_remove.append(r)
         if roles_to_remove:
-            await member.remove_roles(*roles_to_remove, reason='Ensure exclusive activity role')
+            await outbound.remove_roles(member, *roles_to_remove, reason='Ensure exclusive activity role', priority=priority)
         if role_id:
             new_role = guild.get_role(role_id)
             if new_role and new_role not in member.roles:
-                await member.add_roles(new_role, reason='Assign exclusive activity role')
+                await outbound.add_roles(member, new_role, reason='Assign exclusive activity role', priority=priority)
     except Exception as e:
         print(f'Error assigning exclusive activity role for {member.id}: {e}')
 
 
-async def update_activity_role(member: discord.Member):
+async def update_activity_role(member: discord.Member, lvl: str | None = None, priority: int = NORMAL):
+    """Assigns the activity role for a member. Pass `lvl` when it was already fetched in bulk."""
     if member.bot:
         return
     # If the member is a newcomer or apprentice, do not change activity roles
@@ -1586,11 +1581,12 @@ async def update_activity_role(member: discord.Member):
             return
     except Exception:
         pass
-    try:
-        lvl = db.get_user_level(member.id)
-    except Exception as e:
-        print(f'Error fetching level for {member.id}: {e}')
-        lvl = None
+    if lvl is None:
+        try:
+            lvl = await db.get_user_level(member.id)
+        except Exception as e:
+            print(f'Error fetching level for {member.id}: {e}')
+            lvl = None
     # Determine desired role based on lvl which may be a string ("Ultra"/"Fan"/"Casual")
     desired = None
     if lvl is None:
@@ -1606,7 +1602,7 @@ async def update_activity_role(member: discord.Member):
             elif s == 'casual' and CASUAL_ROLE_ID:
                 desired = CASUAL_ROLE_ID
 
-    await assign_exclusive_activity_role(member, desired)
+    await assign_exclusive_activity_role(member, desired, priority)
 
 async def sync_activity_roles(guild: discord.Guild):
     """Iterate all members and sync their activity-based role once."""
@@ -1615,6 +1611,7 @@ async def sync_activity_roles(guild: discord.Guild):
         # Pre-fetch special roles to skip members who should not be adjusted
         newcomer_role = guild.get_role(NEWCOMER_ROLE_ID) if NEWCOMER_ROLE_ID else None
         apprentice_role = guild.get_role(APPRENTICE_ROLE_ID) if APPRENTICE_ROLE_ID else None
+        levels = await db.get_user_levels([m.id for m in guild.members if not m.bot])
         for member in guild.members:
             if member.bot:
                 continue
@@ -1622,8 +1619,8 @@ async def sync_activity_roles(guild: discord.Guild):
             try:
                 if (newcomer_role and newcomer_role in member.roles) or (apprentice_role and apprentice_role in member.roles):
                     continue
-                await update_activity_role(member)
-                await asyncio.sleep(0.15)
+                # Bulk priority: the queue paces role changes and lets interactive replies go first
+                await update_activity_role(member, levels.get(member.id, 'Casual'), BULK)
             except Exception as e:
                 print(f'Error syncing activity role for {member.id}: {e}')
         print('Activity role sync completed.')
@@ -1651,6 +1648,12 @@ async def schedule_activity_sync(guild: discord.Guild):
             print('Activity sync scheduler cancelled.')
             return
 
+        try:
+            # Write buffered hits and move the level window to the new day before reading levels
+            await db.refresh_levels()
+        except Exception as e:
+            print(f'Error rolling user levels: {e}')
+
         try:
             await sync_activity_roles(guild)
         except Exception as e:
@@ -1663,22 +1666,45 @@ async def schedule_activity_sync(guild: discord.Guild):
             print('Activity sync scheduler cancelled during 24h sleep.')
             return
 
+async def schedule_activity_flush():
+    """Background task: write buffered activity hits to the database in one batch.
+
+    Also rolls the level window once a day, so level reads stay current.
+    """
+    while True:
+        try:
+            await asyncio.sleep(ACTIVITY_FLUSH_INTERVAL_SECONDS)
+        except asyncio.CancelledError:
+            print('Activity flush scheduler cancelled.')
+            return
+
+        try:
+            await db.refresh_levels()
+        except Exception as e:
+            print(f'Error flushing activity buffer: {e}')
+
+async def schedule_wal_checkpoint():
+    """Background task: checkpoint the SQLite WAL so it stays small and backups stay fast."""
+    while True:
+        try:
+            await asyncio.sleep(DB_CHECKPOINT_INTERVAL_SECONDS)
+        except asyncio.CancelledError:
+            print('WAL checkpoint scheduler cancelled.')
+            return
+
+        try:
+            # PASSIVE never waits for readers or writers; frames still in use are picked up next time
+            busy, wal_frames, checkpointed_frames = await db.checkpoint('PASSIVE')
+            if busy or (wal_frames > 0 and checkpointed_frames < wal_frames):
+                print(f'WAL checkpoint incomplete: busy={busy} wal_frames={wal_frames} checkpointed={checkpointed_frames}')
+        except Exception as e:
+            print(f'Error during WAL checkpoint: {e}')
+
 # Autocomplete functions
 async def country_autocomplete(interaction: discord.Interaction, current: str):
     """Autocomplete for country selection."""
-    countries = db.get_all_countries()
-    # Add common countries
-    default_countries = ['Germany', 'Austria', 'Switzerland', 'England', 'Spain', 'Italy', 'France', 'Netherlands', 'Portugal', 'Belgium']
-    all_countries = list(set(countries + default_countries))
-    all_countries.sort()
-
-    # Filter based on current input
-    if current:
-        filtered = [c for c in all_countries if current.lower() in c.lower()]
-    else:
-        filtered = all_countries
-
-    return [app_commands.Choice(name=country, value=country) for country in filtered[:25]]
+    filtered = search_index.countries(current)
+    return [app_commands.Choice(name=country, value=country) for country in filtered]
 
 async def league_autocomplete(interaction: discord.Interaction, current: str):
     """Autocomplete for league selection."""
@@ -1688,15 +1714,8 @@ async def league_autocomplete(interaction: discord.Interaction, current: str):
     if not country:
         return []
 
-    leagues = db.get_leagues_by_country(country)
-
-    # Filter based on current input
-    if current:
-        filtered = [l for l in leagues if current.lower() in l.lower()]
-    else:
-        filtered = leagues
-
-    return [app_commands.Choice(name=league, value=league) for league in filtered[:25]]
+    filtered = search_index.leagues(country, current)
+    return [app_commands.Choice(name=league, value=league) for league in filtered]
 
 async def club_autocomplete(interaction: discord.Interaction, current: str):
     """Autocomplete for club selection."""
@@ -1707,31 +1726,18 @@ async def club_autocomplete(interaction: discord.Interaction, current: str):
     if not country:
         return []
 
-    if league:
-        clubs = db.get_clubs_by_country_and_league(country, league)
-    else:
-        clubs = db.get_clubs_by_country(country)
-
-    # Filter based on current input
-    if current:
-        filtered = [c for c in clubs if current.lower() in c.lower()]
-    else:
-        filtered = clubs
-
-    return [app_commands.Choice(name=club, value=club) for club in filtered[:25]]
+    filtered = search_index.clubs(country, league, current)
+    if not filtered and len(current.strip()) >= 3:
+        # Nothing contains the input: offer typo-tolerant matches, best first
+        matches = await db.search_clubs_fuzzy(current, limit=25, country=country, league=league)
+        filtered = [name for _, name, _ in matches]
+    return [app_commands.Choice(name=club, value=club) for club in filtered]
 
 # Autocomplete for tags
 async def tag_autocomplete(interaction: discord.Interaction, current: str):
     """Autocomplete for tag selection."""
-    all_tags = db.get_all_tags()
-
-    # Filter based on current input
-    if current:
-        filtered = [t for t in all_tags if current.lower() in t.lower()]
-    else:
-        filtered = all_tags
-
-    return [app_commands.Choice(name=tag, value=tag) for tag in filtered[:25]]
+    filtered = search_index.tags(current)
+    return [app_commands.Choice(name=tag, value=tag) for tag in filtered]
 
 # Slash command: /set-club
 @bot.tree.command(name="set-club", description="Set or update your home club", guild=discord.Object(id=GUILD_ID))
@@ -1752,10 +1758,10 @@ async def set_club_command(
     guild = interaction.guild
 
     # Create or find the club in the database
-    club_id, league_id = db.get_or_create_club(club)
+    club_id, league_id = await db.get_or_create_club(club)
 
     # Save profile
-    db.save_user_profile(guild.id, member.id, club_id)
+    await db.save_user_profile(guild.id, member.id, club_id)
 
     await interaction.followup.send(
         f"✅ Your club has been updated!\n\n"
@@ -1771,7 +1777,7 @@ async def set_club_command(
     # Remove newcomer role if present
     if role in member.roles:
         try:
-            await member.remove_roles(role, reason='User set club, removing newcomer role')
+            await outbound.remove_roles(member, role, reason='User set club, removing newcomer role', priority=INTERACTIVE)
             print(f'Removed newcomer role from {member}')
         except Exception as e:
             print(f'Error removing newcomer role from {member}: {e}')
@@ -1784,7 +1790,7 @@ async def set_club_command(
     if apprentice_role:
         try:
             if apprentice_role not in member.roles:
-                await member.add_roles(apprentice_role, reason='User set club, assign apprentice')
+                await outbound.add_roles(member, apprentice_role, reason='User set club, assign apprentice', priority=INTERACTIVE)
                 print(f'Assigned apprentice role to {member}')
         except Exception as e:
             print(f'Error assigning apprentice role to {member}: {e}')
@@ -1818,7 +1824,7 @@ async def update_league_command(
     await interaction.response.defer(ephemeral=True)
 
     # Get club information
-    club_id = db.get_club_id_by_name(club)
+    club_id = await db.get_club_id_by_name(club)
     
     if not club_id:
         await interaction.followup.send(
@@ -1828,13 +1834,13 @@ async def update_league_command(
         return
 
     # Get or create the league with tier
-    league_id = db.get_or_create_league(league, country, league_tier)
+    league_id = await db.get_or_create_league(league, country, league_tier)
 
     # Update league tier
-    db.update_league_tier(league_id, league_tier)
+    await db.update_league_tier(league_id, league_tier)
 
     # Update the club's league
-    db.update_club_league(club_id, league_id)
+    await db.update_club_league(club_id, league_id)
 
     await interaction.followup.send(
         f"✅ Club '{club}' has been updated!\n\n"
@@ -1855,28 +1861,30 @@ async def profile_command(interaction: discord.Interaction, member: discord.Memb
     if member is None:
         member = interaction.user
 
-    active_days = db.get_user_activity_days(member.id)
+    # Level reads return the last refresh; the profile shows the current state
+    await db.refresh_levels()
+    active_days = await db.get_user_activity_days(member.id)
 
-    club_id, created_at = db.get_user_profile(interaction.guild.id, member.id)
+    club_id, created_at = await db.get_user_profile(interaction.guild.id, member.id)
     if not club_id:
         await interaction.response.send_message(f"No profile found for {member.display_name}.", ephemeral=True)
         return
 
-    club = format_club_info(db.get_club_info(club_id))
+    club = await club_cache.get(club_id)
     if club:
-        club_text = " - ".join([club["name"], club["league"], club["flag"]])
+        club_text = " - ".join([club.name, club.league, club.flag])
         
         # Get user tags
-        tags = db.get_user_tags(member.id)
+        tags = await db.get_user_tags(member.id)
         tags_str = ', '.join(tags) if tags else 'No tags set'
-        level = db.get_user_level(member.id)
+        level = await db.get_user_level(member.id)
 
         embed = embed_for_club(club)
         embed.title=f"{member.display_name} ({level})"
         embed.add_field(name="⚽ Home club", value=club_text , inline=False)
         embed.add_field(name="🏷️ Tags", value=tags_str, inline=False)
         # Expert clubs
-        expert_names = db.get_expert_clubs(interaction.guild.id, member.id)
+        expert_names = await db.get_expert_clubs(interaction.guild.id, member.id)
         expert_list = ', '.join(expert_names) if len(expert_names) > 0 else 'No experts known'
         embed.add_field(name="Expert for", value=expert_list, inline=False)
         embed.add_field(name="📅 Active days", value=str(active_days), inline=False)
@@ -1902,7 +1910,7 @@ async def tags_command(interaction: discord.Interaction, tags: str):
         return
     
     # Save tags
-    db.save_user_tags(member.id, tag_list)
+    await db.save_user_tags(member.id, tag_list)
     
     await interaction.response.send_message(
         f"✅ Your tags have been updated!\n\n"
@@ -1926,13 +1934,13 @@ async def add_tag_command(interaction: discord.Interaction, tags: str):
         return
     
     # Get existing tags
-    existing_tags = db.get_user_tags(member.id)
+    existing_tags = await db.get_user_tags(member.id)
     
     # Add tags
-    db.add_user_tags(member.id, tag_list)
+    await db.add_user_tags(member.id, tag_list)
     
     # Get updated tags
-    updated_tags = db.get_user_tags(member.id)
+    updated_tags = await db.get_user_tags(member.id)
     
     await interaction.response.send_message(
         f"✅ Tags added successfully!\n\n"
@@ -1967,7 +1975,7 @@ async def club_members_command(interaction: discord.Interaction,
 
 
 async def show_club_members(interaction: discord.Interaction, club: str):
-    info = format_club_info(db.get_club_info(db.get_club_id_by_name(club)))
+    info = await club_cache.get(await db.get_club_id_by_name(club))
 
     if not info:
         await interaction.followup.send(f"❌ Club '{club}' not found in database.", ephemeral=True)
@@ -1978,32 +1986,34 @@ async def show_club_members(interaction: discord.Interaction, club: str):
         await interaction.followup.send('❌ Guild not available.', ephemeral=True)
         return
 
-    members_data = db.get_members_by_club_id(guild.id, info['club_id'])
+    members_data = await db.get_members_by_club_id(guild.id, info.club_id)
     member_ids = set(user_id for (user_id,) in members_data)
     apprentice_role = guild.get_role(APPRENTICE_ROLE_ID) if APPRENTICE_ROLE_ID else None
     apprentice_user_ids = set(m.id for m in apprentice_role.members) if apprentice_role else set()
 
+    levels = await db.get_user_levels(member_ids)
+
     member_mentions = []
     apprentice_mentions = []
     for (user_id,) in members_data:
         member = guild.get_member(user_id)
         if member:
-            level = db.get_user_level(user_id)
+            level = levels.get(user_id, 'Casual')
             if user_id in apprentice_user_ids:
                 apprentice_mentions.append(f"{member.mention} {level}")
             else:
                 member_mentions.append(f"{member.mention} {level}")
 
     embed = embed_for_club(info)
-    embed.title = f"⚽ {info['name']}"
-    embed.description = f"**League:** {info['league']} (Tier {info['tier']})\n**Country:** {info['country']} {info['flag']}"
+    embed.title = f"⚽ {info.name}"
+    embed.description = f"**League:** {info.league} (Tier {info.tier})\n**Country:** {info.country} {info.flag}"
     embed.add_field(
         name=f"Members ({len(member_mentions)})",
         value=", ".join(member_mentions) if member_mentions else "No members yet",
         inline=False
     )
 
-    expert_user_ids = set(db.get_expert_users_for_club(guild.id, info['club_id'])) - member_ids
+    expert_user_ids = set(await db.get_expert_users_for_club(guild.id, info.club_id)) - member_ids
     expert_mentions = []
     for uid in expert_user_ids:
         member = guild.get_member(uid)
@@ -2030,27 +2040,29 @@ async def show_club_members(interaction: discord.Interaction, club: str):
 
 async def show_club_info(interaction: discord.Interaction, club: str):
     # Get club information
-    info = format_club_info(db.get_club_info(db.get_club_id_by_name(club)))
+    info = await club_cache.get(await db.get_club_id_by_name(club))
     
     if not info:
         await interaction.followup.send(f"❌ Club '{club}' not found in database.", ephemeral=True)
         return
     
-    print(f"Showing info for club '{info['name']}' (ID: {info['club_id']}) with color {info['color']} and logo {info['club_logo']}")
+    print(f"Showing info for club '{info.name}' (ID: {info.club_id}) with color {info.color} and logo {info.club_logo}")
     # Get members of this club
     guild = interaction.guild
-    members_data = db.get_members_by_club_id(guild.id, info['club_id'])
+    members_data = await db.get_members_by_club_id(guild.id, info.club_id)
     member_ids = set(user_id for (user_id,) in members_data)
     apprentice_role = guild.get_role(APPRENTICE_ROLE_ID) if APPRENTICE_ROLE_ID else None
     apprentice_user_ids = set(m.id for m in apprentice_role.members) if apprentice_role else set()
 
+    levels = await db.get_user_levels(member_ids)
+
     # Build member list with levels
     member_mentions = []
     apprentice_mentions = []
     for (user_id,) in members_data:
         member = guild.get_member(user_id)
         if member:
-            level = db.get_user_level(user_id)
+            level = levels.get(user_id, 'Casual')
             if user_id in apprentice_user_ids:
                 apprentice_mentions.append(f"{member.mention} {level}")
             else:
@@ -2058,8 +2070,8 @@ async def show_club_info(interaction: discord.Interaction, club: str):
     
     # Create embed
     embed = embed_for_club(info)
-    embed.title = f"⚽ {info['name']}"
-    embed.description = f"**League:** {info['league']} (Tier {info['tier']})\n**Country:** {info['country']} {info['flag']}"
+    embed.title = f"⚽ {info.name}"
+    embed.description = f"**League:** {info.league} (Tier {info.tier})\n**Country:** {info.country} {info.flag}"
     
     embed.add_field(
         name=f"Members ({len(member_mentions)})",
@@ -2068,7 +2080,7 @@ async def show_club_info(interaction: discord.Interaction, club: str):
     )
 
     # Add experts (without medal emojis). Exclude users already listed as members.
-    expert_user_ids = set(db.get_expert_users_for_club(guild.id, info['club_id'])) - member_ids
+    expert_user_ids = set(await db.get_expert_users_for_club(guild.id, info.club_id)) - member_ids
     expert_mentions = []
     for uid in expert_user_ids:
         m = guild.get_member(uid)
@@ -2091,9 +2103,9 @@ async def show_club_info(interaction: discord.Interaction, club: str):
         )
     # Add ticketing info as a single grouped field
     
-    ticket_notes = info.get('ticket_notes', '')
-    ticket_price_range = info.get('ticket_price_range', '')
-    ticket_url = info.get('ticket_url', '')
+    ticket_notes = info.ticket_notes
+    ticket_price_range = info.ticket_price_range
+    ticket_url = info.ticket_url
     if ticket_notes or ticket_price_range or ticket_url:
         parts = []
         if ticket_price_range:
@@ -2106,11 +2118,11 @@ async def show_club_info(interaction: discord.Interaction, club: str):
 
     embeds = [embed]
 
-    stadium = format_stadium_info(db.get_stadium_info_for_club(info['club_id']))
+    stadium = format_stadium_info(await db.get_stadium_info_for_club(info.club_id))
     if stadium:
         stadium_embed = discord.Embed(
             title='🏟️ Stadium',
-            color=info['color']
+            color=info.color
         )
         stadium_embed.add_field(
             name='Name',
@@ -2133,7 +2145,7 @@ async def show_club_info(interaction: discord.Interaction, club: str):
 
         stadium_plan_embed = discord.Embed(
             title='🗺️ Stadium Plan',
-            color=info['color']
+            color=info.color
         )
         stadium_plan_embed.add_field(
             name='Block Description',
@@ -2162,7 +2174,7 @@ async def show_club_info(interaction: discord.Interaction, club: str):
 @app_commands.autocomplete(country=country_autocomplete, club=club_autocomplete)
 async def add_ticketinginfo_command(interaction: discord.Interaction, country: str, club: str):
     """Opens a modal to set ticketing notes, price range and URL for a club."""
-    club_id = db.get_club_id_by_name(club)
+    club_id = await db.get_club_id_by_name(club)
     if not club_id:
         await interaction.response.send_message(f"❌ Club '{club}' not found.", ephemeral=True)
         return
@@ -2178,8 +2190,8 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
             return '—'
         return str(value)
 
-    def _get_current_ticket_data(target_club_id: int):
-        club_info = db.get_club_info(target_club_id)
+    async def _get_current_ticket_data(target_club_id: int):
+        club_info = await db.get_club_info(target_club_id)
         notes = club_info[9] if club_info and len(club_info) > 9 else None
         price_range = club_info[10] if club_info and len(club_info) > 10 else None
         url = club_info[11] if club_info and len(club_info) > 11 else None
@@ -2189,7 +2201,7 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
             'ticket_url': url,
         }
 
-    def _apply_ticket_update(target_club_id: int, current_data: dict, proposed_data: dict, fields_to_apply: list[str]):
+    async def _apply_ticket_update(target_club_id: int, current_data: dict, proposed_data: dict, fields_to_apply: list[str]):
         ticket_notes = current_data.get('ticket_notes')
         ticket_price_range = current_data.get('ticket_price_range')
         ticket_url = current_data.get('ticket_url')
@@ -2201,7 +2213,7 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
         if 'ticket_url' in fields_to_apply:
             ticket_url = proposed_data.get('ticket_url')
 
-        db.update_club_ticket_info(target_club_id, ticket_notes, ticket_price_range, ticket_url)
+        await db.update_club_ticket_info(target_club_id, ticket_notes, ticket_price_range, ticket_url)
 
     class TicketFieldReviewView(discord.ui.View):
         def __init__(
@@ -2247,7 +2259,7 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
         async def _finish(self, interaction_obj: discord.Interaction):
             fields_to_apply = list(self.auto_apply_fields) + list(self.confirmed_fields)
             try:
-                _apply_ticket_update(self.club_id, self.current_data, self.proposed_data, fields_to_apply)
+                await _apply_ticket_update(self.club_id, self.current_data, self.proposed_data, fields_to_apply)
             except Exception as e:
                 print(f'Error applying reviewed ticket updates: {e}')
                 await interaction_obj.response.send_message('Error saving ticket information after review.', ephemeral=True)
@@ -2256,7 +2268,7 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
             for child in self.children:
                 child.disabled = True
             try:
-                await interaction_obj.message.edit(view=self)
+                await outbound.edit(interaction_obj.message, view=self, priority=INTERACTIVE)
             except Exception:
                 pass
 
@@ -2335,7 +2347,7 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
                 await modal_interaction.response.send_message('Invalid URL (must start with http:// or https://).', ephemeral=True)
                 return
 
-            current_data = _get_current_ticket_data(self.club_id)
+            current_data = await _get_current_ticket_data(self.club_id)
             proposed_data = {
                 'ticket_notes': notes if notes else None,
                 'ticket_price_range': price_range if price_range else None,
@@ -2366,7 +2378,7 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
 
             if not changed_fields and auto_apply_fields:
                 try:
-                    _apply_ticket_update(self.club_id, current_data, proposed_data, auto_apply_fields)
+                    await _apply_ticket_update(self.club_id, current_data, proposed_data, auto_apply_fields)
                 except Exception as e:
                     print(f'Error applying ticket auto fields: {e}')
                     await modal_interaction.response.send_message('Error saving ticket information.', ephemeral=True)
@@ -2410,12 +2422,12 @@ async def add_ticketinginfo_command(interaction: discord.Interaction, country: s
 @app_commands.autocomplete(country=country_autocomplete, club=club_autocomplete)
 async def add_stadiuminfo_command(interaction: discord.Interaction, country: str, club: str):
     print(f"StadiumInfo: command invoked by user={interaction.user} ({interaction.user.id}) for club='{club}' country='{country}'")
-    club_id = db.get_club_id_by_name(club)
+    club_id = await db.get_club_id_by_name(club)
     if not club_id:
         await interaction.response.send_message(f"❌ Club '{club}' not found.", ephemeral=True)
         return
 
-    existing_stadium = format_stadium_info(db.get_stadium_info_for_club(club_id))
+    existing_stadium = format_stadium_info(await db.get_stadium_info_for_club(club_id))
 
     field_labels = {
         'name': 'Name',
@@ -2489,8 +2501,8 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
 
             try:
                 if update_kwargs:
-                    db.update_stadium_info_partial(self.stadium_id, **update_kwargs)
-                db.link_club_to_stadium(self.club_id, self.stadium_id)
+                    await db.update_stadium_info_partial(self.stadium_id, **update_kwargs)
+                await db.link_club_to_stadium(self.club_id, self.stadium_id)
             except Exception as e:
                 print(f'Error applying reviewed stadium updates: {e}')
                 await interaction_obj.response.send_message('Error saving stadium information after review.', ephemeral=True)
@@ -2499,7 +2511,7 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
             for child in self.children:
                 child.disabled = True
             try:
-                await interaction_obj.message.edit(view=self)
+                await outbound.edit(interaction_obj.message, view=self, priority=INTERACTIVE)
             except Exception:
                 pass
 
@@ -2567,7 +2579,7 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
                 return
 
             try:
-                await button_interaction.message.edit(view=self)
+                await outbound.edit(button_interaction.message, view=self, priority=INTERACTIVE)
             except Exception:
                 pass
 
@@ -2617,7 +2629,7 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
                 await modal_interaction.response.send_message('Invalid stadium plan URL (must start with http:// or https://).', ephemeral=True)
                 return
 
-            current_data = format_stadium_info(db.get_stadium_info(self.stadium_id))
+            current_data = format_stadium_info(await db.get_stadium_info(self.stadium_id))
             if not current_data:
                 await modal_interaction.response.send_message('Could not load current stadium data for review.', ephemeral=True)
                 return
@@ -2651,7 +2663,7 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
 
             if not changed_fields and not auto_apply_fields:
                 try:
-                    db.link_club_to_stadium(self.club_id, self.stadium_id)
+                    await db.link_club_to_stadium(self.club_id, self.stadium_id)
                 except Exception as e:
                     print(f'Error linking club to stadium without field changes: {e}')
                     await modal_interaction.response.send_message('No fields changed, and linking failed.', ephemeral=True)
@@ -2670,8 +2682,8 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
             if not changed_fields and auto_apply_fields:
                 update_kwargs = {field_key: proposed_data.get(field_key) for field_key in auto_apply_fields}
                 try:
-                    db.update_stadium_info_partial(self.stadium_id, **update_kwargs)
-                    db.link_club_to_stadium(self.club_id, self.stadium_id)
+                    await db.update_stadium_info_partial(self.stadium_id, **update_kwargs)
+                    await db.link_club_to_stadium(self.club_id, self.stadium_id)
                 except Exception as e:
                     print(f'Error applying stadium auto fields: {e}')
                     await modal_interaction.response.send_message('Error saving stadium information.', ephemeral=True)
@@ -2775,7 +2787,7 @@ async def add_stadiuminfo_command(interaction: discord.Interaction, country: str
                 stadium_id = self.existing_stadium['stadium_id']
             elif stadium_name:
                 try:
-                    stadium_id = db.get_or_create_stadium(stadium_name)
+                    stadium_id = await db.get_or_create_stadium(stadium_name)
                 except Exception as e:
                     print(f'Error creating/finding stadium: {e}')
                     await modal_interaction.response.send_message('Could not create or resolve stadium name.', ephemeral=True)
@@ -2835,7 +2847,7 @@ async def set_clubicon_command(
     await interaction.response.defer(ephemeral=True)
 
     # Validate club exists
-    club_id = db.get_club_id_by_name(club)
+    club_id = await db.get_club_id_by_name(club)
     if not club_id:
         await interaction.followup.send(f"❌ Club '{club}' not found in the database.", ephemeral=True)
         return
@@ -2847,7 +2859,7 @@ async def set_clubicon_command(
 
     # Update the database
     try:
-        db.update_club_logo(club_id, logo_url)
+        await db.update_club_logo(club_id, logo_url)
     except Exception as e:
         await interaction.followup.send(f"❌ Failed to update logo: {e}", ephemeral=True)
         return
@@ -2876,7 +2888,7 @@ async def set_clubcolor_command(
     await interaction.response.defer(ephemeral=True)
 
     # Validate club exists
-    club_id = db.get_club_id_by_name(club)
+    club_id = await db.get_club_id_by_name(club)
     if not club_id:
         await interaction.followup.send(f"❌ Club '{club}' not found in the database.", ephemeral=True)
         return
@@ -2889,7 +2901,7 @@ async def set_clubcolor_command(
 
     # Update the database
     try:
-        db.update_club_color(club_id, color)
+        await db.update_club_color(club_id, color)
     except Exception as e:
         await interaction.followup.send(f"❌ Failed to update color: {e}", ephemeral=True)
         return
@@ -2909,9 +2921,9 @@ async def add_expert_club_command(interaction: discord.Interaction, country: str
     member = interaction.user
     guild = interaction.guild
 
-    club_id, _ = db.get_or_create_club(club)
+    club_id, _ = await db.get_or_create_club(club)
 
-    ok, reason = db.add_expert_club(guild.id, member.id, club_id)
+    ok, reason = await db.add_expert_club(guild.id, member.id, club_id)
     if not ok:
         if reason == 'already_exists':
             await interaction.followup.send(f"ℹ️ You already marked '{club}' as an expert club.", ephemeral=True)
@@ -2943,12 +2955,12 @@ async def remove_expert_club_command(interaction: discord.Interaction, country:
     member = interaction.user
     guild = interaction.guild
 
-    club_id = db.get_club_id_by_name(club)
+    club_id = await db.get_club_id_by_name(club)
     if not club_id:
         await interaction.followup.send(f"❌ Club '{club}' not found.", ephemeral=True)
         return
 
-    removed = db.remove_expert_club(guild.id, member.id, club_id)
+    removed = await db.remove_expert_club(guild.id, member.id, club_id)
     if removed:
         await interaction.followup.send(f"✅ Removed '{club}' from your expert clubs.", ephemeral=True)
     else:
@@ -2957,5 +2969,56 @@ async def remove_expert_club_command(interaction: discord.Interaction, country:
     # Update member list
     await post_member_list(interaction.guild)
 
+# Slash command: /add-club-alias
+@bot.tree.command(name="add-club-alias", description="Add a nickname or abbreviation for a club (used by groundhelp)", guild=discord.Object(id=GUILD_ID))
+@app_commands.describe(
+    country="The country of the club",
+    club="The club the alias belongs to",
+    alias="Nickname, abbreviation or alternative spelling (e.g. BVB)"
+)
+@app_commands.autocomplete(country=country_autocomplete, club=club_autocomplete)
+async def add_club_alias_command(interaction: discord.Interaction, country: str, club: str, alias: str):
+    await interaction.response.defer(ephemeral=True)
+
+    club_id = await db.get_club_id_by_name(club)
+    if not club_id:
+        await interaction.followup.send(f"❌ Club '{club}' not found in the database.", ephemeral=True)
+        return
+
+    ok, reason = await db.add_club_alias(club_id, alias)
+    if not ok:
+        if reason == 'empty':
+            await interaction.followup.send("❌ The alias must contain letters or digits.", ephemeral=True)
+        elif reason == 'is_club_name':
+            await interaction.followup.send(f"❌ '{alias}' is already the name of a club.", ephemeral=True)
+        elif reason == club_id:
+            await interaction.followup.send(f"ℹ️ '{alias}' is already an alias of '{club}'.", ephemeral=True)
+        else:
+            other_club = await club_cache.get(reason)
+            other = other_club.name if other_club else 'another club'
+            await interaction.followup.send(f"❌ '{alias}' is already an alias of '{other}'.", ephemeral=True)
+        return
+
+    aliases = [a for a, _ in await db.get_club_aliases(club_id)]
+    await interaction.followup.send(f"✅ Added alias '{alias}' for '{club}'.\n**Aliases:** {', '.join(aliases)}", ephemeral=True)
+
+# Slash command: /remove-club-alias
+@bot.tree.command(name="remove-club-alias", description="Remove a club alias", guild=discord.Object(id=GUILD_ID))
+@app_commands.describe(
+    alias="The alias to remove"
+)
+async def remove_club_alias_command(interaction: discord.Interaction, alias: str):
+    await interaction.response.defer(ephemeral=True)
+
+    club_id = await db.remove_club_alias(alias)
+    if not club_id:
+        await interaction.followup.send(f"ℹ️ '{alias}' is not a club alias.", ephemeral=True)
+        return
+
+    club_record = await club_cache.get(club_id)
+    club_name = club_record.name if club_record else club_id
+    await interaction.followup.send(f"✅ Removed alias '{alias}' from '{club_name}'.", ephemeral=True)
+
 # Start the bot
 bot.run(TOKEN)
+db.close()
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Line-up rendering and incremental channel updates.
+
+The line-up is rendered into an ordered list of sections, one per Discord
+message. The message IDs and content hashes of the posted sections are
+stored in the database, so a rebuild only edits, sends or deletes the
+messages whose content actually changed. A fingerprint over all sections
+lets a restart skip the channel entirely when nothing changed.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import discord
+
+from club_cache import ClubRecord
+from outbound import BULK
+
+# Discord message limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_TOTAL = 6000  # characters over all embeds of one message
+MAX_DESCRIPTION = 4096
+MAX_FIELD_VALUE = 1024
+MAX_FIELDS = 25
+
+
+@dataclass
+class LineupSection:
+    """One line-up message: optional text content plus up to 10 embeds."""
+    key: str
+    content: str = ''
+    embeds: list = field(default_factory=list)
+
+    def payload(self):
+        """Returns the message payload as plain data (used for hashing)."""
+        return {
+            'content': self.content,
+            'embeds': [embed.to_dict() for embed in self.embeds],
+        }
+
+    @cached_property
+    def content_hash(self):
+        raw = json.dumps(self.payload(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+@dataclass(slots=True)
+class LineupClub:
+    """A club in the line-up with the rendered member entries.
+
+    roster holds the same people as (member, kind, level) tuples, kind being
+    'member', 'expert' or 'apprentice'; it is used by lineup_export.
+    """
+    club: ClubRecord
+    members: list = field(default_factory=list)
+    experts: list = field(default_factory=list)
+    apprentices: list = field(default_factory=list)
+    roster: list = field(default_factory=list)
+
+    @property
+    def has_entries(self):
+        return bool(self.members or self.experts or self.apprentices)
+
+
+def nbsp(text):
+    """Replaces all regular spaces with non-breaking spaces."""
+    return text.replace(' ', '\u00A0')
+
+
+def collect_lineup_clubs(guild, snapshot, records, apprentice_user_ids):
+    """Groups the guild members into the clubs of the line-up.
+
+    Args:
+        guild: The guild (members and get_member are used)
+        snapshot: Dict from HopperDatabase.get_lineup_snapshot()
+        records: ClubRecord list for snapshot['clubs'], in display order
+        apprentice_user_ids: Set of user IDs with the apprentice role
+
+    Returns:
+        Tuple (clubs, club_ids): dict club_id -> LineupClub and the IDs of the
+        clubs with at least one entry, in display order
+    """
+    levels = snapshot['levels']
+    clubs = {}
+    club_ids = []
+    for club in records:
+        clubs[club.club_id] = LineupClub(club)
+        club_ids.append(club.club_id)
+
+    home_clubs = dict(snapshot['profiles'])
+    for member in guild.members:
+        if member.bot:
+            continue  # Skip bots
+        club = clubs.get(home_clubs.get(member.id))
+        if not club:
+            continue  # Skip members without a club
+
+        lvl = levels.get(member.id, 'Casual')
+        if member.id in apprentice_user_ids:
+            club.apprentices.append(nbsp(f'{member.mention} {lvl}'))
+            club.roster.append((member, 'apprentice', lvl))
+        else:
+            club.members.append(nbsp(f'{member.mention} 🥇 {lvl}'))
+            club.roster.append((member, 'member', lvl))
+
+    for (user_id, club_id) in snapshot['experts']:
+        member_obj = guild.get_member(user_id)
+        if not member_obj:
+            continue
+        club = clubs.get(club_id)
+        if not club:
+            continue
+
+        lvl = levels.get(user_id, 'Casual')
+        if user_id in apprentice_user_ids:
+            club.apprentices.append(nbsp(f'{member_obj.mention} {lvl}'))
+            club.roster.append((member_obj, 'apprentice', lvl))
+        else:
+            club.experts.append(nbsp(f'{member_obj.mention} 🥈 {lvl}'))
+            club.roster.append((member_obj, 'expert', lvl))
+
+    # Clubs whose members all left the server are not shown
+    club_ids = [club_id for club_id in club_ids if clubs[club_id].has_entries]
+    return clubs, club_ids
+
+
+def _chunk_entries(entries, first_limit, limit):
+    """Joins entries with ", " into chunks; the first chunk holds up to `first_limit`
+    characters, every further chunk up to `limit`. Entries are never split."""
+    chunks = []
+    current = ''
+    for entry in entries:
+        candidate = f'{current}, {entry}' if current else entry
+        if current and len(candidate) > (limit if chunks else first_limit):
+            chunks.append(current)
+            current = entry
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def club_lineup_embeds(entry):
+    """Creates the line-up embeds for a LineupClub.
+
+    Usually this is a single embed. Members beyond the description limit
+    continue in fields, long expert and apprentice lists are split over
+    several fields, and a club that exceeds the per-message character budget
+    continues in further embeds.
+
+    Returns:
+        List of discord.Embed
+    """
+    club = entry.club
+    members = _chunk_entries(entry.members, MAX_DESCRIPTION, MAX_FIELD_VALUE)
+    fields = [('Members (cont.)', chunk) for chunk in members[1:]]
+    for title, entries in ((f'Experts ({len(entry.experts)})', entry.experts),
+                           (f'Apprentice ({len(entry.apprentices)})', entry.apprentices)):
+        for i, chunk in enumerate(_chunk_entries(entries, MAX_FIELD_VALUE, MAX_FIELD_VALUE)):
+            fields.append((title if i == 0 else f'{title.split(" (")[0]} (cont.)', chunk))
+
+    embed = discord.Embed(color=club.color)
+    if club.club_logo != "":
+        embed.set_thumbnail(url=club.club_logo)
+    embed.description = members[0] if members else ""
+    embed.set_author(name=f"{club.name} ({len(entry.members)})")
+    embeds = [embed]
+    size = len(embed)
+    for name, value in fields:
+        if len(embed.fields) >= MAX_FIELDS or size + len(name) + len(value) > MAX_EMBED_TOTAL:
+            embed = discord.Embed(color=club.color)
+            embed.set_author(name=f"{club.name} (cont.)")
+            embeds.append(embed)
+            size = len(embed)
+        embed.add_field(name=name, value=value, inline=False)
+        size += len(name) + len(value)
+    return embeds
+
+
+def pack_embeds(embeds):
+    """Packs embeds, in order, into as few messages as Discord's limits allow.
+
+    A message takes embeds until the next one would exceed the embed count or
+    the character total. Filling each message before starting the next gives
+    the fewest messages for a fixed order.
+
+    Args:
+        embeds: List of discord.Embed in display order
+
+    Returns:
+        List of embed lists, one per message
+    """
+    messages = []
+    current = []
+    size = 0
+    for embed in embeds:
+        length = len(embed)
+        if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or size + length > MAX_EMBED_TOTAL):
+            messages.append(current)
+            current = []
+            size = 0
+        current.append(embed)
+        size += length
+    if current:
+        messages.append(current)
+    return messages
+
+
+def build_lineup_sections(header, clubs, club_ids):
+    """Renders the line-up into ordered message sections.
+
+    The country heading goes into the text of the first league message of
+    the country, and the club embeds of a league are packed with pack_embeds.
+
+    Args:
+        header: Text of the first line-up message
+        clubs: Dict club_id -> LineupClub
+        club_ids: Club IDs in display order (country, league tier)
+
+    Returns:
+        List of LineupSection
+    """
+    sections = [LineupSection(key='header', content=header)]
+    seen_keys = {}
+
+    def unique_key(key):
+        # Leagues can show up more than once if the order interleaves them
+        count = seen_keys.get(key, 0)
+        seen_keys[key] = count + 1
+        return f'{key}#{count}' if count else key
+
+    def add_league_sections(country, league, msg, embeds):
+        group_key = unique_key(f'league:{country}:{league}')
+        for i, message_embeds in enumerate(pack_embeds(embeds)):
+            sections.append(LineupSection(
+                key=f'{group_key}:{i}',
+                content=msg if i == 0 else '',
+                embeds=message_embeds,
+            ))
+
+    country = ""
+    league = ""
+    country_heading = ""
+    msg = ""
+    embeds = []
+    for club_id in club_ids:
+        if club_id not in clubs:
+            continue
+        entry = clubs[club_id]
+        club = entry.club
+
+        if club.league != league or club.country != country:
+            if len(embeds) > 0:
+                add_league_sections(country, league, msg, embeds)
+                embeds = []
+
+        if club.country != country:
+            country = club.country
+            country_heading = f'═══ {country} {club.flag} ═══\n'
+            league = None  # Every country starts a new league message
+
+        if club.league != league:
+            league = club.league
+            msg = f"{country_heading}\n**{league}**\n"
+            country_heading = ""
+
+        embeds.extend(club_lineup_embeds(entry))
+
+    if len(embeds) > 0:
+        add_league_sections(country, league, msg, embeds)
+
+    return sections
+
+
+def parse_lineup_shards(value):
+    """Parses the LINE_UP_SHARDS setting into a dict country -> channel ID.
+
+    Format: "Germany=123;England,Scotland,Wales=456;*=789". Countries that are
+    not listed go to the "*" channel (or the default line-up channel).
+
+    Raises:
+        ValueError: If an entry has no "=" or the channel ID is not a number
+    """
+    shards = {}
+    for entry in value.split(';'):
+        if not entry.strip():
+            continue
+        countries, separator, channel_id = entry.rpartition('=')
+        if not separator or not channel_id.strip().isdigit():
+            raise ValueError(f'Invalid LINE_UP_SHARDS entry: {entry!r}')
+        for country in countries.split(','):
+            if country.strip():
+                shards[country.strip()] = int(channel_id)
+    return shards
+
+
+def split_lineup_shards(clubs, club_ids, shards, default_channel_id):
+    """Splits the line-up clubs by the channel their country is mapped to.
+
+    Args:
+        clubs: Dict club_id -> LineupClub
+        club_ids: Club IDs in display order
+        shards: Dict country -> channel ID from parse_lineup_shards (may be empty)
+        default_channel_id: Channel of unlisted countries if there is no "*" entry
+
+    Returns:
+        Dict channel_id -> club IDs in display order. Every configured channel
+        is included, so a shard whose clubs are gone gets cleared.
+    """
+    default_channel_id = shards.get('*', default_channel_id)
+    result = {default_channel_id: []}
+    for channel_id in shards.values():
+        result.setdefault(channel_id, [])
+    for club_id in club_ids:
+        result[shards.get(clubs[club_id].club.country, default_channel_id)].append(club_id)
+    return result
+
+
+def render_lineup(guild, snapshot, records, apprentice_user_ids, shards, default_channel_id):
+    """Renders a line-up snapshot into the message sections of every line-up channel.
+
+    This is the whole in-memory part of a rebuild: the members are grouped
+    into clubs, the clubs are split over the channels and every channel is
+    rendered. The main channel (the "*" shard, or default_channel_id) gets
+    the header with the member count; the other channels list their
+    countries instead, so a member joining does not edit every shard.
+
+    Args:
+        guild: The guild (name, member_count, members and get_member are used)
+        snapshot: Dict from HopperDatabase.get_lineup_snapshot()
+        records: ClubRecord list for snapshot['clubs'], in display order
+        apprentice_user_ids: Set of user IDs with the apprentice role
+        shards: Dict country -> channel ID from parse_lineup_shards (may be empty)
+        default_channel_id: Line-up channel of unlisted countries if there is no "*" entry
+
+    Returns:
+        Tuple (clubs, club_ids, sections): clubs and club_ids as returned by
+        collect_lineup_clubs, sections a dict channel_id -> list of LineupSection
+    """
+    clubs, club_ids = collect_lineup_clubs(guild, snapshot, records, apprentice_user_ids)
+    main_channel_id = shards.get('*', default_channel_id)
+    sections = {}
+    for channel_id, shard_club_ids in split_lineup_shards(clubs, club_ids, shards, default_channel_id).items():
+        if channel_id == main_channel_id:
+            header = f"**Server: {guild.name}**\n**Number of members: {guild.member_count}**"
+        else:
+            countries = [country for country, shard_id in shards.items() if shard_id == channel_id]
+            header = f"**Server: {guild.name}**\n**Line-up: {', '.join(countries)}**"
+        sections[channel_id] = build_lineup_sections(header, clubs, shard_club_ids)
+    return clubs, club_ids, sections
+
+
+def lineup_fingerprint(sections):
+    """Returns one hash over the keys and content hashes of all sections, in order."""
+    digest = hashlib.sha256()
+    for section in sections:
+        digest.update(f'{section.key}\0{section.content_hash}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _fingerprint_state_key(channel_id):
+    return f'lineup_fingerprint:{channel_id}'
+
+
+async def _existing_message_ids(channel, limit):
+    """Returns the IDs of the newest `limit` messages in the channel."""
+    return {message.id async for message in channel.history(limit=limit)}
+
+
+async def _send_section(channel, section, outbound=None):
+    kwargs = {'embeds': section.embeds, 'allowed_mentions': discord.AllowedMentions.none()}
+    if outbound:
+        return await outbound.send(channel, section.content or None, priority=BULK, **kwargs)
+    return await channel.send(section.content or None, **kwargs)
+
+
+async def _edit_section(channel, message_id, section, outbound=None):
+    message = channel.get_partial_message(message_id)
+    kwargs = {
+        'content': section.content or None,
+        'embeds': section.embeds,
+        'allowed_mentions': discord.AllowedMentions.none(),
+    }
+    if outbound:
+        await outbound.edit(message, priority=BULK, **kwargs)
+    else:
+        await message.edit(**kwargs)
+
+
+async def _delete_message(channel, message_id, outbound=None):
+    message = channel.get_partial_message(message_id)
+    try:
+        if outbound:
+            await outbound.delete(message, priority=BULK)
+        else:
+            await message.delete()
+    except discord.NotFound:
+        pass
+
+
+def _plan_updates(stored, sections):
+    """Plans which messages to delete, edit and send.
+
+    Messages are slots: section i goes into the i-th remaining message.
+    Two plans are compared and the one with fewer API calls wins:
+    reuse every slot in place, or first delete messages whose section
+    disappeared (keeps the order without shifting the following messages).
+
+    Returns:
+        Tuple (to_delete, slots) where slots is the list of surviving stored rows
+    """
+    def cost(slots, deletes):
+        calls = deletes
+        for i, section in enumerate(sections):
+            if i >= len(slots):
+                calls += 1
+            elif slots[i][2] != section.content_hash:
+                calls += 1
+        return calls + max(0, len(slots) - len(sections))
+
+    new_keys = {section.key for section in sections}
+    vanished = [row for row in stored if row[0] not in new_keys]
+    kept = [row for row in stored if row[0] in new_keys]
+
+    if vanished and cost(kept, len(vanished)) < cost(stored, 0):
+        return vanished, kept
+    return [], list(stored)
+
+
+async def _sync_incremental(channel, sections, db, stored, fingerprint, state_key, stats, outbound):
+    """Edits, sends and deletes only what changed. Raises discord.NotFound if a stored message is gone.
+
+    The saved rows keep the channel order: rows whose delete failed stay at
+    their position (their section key is unknown or their slot surplus, so
+    the next plan deletes them again), failed edits keep the old hash and a
+    failed send stops the appends, since later messages would end up out of
+    order.
+    """
+    to_delete, slots = _plan_updates(stored, sections)
+    kept = {}  # message_id -> row saved at the message's stored position
+
+    async def delete(row):
+        try:
+            await _delete_message(channel, row[1], outbound)
+            stats['deleted'] += 1
+        except discord.HTTPException as e:
+            print(f'Error deleting line-up message {row[1]}: {e}')
+            stats['failed'] += 1
+            kept[row[1]] = row
+
+    for row in to_delete:
+        await delete(row)
+
+    new_rows = []
+    for i, section in enumerate(sections):
+        if i < len(slots):
+            message_id, old_hash = slots[i][1], slots[i][2]
+            new_hash = section.content_hash
+            if old_hash != new_hash:
+                try:
+                    await _edit_section(channel, message_id, section, outbound)
+                    stats['edited'] += 1
+                except discord.NotFound:
+                    raise
+                except discord.HTTPException as e:
+                    print(f'Error editing line-up message {message_id}: {e}')
+                    stats['failed'] += 1
+                    new_hash = old_hash
+            else:
+                stats['unchanged'] += 1
+            kept[message_id] = (section.key, message_id, new_hash)
+        else:
+            try:
+                message = await _send_section(channel, section, outbound)
+            except discord.HTTPException as e:
+                print(f'Error sending line-up section {section.key}: {e}')
+                stats['failed'] += len(sections) - i
+                break
+            stats['sent'] += 1
+            new_rows.append((section.key, message.id, section.content_hash))
+
+    for row in slots[len(sections):]:
+        await delete(row)
+
+    rows = [kept[row[1]] for row in stored if row[1] in kept] + new_rows
+    await db.save_lineup_messages(channel.id, rows)
+    await db.set_state(state_key, None if stats['failed'] else fingerprint)
+    return stats
+
+
+async def sync_lineup_channel(channel, sections, db, purge_limit=100, verify=False, outbound=None):
+    """Brings the line-up channel in line with `sections`.
+
+    Only changed sections are edited; sections that appear are sent and
+    sections that disappear are deleted. Falls back to a full repost when no
+    message map is stored, a stored message no longer exists or the verify
+    read fails. Other API errors only skip the affected call: its stored row
+    is kept unchanged (or stays marked for deletion), so the next run retries
+    it, and the fingerprint is not stored.
+
+    Args:
+        channel: The line-up text channel
+        sections: List of LineupSection in display order
+        db: AsyncHopperDatabase used to load and store the message map
+        purge_limit: Minimum number of messages removed before a full repost;
+            raised to the size of the stored or new line-up
+        verify: Check that the stored messages still exist (one history read),
+            e.g. after a restart; missing messages are re-sent in place
+        outbound: Optional OutboundQueue; sends, edits, deletes and the purge
+            then run through it as bulk work
+
+    Returns:
+        Dict with counters: edited, sent, deleted, unchanged, missing, failed,
+        plus the flags skipped (fingerprint matched) and reposted
+    """
+    stats = {'edited': 0, 'sent': 0, 'deleted': 0, 'unchanged': 0, 'missing': 0, 'failed': 0,
+             'skipped': False, 'reposted': False}
+    fingerprint = lineup_fingerprint(sections)
+    state_key = _fingerprint_state_key(channel.id)
+    stored = await db.get_lineup_messages(channel.id)
+    # A repost has to clear line-ups longer than the default purge limit
+    purge_limit = max(purge_limit, len(stored), len(sections))
+
+    if stored and verify:
+        try:
+            existing = await _existing_message_ids(channel, len(stored) + purge_limit)
+        except discord.HTTPException as e:
+            print(f'Could not verify line-up messages in channel {channel.name}: {e}. Reposting the full line-up.')
+            existing = set()
+        missing = [row for row in stored if row[1] not in existing]
+        if missing:
+            stats['missing'] = len(missing)
+            print(f'{len(missing)} line-up message(s) missing in channel {channel.name}.')
+            stored = [row for row in stored if row[1] in existing]
+
+    if stored and not stats['missing'] and fingerprint == await db.get_state(state_key):
+        stats['unchanged'] = len(stored)
+        stats['skipped'] = True
+        return stats
+
+    if stored:
+        try:
+            return await _sync_incremental(channel, sections, db, stored, fingerprint, state_key, stats, outbound)
+        except discord.NotFound:
+            print(f'Line-up message missing in channel {channel.id}, reposting the full line-up.')
+
+    # Full repost: clear the channel and send every section
+    stats.update({'edited': 0, 'sent': 0, 'deleted': 0, 'unchanged': 0, 'reposted': True})
+    await db.save_lineup_messages(channel.id, [])
+    await db.set_state(state_key, None)
+    try:
+        if outbound:
+            await outbound.purge(channel, limit=purge_limit)
+        else:
+            await channel.purge(limit=purge_limit)
+        print(f'Messages in channel {channel.name} deleted.')
+    except Exception as e:
+        print(f'Error deleting messages: {e}')
+
+    rows = []
+    for section in sections:
+        message = await _send_section(channel, section, outbound)
+        rows.append((section.key, message.id, section.content_hash))
+        stats['sent'] += 1
+    await db.save_lineup_messages(channel.id, rows)
+    await db.set_state(state_key, fingerprint)
+    return stats
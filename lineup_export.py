@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Static JSON and HTML snapshot of the line-up.
+
+The exporter takes the same clubs the line-up channel shows and writes:
+
+    <directory>/lineup.json            the whole line-up
+    <directory>/countries/<name>.json  one file per country
+    <directory>/index.html             a searchable page with all countries
+
+Exports are incremental: every country is hashed, only changed countries are
+re-rendered and rewritten, and nothing is written when nothing changed.
+Files are replaced atomically, so a web server never serves a half-written
+file.
+"""
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+_KINDS = ('member', 'expert', 'apprentice')
+
+_PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 1rem auto; max-width: 60rem; padding: 0 1rem; }}
+input {{ font-size: 1rem; padding: .4rem; width: 100%; box-sizing: border-box; }}
+.club {{ border-left: 4px solid var(--color); margin: .5rem 0; padding: .3rem .6rem; }}
+.club img {{ height: 2rem; vertical-align: middle; margin-right: .4rem; }}
+.club h4 {{ margin: .2rem 0; }}
+.people span {{ white-space: nowrap; margin-right: .8rem; }}
+.expert::before {{ content: "🥈 "; }}
+.member::before {{ content: "🥇 "; }}
+.apprentice::before {{ content: "🔰 "; }}
+small {{ color: #666; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p><small>{summary} · generated {generated_at}</small></p>
+<input id="search" type="search" placeholder="Search clubs, leagues, countries and members">
+{countries}
+<script>
+document.getElementById('search').addEventListener('input', function () {{
+  var query = this.value.toLowerCase();
+  document.querySelectorAll('.club').forEach(function (club) {{
+    club.hidden = query !== '' && club.textContent.toLowerCase().indexOf(query) < 0;
+  }});
+  document.querySelectorAll('section, .league').forEach(function (group) {{
+    group.hidden = group.querySelector('.club:not([hidden])') === null;
+  }});
+}});
+</script>
+</body>
+</html>
+'''
+
+
+def lineup_dataset(clubs, club_ids):
+    """Converts the line-up clubs into plain data, grouped by country and league.
+
+    Args:
+        clubs: Dict club_id -> lineup.LineupClub
+        club_ids: Club IDs in display order
+
+    Returns:
+        List of country dicts (name, flag, leagues -> clubs -> people) in display order
+    """
+    countries = {}
+    for club_id in club_ids:
+        club = clubs[club_id].club
+        if club.country not in countries:
+            countries[club.country] = {'name': club.country, 'flag': club.flag, 'leagues': []}
+        leagues = countries[club.country]['leagues']
+        if not leagues or leagues[-1]['name'] != club.league:
+            leagues.append({'name': club.league, 'tier': club.tier, 'logo': club.league_logo or None, 'clubs': []})
+        people = {f'{kind}s': [] for kind in _KINDS}
+        for member, kind, level in clubs[club_id].roster:
+            people[f'{kind}s'].append({
+                'id': member.id,
+                'name': getattr(member, 'display_name', member.name),
+                'level': level,
+            })
+        leagues[-1]['clubs'].append({
+            'id': club.club_id,
+            'name': club.name,
+            'logo': club.club_logo or None,
+            'color': str(club.color),
+            **people,
+        })
+    return list(countries.values())
+
+
+def _file_name(country, taken):
+    """Returns the file name (without .json) of a country.
+
+    Names that reduce to a name already in `taken` (e.g. "Côte d'Ivoire" and
+    "Cote d Ivoire") get a suffix from a hash of the full name instead of
+    overwriting the other country's file.
+    """
+    name = re.sub(r'[^a-z0-9]+', '-', country.lower()).strip('-') or 'unknown'
+    if name in taken:
+        name = f"{name}-{hashlib.sha1(country.encode('utf-8')).hexdigest()[:8]}"
+    return name
+
+
+def _write_atomic(path, text):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _render_country(country):
+    """Renders one country as an HTML <section>."""
+    parts = [f'<section><h2>{html.escape(country["name"])} {html.escape(country["flag"] or "")}</h2>']
+    for league in country['leagues']:
+        parts.append(f'<div class="league"><h3>{html.escape(league["name"] or "")}</h3>')
+        for club in league['clubs']:
+            logo = f'<img src="{html.escape(club["logo"])}" alt="" loading="lazy">' if club['logo'] else ''
+            people = ''.join(
+                f'<span class="{kind}">{html.escape(person["name"])} <small>{html.escape(person["level"])}</small></span>'
+                for kind in _KINDS for person in club[f'{kind}s'])
+            count = len(club['members'])
+            parts.append(f'<div class="club" style="--color: {html.escape(club["color"])}">'
+                         f'<h4>{logo}{html.escape(club["name"])} ({count})</h4>'
+                         f'<div class="people">{people}</div></div>')
+        parts.append('</div>')
+    parts.append('</section>')
+    return '\n'.join(parts)
+
+
+class LineupExporter:
+    """Writes the line-up snapshot to a directory, rewriting only what changed.
+
+    Args:
+        directory: Output directory (created if missing)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._countries = {}  # file name -> (hash, rendered HTML)
+        self._fingerprint = None
+        self._cleaned = False  # files left by an earlier process are removed on the first export
+
+    def export(self, title, countries):
+        """Writes the snapshot for a dataset from lineup_dataset().
+
+        Runs blocking file I/O; call it through asyncio.to_thread from the bot.
+
+        Args:
+            title: Page title, e.g. the server name
+            countries: List of country dicts from lineup_dataset()
+
+        Returns:
+            Dict with counters: countries, changed, removed and the flag written
+        """
+        with self._lock:
+            os.makedirs(os.path.join(self.directory, 'countries'), exist_ok=True)
+            stats = {'countries': len(countries), 'changed': 0, 'removed': 0, 'written': False}
+
+            seen = {}
+            for country in countries:
+                name = _file_name(country['name'], seen)
+                raw = json.dumps(country, ensure_ascii=False, sort_keys=True)
+                digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+                cached = self._countries.get(name)
+                if cached is None or cached[0] != digest:
+                    _write_atomic(os.path.join(self.directory, 'countries', f'{name}.json'), raw)
+                    cached = (digest, _render_country(country))
+                    stats['changed'] += 1
+                seen[name] = cached
+
+            previous = set(self._countries)
+            if not self._cleaned:
+                previous.update(file[:-5] for file in os.listdir(os.path.join(self.directory, 'countries'))
+                                if file.endswith('.json'))
+                self._cleaned = True
+            for name in previous - set(seen):
+                stats['removed'] += 1
+                try:
+                    os.remove(os.path.join(self.directory, 'countries', f'{name}.json'))
+                except FileNotFoundError:
+                    pass
+            self._countries = seen
+
+            fingerprint = hashlib.sha256(
+                '\n'.join([title] + [f'{name}\0{digest}' for name, (digest, _) in seen.items()]).encode('utf-8')
+            ).hexdigest()
+            if fingerprint == self._fingerprint:
+                return stats
+
+            generated_at = datetime.now().isoformat(timespec='seconds')
+            _write_atomic(os.path.join(self.directory, 'lineup.json'), json.dumps(
+                {'title': title, 'generated_at': generated_at, 'countries': countries}, ensure_ascii=False))
+            clubs = sum(len(league['clubs']) for country in countries for league in country['leagues'])
+            people = sum(len(club[f'{kind}s']) for country in countries for league in country['leagues']
+                         for club in league['clubs'] for kind in _KINDS)
+            _write_atomic(os.path.join(self.directory, 'index.html'), _PAGE.format(
+                title=html.escape(title),
+                summary=f'{len(countries)} countries, {clubs} clubs, {people} entries',
+                generated_at=generated_at,
+                countries='\n'.join(rendered for _, rendered in seen.values()),
+            ))
+            self._fingerprint = fingerprint
+            stats['written'] = True
+            return stats
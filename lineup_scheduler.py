@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Debounced line-up rebuilds.
+
+Callers only mark the line-up as dirty. A single worker task waits until no
+new request arrived for a quiet window, then runs one rebuild for all of
+them. Rebuilds never overlap and are capped per hour.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+
+
+class LineupScheduler:
+    """Coalesces line-up rebuild requests into as few rebuilds as possible.
+
+    Args:
+        rebuild: Coroutine function called with the guild to rebuild the line-up
+        quiet_seconds: Seconds without new requests before a rebuild starts
+        max_delay_seconds: Upper bound for the delay of a request while requests keep coming in
+        max_per_hour: Maximum number of rebuilds per rolling hour (0 = unlimited)
+    """
+
+    def __init__(self, rebuild, quiet_seconds=30, max_delay_seconds=300, max_per_hour=12):
+        self.rebuild = rebuild
+        self.quiet_seconds = quiet_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.max_per_hour = max_per_hour
+
+        self._guild = None
+        self._dirty = False
+        self._immediate = False
+        self._first_request = None
+        self._last_request = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = False
+        self._runs = deque()  # monotonic start times of rebuilds in the last hour
+
+        self.requests = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_requested_at = None
+        self.last_started_at = None
+        self.last_finished_at = None
+        self.last_duration = None
+        self.last_error = None
+
+    def request(self, guild, immediate=False):
+        """Marks the line-up as dirty and makes sure the worker runs.
+
+        Args:
+            guild: The guild whose line-up should be rebuilt
+            immediate: Skip the quiet window (e.g. at startup); the hourly cap still applies
+        """
+        now = time.monotonic()
+        self.requests += 1
+        if self._dirty:
+            self.coalesced += 1
+        else:
+            self._first_request = now
+        self._guild = guild
+        self._dirty = True
+        self._immediate = self._immediate or immediate
+        self._last_request = now
+        self.last_requested_at = datetime.now()
+        self._wakeup.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    def _wait_time(self):
+        """Returns the seconds until the pending rebuild may start (0 = now)."""
+        now = time.monotonic()
+        wait = 0.0
+        if not self._immediate:
+            wait = self._last_request + self.quiet_seconds - now
+            wait = min(wait, self._first_request + self.max_delay_seconds - now)
+
+        while self._runs and self._runs[0] <= now - 3600:
+            self._runs.popleft()
+        if self.max_per_hour and len(self._runs) >= self.max_per_hour:
+            wait = max(wait, self._runs[0] + 3600 - now)
+        return max(0.0, wait)
+
+    async def _worker(self):
+        while self._dirty:
+            wait = self._wait_time()
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    # A new request restarts the quiet window, so re-check when one arrives
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            guild = self._guild
+            self._dirty = False
+            self._immediate = False
+            self._running = True
+            self._runs.append(time.monotonic())
+            self.last_started_at = datetime.now()
+            started = time.monotonic()
+            try:
+                await self.rebuild(guild)
+                self.completed += 1
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                self.last_error = str(e)
+                print(f'Error rebuilding line-up: {e}')
+            finally:
+                self._running = False
+                self.last_duration = time.monotonic() - started
+                self.last_finished_at = datetime.now()
+
+    def cancel(self):
+        """Stops the worker task; pending requests are dropped."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def status(self):
+        """Returns the scheduler state for monitoring.
+
+        Returns:
+            Dict with pending/running flags, the next planned start and run counters
+        """
+        next_run_in = self._wait_time() if self._dirty else None
+        return {
+            'pending': self._dirty,
+            'running': self._running,
+            'next_run_in': next_run_in,
+            'runs_last_hour': len(self._runs),
+            'max_per_hour': self.max_per_hour,
+            'quiet_seconds': self.quiet_seconds,
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'completed': self.completed,
+            'failed': self.failed,
+            'last_requested_at': self.last_requested_at,
+            'last_started_at': self.last_started_at,
+            'last_finished_at': self.last_finished_at,
+            'last_duration': self.last_duration,
+            'last_error': self.last_error,
+        }
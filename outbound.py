@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Central queue for outgoing Discord messages, edits, deletes and role changes.
+
+Every call is submitted with a route (e.g. "messages:<channel_id>") and a
+priority. The dispatcher runs the most urgent call whose route and the
+global bucket have a token, so interactive replies overtake queued bulk work
+such as line-up rebuilds, and bulk work runs as fast as the limits allow.
+
+Buckets start with conservative limits and follow Discord's X-RateLimit-*
+headers, which are read through an aiohttp trace hook on the bot's HTTP
+session (see trace_config). A 429 pauses the route and re-queues the call.
+"""
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+
+import aiohttp
+import discord
+
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', NORMAL: 'normal', BULK: 'bulk'}
+
+# Starting limits per route kind as (requests, seconds); the capacity follows
+# X-RateLimit-Limit once Discord answered a request on the route
+ROUTE_LIMITS = {
+    'messages': (5, 5.0),  # send and edit in one channel
+    'delete': (5, 1.0),
+    'roles': (10, 10.0),  # role changes in one guild
+    'dm': (5, 5.0),
+}
+DEFAULT_ROUTE_LIMIT = (5, 5.0)
+GLOBAL_LIMIT = (50, 1.0)
+
+# Global tokens bulk work leaves for interactive calls
+INTERACTIVE_RESERVE = 5
+
+_ROUTE_PATTERNS = [
+    ('DELETE', re.compile(r'/channels/(\d+)/messages/\d+$'), 'delete'),
+    (None, re.compile(r'/channels/(\d+)/messages(?:/\d+)?$'), 'messages'),
+    (None, re.compile(r'/guilds/(\d+)/members/\d+(?:/roles/\d+)?$'), 'roles'),
+]
+
+
+def route_for_request(method, path):
+    """Maps a Discord API request to the queue route it counts against (or None)."""
+    for route_method, pattern, kind in _ROUTE_PATTERNS:
+        if route_method and route_method != method:
+            continue
+        match = pattern.search(path)
+        if match:
+            return f'{kind}:{match.group(1)}'
+    return None
+
+
+class TokenBucket:
+    """Refills `capacity` tokens every `per` seconds; can be paused until a reset time."""
+
+    def __init__(self, capacity, per):
+        self.capacity = capacity
+        self.per = per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.per)
+        self.updated = now
+
+    def wait_time(self, now, keep=0):
+        """Seconds until a token is available while `keep` tokens stay in the bucket (0 = now)."""
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        missing = keep + 1 - self.tokens
+        if missing > 0:
+            wait = max(wait, missing * self.per / self.capacity)
+        return wait
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds):
+        """Blocks the bucket for `seconds` and empties it (Discord said the limit is used up)."""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = now
+
+
+class _Job:
+    __slots__ = ('route', 'call', 'priority', 'future', 'enqueued', 'retries')
+
+    def __init__(self, route, call, priority, retries):
+        self.route = route
+        self.call = call
+        self.priority = priority
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.monotonic()
+        self.retries = retries
+
+
+class OutboundQueue:
+    """Priority queue with per-route and global token buckets for Discord API calls.
+
+    Args:
+        max_concurrency: Calls that may be in flight at the same time
+        route_limits: Dict route kind -> (requests, seconds), see ROUTE_LIMITS
+        global_limit: (requests, seconds) over all routes
+    """
+
+    def __init__(self, max_concurrency=4, route_limits=None, global_limit=GLOBAL_LIMIT):
+        self.route_limits = dict(ROUTE_LIMITS, **(route_limits or {}))
+        self._global = TokenBucket(*global_limit)
+        self._buckets = {}
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}  # priority -> route -> deque
+        self._slots = None
+        self._max_concurrency = max_concurrency
+        self._wakeup = None
+        self._task = None
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self._waits = {priority: deque(maxlen=200) for priority in PRIORITY_NAMES}
+
+    def _bucket(self, route):
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            kind = route.split(':', 1)[0]
+            bucket = self._buckets[route] = TokenBucket(*self.route_limits.get(kind, DEFAULT_ROUTE_LIMIT))
+        return bucket
+
+    async def submit(self, route, call, priority=NORMAL, retries=3):
+        """Queues an API call and returns its result once it ran.
+
+        Args:
+            route: Bucket key, e.g. "messages:<channel_id>" (see the helpers below)
+            call: Coroutine function without arguments that performs the request
+            priority: INTERACTIVE, NORMAL or BULK
+            retries: How often the call is re-queued after a 429
+
+        Raises:
+            Whatever the call raises, except for retried rate limits
+        """
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self._max_concurrency)
+        job = _Job(route, call, priority, retries)
+        self._queues[priority].setdefault(route, deque()).append(job)
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+        return await job.future
+
+    def _next_job(self):
+        """Pops the most urgent runnable job. Returns (job, None) or (None, seconds to wait)."""
+        now = time.monotonic()
+        wait = None
+        for priority, routes in self._queues.items():
+            keep = INTERACTIVE_RESERVE if priority == BULK else 0
+            global_wait = self._global.wait_time(now, keep=keep)
+            for route, jobs in routes.items():
+                route_wait = max(global_wait, self._bucket(route).wait_time(now))
+                if route_wait == 0:
+                    job = jobs.popleft()
+                    if not jobs:
+                        del routes[route]
+                    self._bucket(route).take(now)
+                    self._global.take(now)
+                    return job, None
+                wait = route_wait if wait is None else min(wait, route_wait)
+        return None, wait
+
+    def _has_jobs(self):
+        return any(self._queues.values())
+
+    async def _dispatch(self):
+        while self._has_jobs():
+            await self._slots.acquire()
+            job, wait = self._next_job()
+            if job is None:
+                self._slots.release()
+                self._wakeup.clear()
+                try:
+                    # A new submit may be runnable earlier than the current best
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.in_flight += 1
+            asyncio.create_task(self._run(job))
+
+    async def _run(self, job):
+        self._waits[job.priority].append(time.monotonic() - job.enqueued)
+        try:
+            result = await job.call()
+        except (discord.RateLimited, discord.HTTPException) as e:
+            retry_after = _retry_after(e)
+            if retry_after is None:
+                self.failed += 1
+                job.future.set_exception(e)
+            else:
+                self.rate_limited += 1
+                self._bucket(job.route).pause(retry_after)
+                if job.retries > 0:
+                    job.retries -= 1
+                    self.retried += 1
+                    # Back to the front of its route, so the order of a route is kept
+                    self._queues[job.priority].setdefault(job.route, deque()).appendleft(job)
+                    self._queues[job.priority].move_to_end(job.route, last=False)
+                else:
+                    self.failed += 1
+                    job.future.set_exception(e)
+        except Exception as e:
+            self.failed += 1
+            job.future.set_exception(e)
+        else:
+            self.completed += 1
+            job.future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            self._wakeup.set()
+            if self._has_jobs() and (self._task is None or self._task.done()):
+                self._task = asyncio.create_task(self._dispatch())
+
+    def observe(self, method, path, status, headers):
+        """Applies the rate-limit headers of a finished Discord API response."""
+        route = route_for_request(method, path)
+        if status == 429:
+            retry_after = _float(headers.get('Retry-After')) or _float(headers.get('X-RateLimit-Reset-After'))
+            if retry_after is None:
+                return
+            if headers.get('X-RateLimit-Global') or headers.get('X-RateLimit-Scope') == 'global':
+                self._global.pause(retry_after)
+            elif route:
+                self._bucket(route).pause(retry_after)
+            return
+        if not route:
+            return
+        bucket = self._bucket(route)
+        limit = _float(headers.get('X-RateLimit-Limit'))
+        if limit:
+            bucket.capacity = int(limit)
+        if _float(headers.get('X-RateLimit-Remaining')) == 0:
+            reset_after = _float(headers.get('X-RateLimit-Reset-After'))
+            if reset_after:
+                bucket.pause(reset_after)
+
+    def trace_config(self):
+        """Returns an aiohttp.TraceConfig that feeds response headers to observe().
+
+        Pass it to the bot as commands.Bot(..., http_trace=outbound.trace_config()).
+        """
+        async def on_request_end(session, context, params):
+            self.observe(params.method, params.url.path, params.response.status, params.response.headers)
+
+        config = aiohttp.TraceConfig()
+        config.on_request_end.append(on_request_end)
+        return config
+
+    def status(self):
+        """Returns queue depth, wait times and counters for monitoring."""
+        now = time.monotonic()
+        waits = {}
+        for priority, samples in self._waits.items():
+            if samples:
+                waits[PRIORITY_NAMES[priority]] = {
+                    'avg': sum(samples) / len(samples),
+                    'max': max(samples),
+                    'last': samples[-1],
+                }
+        return {
+            'queued': {PRIORITY_NAMES[priority]: sum(len(jobs) for jobs in routes.values())
+                       for priority, routes in self._queues.items()},
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rate_limited': self.rate_limited,
+            'retried': self.retried,
+            'wait': waits,
+            'paused_routes': {route: round(bucket.paused_until - now, 1)
+                              for route, bucket in self._buckets.items() if bucket.paused_until > now},
+        }
+
+    # Helpers for the common calls; they pick the route from the target
+
+    async def send(self, channel, *args, priority=NORMAL, **kwargs):
+        """channel.send(...) through the queue. DMs (users/members) use a "dm:<user_id>" route."""
+        if isinstance(channel, (discord.User, discord.Member)):
+            route = f'dm:{channel.id}'
+        else:
+            route = f'messages:{channel.id}'
+        return await self.submit(route, lambda: channel.send(*args, **kwargs), priority)
+
+    async def edit(self, message, priority=NORMAL, **kwargs):
+        """message.edit(...) through the queue (also for partial messages)."""
+        return await self.submit(f'messages:{message.channel.id}', lambda: message.edit(**kwargs), priority)
+
+    async def delete(self, message, priority=BULK):
+        """message.delete() through the queue."""
+        return await self.submit(f'delete:{message.channel.id}', message.delete, priority)
+
+    async def purge(self, channel, priority=BULK, **kwargs):
+        """channel.purge(...) through the queue. Counts as one call; discord.py paces its bulk deletes."""
+        return await self.submit(f'delete:{channel.id}', lambda: channel.purge(**kwargs), priority)
+
+    async def pin(self, message, priority=NORMAL, **kwargs):
+        return await self.submit(f'pins:{message.channel.id}', lambda: message.pin(**kwargs), priority)
+
+    async def set_permissions(self, channel, target, priority=NORMAL, **kwargs):
+        return await self.submit(f'permissions:{channel.id}', lambda: channel.set_permissions(target, **kwargs), priority)
+
+    async def add_roles(self, member, *roles, priority=NORMAL, **kwargs):
+        return await self.submit(f'roles:{member.guild.id}', lambda: member.add_roles(*roles, **kwargs), priority)
+
+    async def remove_roles(self, member, *roles, priority=NORMAL, **kwargs):
+        return await self.submit(f'roles:{member.guild.id}', lambda: member.remove_roles(*roles, **kwargs), priority)
+
+
+def _float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(error):
+    """Returns the seconds to wait for a rate-limit error, or None for other errors."""
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+    if getattr(error, 'status', None) == 429:
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        return _float(headers.get('Retry-After')) or 1.0
+    return None
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Offline benchmarks for the hot HopperDatabase methods.
+
+Each method is timed on synthetic databases of the chosen sizes (see
+synthetic.py) in several rounds; every round yields one median, and a result
+keeps the median and the range (low, high) of the round medians.
+
+--against <git revision> loads database.py of that revision next to the
+current one and interleaves their rounds on identical database copies, so
+both see the same machine load. This is the comparison to gate on. A
+baseline JSON file (--compare) works as well but also picks up the noise
+between two runs.
+
+A method counts as a regression only if the round ranges do not overlap
+(its fastest round is slower than the slowest baseline round) and the
+median slowdown is above --threshold and --min-delta-us.
+
+Usage:
+    python perf/bench_database.py --sizes small,medium --against HEAD~1
+    python perf/bench_database.py --sizes small,medium,huge --json perf/results/new.json
+    python perf/bench_database.py --compare perf/results/baseline.json
+
+Exits with status 1 if the comparison finds a regression.
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from datetime import datetime
+
+PERF_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PERF_DIR, '..'))
+
+import synthetic  # noqa: E402
+from database import HopperDatabase  # noqa: E402
+from synthetic import GUILD_ID  # noqa: E402
+
+# Generated databases are reused across runs (keyed by preset and seed)
+CACHE_DIR = os.path.join(PERF_DIR, '.cache')
+REPO_DIR = os.path.dirname(PERF_DIR)
+
+
+def synthetic_database(preset, seed):
+    """Returns the path of a cached synthetic database, generating it if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f'{preset}-{seed}.db')
+    if not os.path.exists(synthetic.members_path(path)):
+        print(f'Generating {preset} database (seed {seed})...')
+        synthetic.generate(path, preset, seed=seed)
+    return path
+
+
+def benchmarks(db):
+    """Returns the timed calls as (name, callable)."""
+    with db.pool.reader() as conn:
+        # The most popular club, one of its members and a typical user set
+        club_id, user_id = conn.execute('''
+            SELECT club_id, MIN(user_id) FROM user_profiles
+            GROUP BY club_id ORDER BY COUNT(*) DESC LIMIT 1
+        ''').fetchone()
+        user_ids = [row[0] for row in conn.execute('SELECT user_id FROM user_profiles WHERE guild_id = ? LIMIT 200', (GUILD_ID,))]
+        groundhelp_ids = [row[0] for row in conn.execute('SELECT id FROM clubs ORDER BY id LIMIT 3')]
+    info = db.get_club_info(club_id)
+    club_name, country, stadium_id = info[0], info[2], info[13]
+    counter = iter(range(10 ** 9))
+
+    def update_stadium():
+        # Alternating values, so every call really writes
+        db.update_stadium_info_partial(stadium_id, capacity=10000 + next(counter) % 2, notes='Benchmark')
+
+    def increment_activity():
+        db.increment_activity(user_id)
+        db.flush_activity()
+
+    return [
+        ('get_user_level', lambda: db.get_user_level(user_id)),
+        ('get_user_levels', lambda: db.get_user_levels(user_ids)),
+        ('search_clubs_by_name_like', lambda: db.search_clubs_by_name_like(club_name[2:7])),
+        ('search_clubs_by_name_like_fuzzy', lambda: db.search_clubs_by_name_like(club_name[:-2] + club_name[-1:] + 'x')),
+        ('get_clubs_by_country', lambda: db.get_clubs_by_country(country)),
+        ('get_members_by_club_id', lambda: db.get_members_by_club_id(GUILD_ID, club_id)),
+        ('get_club_info', lambda: db.get_club_info(club_id)),
+        ('increment_activity', increment_activity),
+        ('update_stadium_info_partial', update_stadium),
+        ('get_lineup_snapshot', lambda: db.get_lineup_snapshot(GUILD_ID)),
+        ('get_groundhelp_data', lambda: db.get_groundhelp_data(GUILD_ID, groundhelp_ids)),
+        ('get_search_index_data', lambda: db.get_search_index_data()),
+    ]
+
+
+def load_database_class(revision, directory):
+    """Imports HopperDatabase from the modules of a git revision, next to the current ones.
+
+    The revision's top-level modules are extracted to directory and imported
+    with the current ones moved out of sys.modules, so the returned class
+    uses the revision's database.py and its helpers.
+    """
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision], cwd=REPO_DIR,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        modules = [member for member in tar.getmembers() if member.isfile() and '/' not in member.name
+                   and member.name.endswith('.py')]
+        tar.extractall(directory, members=modules, filter='data')
+    names = [member.name[:-3] for member in modules]
+    saved = {name: sys.modules.pop(name) for name in names if name in sys.modules}
+    sys.path.insert(0, directory)
+    try:
+        return importlib.import_module('database').HopperDatabase
+    finally:
+        sys.path.remove(directory)
+        for name in names:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+def time_calls(calls, rounds, max_seconds):
+    """Times one benchmark of one or more versions in interleaved rounds.
+
+    Every round runs each version for max_seconds / rounds (at least 3 calls)
+    and keeps the median of that round; the version that starts a round
+    alternates.
+
+    Args:
+        calls: Dict version -> callable
+        rounds: Number of rounds
+        max_seconds: Time budget per version
+
+    Returns:
+        Dict version -> stats (median, low and high of the round medians, p95
+        of all calls, rounds and calls)
+    """
+    for call in calls.values():
+        call()  # warm up caches and prepared statements
+    versions = list(calls)
+    round_medians = {version: [] for version in versions}
+    samples = {version: [] for version in versions}
+    budget = max_seconds / rounds
+    for i in range(rounds):
+        for version in versions[i % len(versions):] + versions[:i % len(versions)]:
+            call = calls[version]
+            block = []
+            deadline = time.perf_counter() + budget
+            while len(block) < 3 or (time.perf_counter() < deadline and len(block) < 100000):
+                started = time.perf_counter()
+                call()
+                block.append(time.perf_counter() - started)
+            round_medians[version].append(statistics.median(block))
+            samples[version].extend(block)
+    results = {}
+    for version in versions:
+        medians = round_medians[version]
+        all_samples = sorted(samples[version])
+        results[version] = {
+            'median': statistics.median(medians),
+            'low': min(medians),
+            'high': max(medians),
+            'p95': all_samples[min(len(all_samples) - 1, int(len(all_samples) * 0.95))],
+            'rounds': rounds,
+            'calls': len(all_samples),
+        }
+    return results
+
+
+def run(sizes, seed, only=None, rounds=7, max_seconds=1.0, baseline_class=None):
+    """Runs all benchmarks on every size.
+
+    Args:
+        baseline_class: HopperDatabase class of a baseline revision to interleave with, or None
+
+    Returns:
+        ({size: {name: stats}}, {size: {name: stats}} of the baseline, empty without baseline_class)
+    """
+    results = {}
+    baseline_results = {}
+    for size in sizes:
+        source = synthetic_database(size, seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            # Benchmarks write, so every version runs on its own copy of the cached database
+            dbs = {}
+            try:
+                for version, cls in (('current', HopperDatabase), ('baseline', baseline_class)):
+                    if cls is None:
+                        continue
+                    path = os.path.join(tmp, f'{version}.db')
+                    shutil.copyfile(source, path)
+                    dbs[version] = cls(path)
+                calls = {version: dict(benchmarks(db)) for version, db in dbs.items()}
+                results[size] = {}
+                baseline_results[size] = {} if baseline_class else None
+                for name in calls['current']:
+                    if only and name not in only:
+                        continue
+                    versions = {version: versions_calls[name] for version, versions_calls in calls.items()}
+                    try:
+                        stats = time_calls(versions, rounds, max_seconds)
+                    except AttributeError:
+                        # The baseline does not have this method yet
+                        stats = time_calls({'current': versions['current']}, rounds, max_seconds)
+                    results[size][name] = stats['current']
+                    if 'baseline' in stats:
+                        baseline_results[size][name] = stats['baseline']
+                    print(f'{size:>7} {name:<34} {format_seconds(stats["current"]["median"]):>10} median '
+                          f'[{format_seconds(stats["current"]["low"])} - {format_seconds(stats["current"]["high"])}] '
+                          f'{format_seconds(stats["current"]["p95"]):>10} p95  ({stats["current"]["calls"]} calls)')
+            finally:
+                for db in dbs.values():
+                    db.close()
+    return results, {size: benches for size, benches in baseline_results.items() if benches is not None}
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f} µs'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f} ms'
+    return f'{seconds:.2f} s'
+
+
+def metadata(seed):
+    """Describes the environment a result file was produced in."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PERF_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': seed,
+    }
+
+
+def compare(baseline, results, threshold, min_delta):
+    """Prints current medians against a baseline and returns the number of regressions.
+
+    A benchmark regressed when its round ranges do not overlap (the fastest
+    current round is slower than the slowest baseline round) and the median
+    got slower by more than threshold and min_delta. Faster is reported the
+    same way.
+
+    Args:
+        baseline: Dict with meta and results, from a baseline JSON file or an --against run
+        results: Current {size: {name: stats}}
+        threshold: Relative slowdown of the median that counts as a regression (0.25 = 25%)
+        min_delta: Absolute slowdown in seconds below which changes are treated as noise
+    """
+    regressions = 0
+    print(f'\nCompared with {baseline["meta"].get("commit") or "baseline"} ({baseline["meta"]["created_at"]}):')
+    for size, benches in results.items():
+        for name, stats in benches.items():
+            old = baseline['results'].get(size, {}).get(name)
+            if not old:
+                print(f'{size:>7} {name:<34} {"new":>10}')
+                continue
+            change = stats['median'] / old['median'] - 1 if old['median'] else 0.0
+            # Older result files only have the median
+            separate_slower = stats.get('low', stats['median']) > old.get('high', old['median'])
+            separate_faster = stats.get('high', stats['median']) < old.get('low', old['median'])
+            slower = separate_slower and change > threshold and stats['median'] - old['median'] > min_delta
+            faster = separate_faster and change < -threshold and old['median'] - stats['median'] > min_delta
+            flag = 'REGRESSION' if slower else 'faster' if faster else ''
+            regressions += slower
+            print(f'{size:>7} {name:<34} {format_seconds(old["median"]):>10} -> '
+                  f'{format_seconds(stats["median"]):>10} {change:+7.1%} {flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hot HopperDatabase methods on synthetic databases.')
+    parser.add_argument('--sizes', default='small,medium', help='Comma-separated presets (small, medium, huge)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic databases')
+    parser.add_argument('--only', help='Comma-separated benchmark names to run')
+    parser.add_argument('--rounds', type=int, default=7, help='Rounds per benchmark; each round yields one median')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Time budget per benchmark and version')
+    parser.add_argument('--json', help='Write the results to this JSON file (e.g. perf/results/<name>.json)')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--against', help='Git revision whose database.py runs interleaved with the current one')
+    parser.add_argument('--threshold', type=float,
+                        help='Relative slowdown that counts as a regression (default: 0.10 with --against, '
+                             '1.0 with --compare)')
+    parser.add_argument('--min-delta-us', type=float, default=20, help='Ignore slowdowns below this many microseconds')
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in synthetic.PRESETS]
+    if unknown:
+        parser.error(f'Unknown sizes: {", ".join(unknown)}')
+    only = set(args.only.split(',')) if args.only else None
+    if args.compare and args.against:
+        parser.error('Use either --compare or --against')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_class = load_database_class(args.against, tmp) if args.against else None
+        results, baseline_results = run(sizes, args.seed, only=only, rounds=args.rounds,
+                                        max_seconds=args.seconds, baseline_class=baseline_class)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'meta': metadata(args.seed), 'results': results}, f, indent=2)
+        print(f'Results written to {args.json}')
+
+    if args.compare or args.against:
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        else:
+            baseline = {'meta': {'commit': args.against, 'created_at': 'same run'}, 'results': baseline_results}
+        # Same-code runs moved medians by up to 8% interleaved and up to 90% between separate runs
+        threshold = args.threshold if args.threshold is not None else 0.10 if args.against else 1.0
+        regressions = compare(baseline, results, threshold, args.min_delta_us / 1e6)
+        print(f'{regressions} regressions.' if regressions else 'No regressions.')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Offline line-up rebuild benchmark with a recording fake Discord channel.
+
+Runs the line-up pipeline of the bot (snapshot, grouping, rendering and
+the incremental channel sync) against synthetic databases and a fake guild
+built from the generated member list. The channel records every API call
+instead of talking to Discord.
+
+Reported per scenario: wall time (and its DB, render and sync parts), DB queries, embeds built, messages sent/edited/deleted, bytes of
+message payload and payloads that would break Discord's limits.
+
+With --shards N the countries are spread over N channels (as LINE_UP_SHARDS
+does) and the sharded scenarios report which channels a change touched.
+
+Usage:
+    python perf/bench_lineup.py --sizes small,medium,huge [--shards 4] [--json perf/results/lineup.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from itertools import count
+
+PERF_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PERF_DIR, '..'))
+
+import discord  # noqa: E402
+
+import synthetic  # noqa: E402
+from bench_database import format_seconds, metadata, synthetic_database  # noqa: E402
+from club_cache import ClubCache  # noqa: E402
+from database import AsyncHopperDatabase, HopperDatabase  # noqa: E402
+from lineup import (  # noqa: E402
+    MAX_DESCRIPTION, MAX_EMBED_TOTAL, MAX_EMBEDS_PER_MESSAGE, MAX_FIELD_VALUE, MAX_FIELDS,
+    render_lineup, sync_lineup_channel,
+)
+
+
+class FakeMember:
+    __slots__ = ('id', 'name', 'bot')
+
+    def __init__(self, member_id, name, bot=False):
+        self.id = member_id
+        self.name = name
+        self.bot = bot
+
+    @property
+    def mention(self):
+        return f'<@{self.id}>'
+
+
+class FakeRole:
+    def __init__(self, role_id, members):
+        self.id = role_id
+        self.members = members
+
+
+class FakeGuild:
+    """Guild with the attributes the line-up reads, built from synthetic.load_members()."""
+
+    def __init__(self, data):
+        self.id = data['guild_id']
+        self.name = data['guild_name']
+        self.members = [FakeMember(m['id'], m['name'], m['bot']) for m in data['members']]
+        self._by_id = {member.id: member for member in self.members}
+        apprentices = [self._by_id[m['id']] for m in data['members'] if m['apprentice']]
+        self._roles = {data['apprentice_role_id']: FakeRole(data['apprentice_role_id'], apprentices)}
+
+    @property
+    def member_count(self):
+        return len(self.members)
+
+    def get_member(self, user_id):
+        return self._by_id.get(user_id)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+
+class FakeMessage:
+    __slots__ = ('id', 'channel')
+
+    def __init__(self, message_id, channel):
+        self.id = message_id
+        self.channel = channel
+
+    async def edit(self, content=None, embeds=None, **kwargs):
+        self.channel.record('edit', content, embeds)
+
+    async def delete(self):
+        self.channel.calls['delete'] += 1
+        self.channel.messages.pop(self.id, None)
+
+
+class RecordingChannel:
+    """Text channel that records send/edit/delete/purge/history calls and payload sizes."""
+
+    def __init__(self, channel_id=1000, name='line-up'):
+        self.id = channel_id
+        self.name = name
+        self.messages = {}  # message_id -> FakeMessage, oldest first
+        self._ids = count(1)
+        self.reset()
+
+    def reset(self):
+        self.calls = {'send': 0, 'edit': 0, 'delete': 0, 'purge': 0, 'history': 0}
+        self.payload_bytes = 0
+        self.limit_violations = 0
+
+    def record(self, kind, content, embeds):
+        self.calls[kind] += 1
+        embeds = embeds or []
+        data = [embed.to_dict() for embed in embeds]
+        self.payload_bytes += len(json.dumps({'content': content, 'embeds': data}, ensure_ascii=False).encode('utf-8'))
+        total = sum(len(embed) for embed in embeds)
+        too_long = any(len(embed.description or '') > MAX_DESCRIPTION
+                       or len(embed.fields) > MAX_FIELDS
+                       or any(len(field.value or '') > MAX_FIELD_VALUE for field in embed.fields)
+                       for embed in embeds)
+        if len(embeds) > MAX_EMBEDS_PER_MESSAGE or total > MAX_EMBED_TOTAL or too_long:
+            self.limit_violations += 1
+
+    async def send(self, content=None, embeds=None, **kwargs):
+        self.record('send', content, embeds)
+        message = FakeMessage(next(self._ids), self)
+        self.messages[message.id] = message
+        return message
+
+    def get_partial_message(self, message_id):
+        return self.messages.get(message_id) or FakeMessage(message_id, self)
+
+    async def purge(self, limit=100):
+        self.calls['purge'] += 1
+        for message_id in list(reversed(self.messages))[:limit]:
+            del self.messages[message_id]
+
+    async def history(self, limit=100):
+        self.calls['history'] += 1
+        for message_id in list(reversed(self.messages))[:limit]:
+            yield self.messages[message_id]
+
+
+class QueryCounter:
+    """Counts the SQL statements run on the pooled connections of a HopperDatabase."""
+
+    def __init__(self, database):
+        self.count = 0
+        for conn in database.pool._all:
+            conn.set_trace_callback(self._trace)
+
+    def _trace(self, sql):
+        if sql.lstrip()[:6].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+            self.count += 1
+
+
+async def rebuild(guild, channel, db, club_cache, apprentice_role_id, verify=False):
+    """One line-up rebuild, as _post_member_list in hopper.py does it. Returns phase timings and stats."""
+    timings = {}
+    started = time.perf_counter()
+    await db.refresh_levels()
+    club_token = club_cache.begin_load()
+    snapshot = await db.get_lineup_snapshot(guild.id)
+    timings['db'] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    apprentice_role = guild.get_role(apprentice_role_id)
+    apprentice_user_ids = set(m.id for m in apprentice_role.members) if apprentice_role else set()
+    _, club_ids, channel_sections = render_lineup(
+        guild, snapshot, club_cache.from_rows(snapshot['clubs'], club_token), apprentice_user_ids, {}, channel.id)
+    sections = channel_sections[channel.id]
+    for section in sections:
+        section.content_hash  # hashing is part of rendering
+    timings['render'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    stats = await sync_lineup_channel(channel, sections, db, verify=verify)
+    timings['sync'] = time.perf_counter() - mark
+    timings['total'] = time.perf_counter() - started
+    return timings, stats, sections, len(club_ids)
+
+
+async def rebuild_sharded(guild, channels, shards, db, club_cache, apprentice_role_id):
+    """One sharded line-up rebuild. Returns {channel_id: sync stats}."""
+    await db.refresh_levels()
+    club_token = club_cache.begin_load()
+    snapshot = await db.get_lineup_snapshot(guild.id)
+    apprentice_role = guild.get_role(apprentice_role_id)
+    apprentice_user_ids = set(m.id for m in apprentice_role.members) if apprentice_role else set()
+    _, _, channel_sections = render_lineup(
+        guild, snapshot, club_cache.from_rows(snapshot['clubs'], club_token), apprentice_user_ids, shards, None)
+    results = {}
+    for channel_id, sections in channel_sections.items():
+        results[channel_id] = await sync_lineup_channel(channels[channel_id], sections, db)
+    return results
+
+
+async def run_size(size, seed, shard_count=0):
+    """Runs all scenarios on one synthetic database. Returns {scenario: result}."""
+    source = synthetic_database(size, seed)
+    members = synthetic.load_members(source)
+    guild = FakeGuild(members)
+    channel = RecordingChannel()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lineup.db')
+        shutil.copyfile(source, path)
+        db = AsyncHopperDatabase(HopperDatabase(path))
+        queries = QueryCounter(db.database)
+        club_cache = ClubCache(db, lambda logo: f'https://logos.example/{logo}' if logo else None, discord.Color.blue())
+        db.database.add_listener(club_cache.handle_event)
+
+        async def scenario(name, verify=False):
+            channel.reset()
+            queries.count = 0
+            timings, stats, sections, club_count = await rebuild(
+                guild, channel, db, club_cache, members['apprentice_role_id'], verify=verify)
+            results[name] = {
+                'timings': timings,
+                'db_queries': queries.count,
+                'clubs': club_count,
+                'sections': len(sections),
+                'embeds': sum(len(section.embeds) for section in sections),
+                'calls': dict(channel.calls),
+                'payload_bytes': channel.payload_bytes,
+                'limit_violations': channel.limit_violations,
+                'sync': {key: value for key, value in stats.items() if value},
+            }
+
+        try:
+            # Empty channel: every section is sent
+            await scenario('cold')
+            # Nothing changed: the fingerprint matches
+            await scenario('unchanged')
+            # One member moves to another club: only the affected sections change
+            with db.database.pool.reader() as conn:
+                user_id, club_id = conn.execute(
+                    'SELECT user_id, club_id FROM user_profiles WHERE guild_id = ? LIMIT 1', (guild.id,)).fetchone()
+                other_club = conn.execute(
+                    'SELECT club_id FROM user_profiles WHERE guild_id = ? AND club_id != ? LIMIT 1',
+                    (guild.id, club_id)).fetchone()[0]
+            await db.save_user_profile(guild.id, user_id, other_club)
+            await scenario('one_member_moved')
+            # First rebuild after a restart reads the channel history once
+            await scenario('restart_verify', verify=True)
+            if shard_count:
+                await sharded_scenarios(guild, db, club_cache, members['apprentice_role_id'], shard_count, results)
+        finally:
+            db.close()
+    return results
+
+
+async def sharded_scenarios(guild, db, club_cache, apprentice_role_id, shard_count, results):
+    """Spreads the countries round-robin over shard_count channels, then moves one member."""
+    with db.database.pool.reader() as conn:
+        countries = [row[0] for row in conn.execute('SELECT DISTINCT country FROM leagues ORDER BY country')]
+    shards = {country: 2000 + i % shard_count for i, country in enumerate(countries)}
+    shards['*'] = 2000
+    channels = {channel_id: RecordingChannel(channel_id, f'line-up-{channel_id}') for channel_id in set(shards.values())}
+
+    async def scenario(name):
+        for channel in channels.values():
+            channel.reset()
+        started = time.perf_counter()
+        stats = await rebuild_sharded(guild, channels, shards, db, club_cache, apprentice_role_id)
+        results[name] = {
+            'timings': {'total': time.perf_counter() - started},
+            'channels': {channel_id: dict(channels[channel_id].calls) for channel_id in stats},
+            'touched': sorted(channel_id for channel_id, s in stats.items() if not s['skipped']),
+            'limit_violations': sum(channel.limit_violations for channel in channels.values()),
+        }
+
+    await scenario('sharded_cold')
+    # A member moves to another club of the same country: only that shard changes
+    with db.database.pool.reader() as conn:
+        user_id, club_id, other_club = conn.execute('''
+            SELECT p.user_id, p.club_id, o.id FROM user_profiles p
+            JOIN clubs c ON c.id = p.club_id JOIN leagues l ON l.id = c.league_id
+            JOIN clubs o ON o.id != c.id JOIN leagues ol ON ol.id = o.league_id AND ol.country = l.country
+            WHERE p.guild_id = ? LIMIT 1
+        ''', (guild.id,)).fetchone()
+    await db.save_user_profile(guild.id, user_id, other_club)
+    await scenario('sharded_one_member_moved')
+
+
+def print_results(size, results):
+    for name, result in results.items():
+        if 'channels' in result:
+            calls = {key: sum(c[key] for c in result['channels'].values()) for key in ('send', 'edit', 'delete')}
+            print(f'{size:>7} {name:<24} {format_seconds(result["timings"]["total"]):>10} '
+                  f'{len(result["channels"])} channels, touched {len(result["touched"])}; sent {calls["send"]}, '
+                  f'edited {calls["edit"]}, deleted {calls["delete"]}; {result["limit_violations"]} over Discord limits')
+            continue
+        timings = result['timings']
+        calls = result['calls']
+        print(f'{size:>7} {name:<24} {format_seconds(timings["total"]):>10} '
+              f'(db {format_seconds(timings["db"])}, '
+              f'render {format_seconds(timings["render"])}, sync {format_seconds(timings["sync"])})')
+        print(f'{"":>32} {result["db_queries"]} queries, {result["clubs"]} clubs, {result["embeds"]} embeds '
+              f'in {result["sections"]} sections; sent {calls["send"]}, edited {calls["edit"]}, '
+              f'deleted {calls["delete"]}, history reads {calls["history"]}; '
+              f'{result["payload_bytes"] / 1024:.1f} KiB payload, {result["limit_violations"]} over Discord limits')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark line-up rebuilds against a fake Discord channel.')
+    parser.add_argument('--sizes', default='small,medium,huge', help='Comma-separated presets (small, medium, huge)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic databases')
+    parser.add_argument('--shards', type=int, default=0, help='Also run sharded scenarios with this many channels')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in synthetic.PRESETS]
+    if unknown:
+        parser.error(f'Unknown sizes: {", ".join(unknown)}')
+
+    all_results = {}
+    for size in sizes:
+        all_results[size] = asyncio.run(run_size(size, args.seed, args.shards))
+        print_results(size, all_results[size])
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'meta': metadata(args.seed), 'results': all_results}, f, indent=2)
+        print(f'Results written to {args.json}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Query plan regression check for HopperDatabase.
+
+Generates a synthetic database (see synthetic.py), runs every hot HopperDatabase method with SQL
+tracing enabled and feeds each statement it executed to EXPLAIN QUERY PLAN.
+A statement that scans a whole table fails the check, unless the table is
+explicitly allowed for that method (e.g. listing all clubs of a country).
+
+Usage:
+    python perf/query_plans.py [--preset huge] [--analyze] [--verbose]
+    python -m pytest tests/test_query_plans.py   (one test per hot call)
+
+Exits with status 1 if any hot query falls back to a full scan.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # noqa: E402
+from database import HopperDatabase  # noqa: E402
+from synthetic import GUILD_ID  # noqa: E402
+
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|SET\b|JOIN\b|LEFT\b|GROUP\b|ORDER\b|LIMIT\b|USING\b)(\w+))?', re.I)
+_SCAN = re.compile(r'^SCAN (\w+)')
+_COVERING = re.compile(r'USING COVERING INDEX (\w+)')
+
+
+def sample(db):
+    """Picks the IDs and names the hot calls run with: the most popular club and one of its members."""
+    with db.pool.reader() as conn:
+        club_id, user_id = conn.execute('''
+            SELECT club_id, MIN(user_id) FROM user_profiles
+            GROUP BY club_id ORDER BY COUNT(*) DESC LIMIT 1
+        ''').fetchone()
+        user_ids = [row[0] for row in conn.execute('SELECT user_id FROM user_level LIMIT 200')]
+        other_club_ids = [row[0] for row in conn.execute('SELECT id FROM clubs LIMIT 50')]
+    info = db.get_club_info(club_id)
+    return SimpleNamespace(
+        club_id=club_id, user_id=user_id, user_ids=user_ids, other_club_ids=other_club_ids,
+        club_name=info[0], league=info[1], country=info[2], league_id=info[12], stadium_id=info[13] or 1,
+    )
+
+
+# (label, call(db, sample), allowed scans). An allowed scan is a table name
+# (any full scan of it is expected) or "table/index" (only a full pass over
+# that covering index is expected, never over the table rows).
+HOT_CALLS = [
+    ('get_user_profile', lambda db, s: db.get_user_profile(GUILD_ID, s.user_id), ()),
+    ('get_leagues_by_country', lambda db, s: db.get_leagues_by_country(s.country), ()),
+    # Clubs without a league belong to every country, so these read all clubs
+    ('get_clubs_by_country', lambda db, s: db.get_clubs_by_country(s.country), ('clubs',)),
+    ('get_clubs_by_country_and_league',
+     lambda db, s: db.get_clubs_by_country_and_league(s.country, s.league), ('clubs',)),
+    ('get_club_id_by_name', lambda db, s: db.get_club_id_by_name(s.club_name), ()),
+    ('get_club_info', lambda db, s: db.get_club_info(s.club_id), ()),
+    ('get_club_infos', lambda db, s: db.get_club_infos(s.other_club_ids), ()),
+    # A "%needle%" pattern cannot seek, so the substring search walks the whole
+    # name_norm covering index (one narrow entry per club, no table rows)
+    ('search_clubs_by_name_like',
+     lambda db, s: db.search_clubs_by_name_like(s.club_name[3:8]), ('clubs/idx_clubs_name_norm',)),
+    ('search_clubs_fuzzy', lambda db, s: db.search_clubs_fuzzy(s.club_name[:-2] + s.club_name[-1:]), ()),
+    ('get_members_by_club_id', lambda db, s: db.get_members_by_club_id(GUILD_ID, s.club_id), ()),
+    ('get_expert_users_for_club', lambda db, s: db.get_expert_users_for_club(GUILD_ID, s.club_id), ()),
+    ('get_expert_clubs', lambda db, s: db.get_expert_clubs(GUILD_ID, s.user_id), ()),
+    ('get_stadium_info', lambda db, s: db.get_stadium_info(s.stadium_id), ()),
+    ('get_stadium_info_for_club', lambda db, s: db.get_stadium_info_for_club(s.club_id), ()),
+    ('get_user_tags', lambda db, s: db.get_user_tags(s.user_id), ()),
+    ('get_user_level', lambda db, s: db.get_user_level(s.user_id), ()),
+    ('get_user_levels', lambda db, s: db.get_user_levels(s.user_ids), ()),
+    ('get_user_activity_days', lambda db, s: db.get_user_activity_days(s.user_id), ()),
+    ('get_club_aliases', lambda db, s: db.get_club_aliases(s.club_id), ()),
+    ('get_groundhelp_data',
+     lambda db, s: db.get_groundhelp_data(GUILD_ID, [s.club_id] + s.other_club_ids[:2]), ()),
+    ('get_lineup_messages', lambda db, s: db.get_lineup_messages(99), ()),
+    ('get_state', lambda db, s: db.get_state('user_level_rolled_on'), ()),
+    # Listings return every row by design; they must not scan other tables
+    # The bot serves one guild, so whole-guild reads return every row; with
+    # ANALYZE statistics SQLite rightly scans instead of walking the guild index
+    ('get_all_expert_clubs', lambda db, s: db.get_all_expert_clubs(GUILD_ID), ('expert_clubs',)),
+    ('get_lineup_snapshot', lambda db, s: db.get_lineup_snapshot(GUILD_ID), ('user_profiles', 'expert_clubs')),
+    ('get_all_countries', lambda db, s: db.get_all_countries(), ('leagues/idx_leagues_country_tier',)),
+    ('get_all_tags', lambda db, s: db.get_all_tags(), ('tags/idx_tags_tag',)),
+    ('get_club_ids_sorted_by_country_and_tier',
+     lambda db, s: db.get_club_ids_sorted_by_country_and_tier(), ('clubs', 'leagues')),
+    ('get_club_match_terms', lambda db, s: db.get_club_match_terms(), ('clubs', 'club_aliases')),
+    ('get_search_index_data', lambda db, s: db.get_search_index_data(), ('leagues', 'clubs', 'tags')),
+    # Writes
+    ('save_user_profile', lambda db, s: db.save_user_profile(GUILD_ID, s.user_id, s.club_id), ()),
+    ('add_expert_club', lambda db, s: db.add_expert_club(GUILD_ID, s.user_id, s.club_id), ()),
+    ('remove_expert_club', lambda db, s: db.remove_expert_club(GUILD_ID, s.user_id, s.club_id), ()),
+    ('save_user_tags', lambda db, s: db.save_user_tags(s.user_id, ['Ultras', 'Tifo']), ()),
+    ('add_user_tags', lambda db, s: db.add_user_tags(s.user_id, ['Away Days']), ()),
+    ('increment_activity', lambda db, s: (db.increment_activity(s.user_id), db.flush_activity()), ()),
+    # The daily roll reads the partial index of users with active days in the window
+    ('roll_user_levels', lambda db, s: db.roll_user_levels(force=True), ('user_level/idx_user_level_active',)),
+    ('get_or_create_league', lambda db, s: db.get_or_create_league('Synthetic League', s.country), ()),
+    ('get_or_create_club', lambda db, s: db.get_or_create_club('Synthetic Query Plan FC'), ()),
+    ('get_or_create_stadium', lambda db, s: db.get_or_create_stadium('Synthetic Arena'), ()),
+    ('rename_club', lambda db, s: db.rename_club(s.club_id, f'{s.club_name} Renamed'), ()),
+    ('add_club_alias', lambda db, s: db.add_club_alias(s.club_id, 'Synthetic Alias'), ()),
+    ('remove_club_alias', lambda db, s: db.remove_club_alias('Synthetic Alias'), ()),
+    ('update_club_league', lambda db, s: db.update_club_league(s.club_id, s.league_id), ()),
+    ('update_club_logo', lambda db, s: db.update_club_logo(s.club_id, 'synthetic.png'), ()),
+    ('update_club_color', lambda db, s: db.update_club_color(s.club_id, '#ff0000'), ()),
+    ('update_club_ticket_info', lambda db, s: db.update_club_ticket_info(s.club_id, 'Notes', '10-20', None), ()),
+    ('update_league_tier', lambda db, s: db.update_league_tier(s.league_id, 2), ()),
+    ('link_club_to_stadium', lambda db, s: db.link_club_to_stadium(s.club_id, s.stadium_id), ()),
+    ('update_stadium_info_partial',
+     lambda db, s: db.update_stadium_info_partial(s.stadium_id, capacity=12000), ()),
+    ('set_state', lambda db, s: db.set_state('query_plan_check', '1'), ()),
+    ('save_lineup_messages', lambda db, s: db.save_lineup_messages(99, [('header', 1, 'hash')]), ()),
+]
+
+
+def explain(conn, sql):
+    """Returns the EXPLAIN QUERY PLAN detail lines of a statement."""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def full_scans(sql, plan, tables):
+    """Returns the full scans of real tables in a plan as "table" or "table/index".
+
+    "table/index" is a pass over a covering index that never reads table
+    rows. Plans name tables by their alias; scans of subqueries, CTEs and
+    table-valued functions (json_each) are not table scans.
+    """
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table.lower()] = table.lower()
+        if alias:
+            aliases[alias.lower()] = table.lower()
+    scanned = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if match and 'VIRTUAL TABLE' not in detail:
+            table = aliases.get(match.group(1).lower())
+            if table in tables:
+                covering = _COVERING.search(detail)
+                scanned.append(f'{table}/{covering.group(1).lower()}' if covering else table)
+    return scanned
+
+
+def _is_allowed(scan, allowed):
+    return scan in allowed or scan.split('/')[0] in allowed
+
+
+class PlanChecker:
+    """Traces the statements of HopperDatabase calls and explains their query plans.
+
+    Args:
+        db: HopperDatabase to check (its pooled connections get a trace callback)
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._statements = []
+        for conn in db.pool._all:
+            conn.set_trace_callback(self._statements.append)
+        self._explain_conn = sqlite3.connect(db.database_name)
+        self._tables = {row[0].lower() for row in self._explain_conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.sample = sample(db)
+
+    def run(self, call, allowed):
+        """Runs one hot call.
+
+        Returns:
+            Tuple (problems, plans): problems are (scan, sql, plan) for scans not
+            in `allowed`, plans are (sql, plan) for every statement
+        """
+        self._statements.clear()
+        call(self.db, self.sample)
+        problems = []
+        plans = []
+        for sql in list(self._statements):
+            if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH')):
+                continue
+            plan = explain(self._explain_conn, sql)
+            plans.append((sql, plan))
+            for scan in full_scans(sql, plan, self._tables):
+                if not _is_allowed(scan, allowed):
+                    problems.append((scan, sql, plan))
+        return problems, plans
+
+    def close(self):
+        for conn in self.db.pool._all:
+            conn.set_trace_callback(None)
+        self._explain_conn.close()
+
+
+def format_plans(entries):
+    """Formats (sql, plan) or (scan, sql, plan) entries for output."""
+    lines = []
+    for entry in entries:
+        *scan, sql, plan = entry
+        if scan:
+            lines.append(f'     full scan of {scan[0]}:')
+        lines.append('       ' + ' '.join(sql.split()))
+        lines.extend(f'         {detail}' for detail in plan)
+    return '\n'.join(lines)
+
+
+def analyze(path):
+    """Runs ANALYZE on a database file; do it before HopperDatabase opens its pool."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+
+def check(db, verbose=False):
+    """Runs all hot calls and checks their query plans. Returns the number of failures."""
+    checker = PlanChecker(db)
+    failures = 0
+    try:
+        for label, call, allowed in HOT_CALLS:
+            problems, plans = checker.run(call, allowed)
+            print(f'{"FAIL" if problems else "ok  "} {label}')
+            if problems:
+                print(format_plans(problems))
+            elif verbose:
+                print(format_plans(plans))
+            failures += bool(problems)
+    finally:
+        checker.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that hot HopperDatabase queries do not scan whole tables.')
+    parser.add_argument('--preset', choices=sorted(synthetic.PRESETS), default='huge',
+                        help='Size of the synthetic database')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic database')
+    parser.add_argument('--analyze', action='store_true', help='Run ANALYZE first, so plans use table statistics')
+    parser.add_argument('--verbose', action='store_true', help='Print the plans of passing queries too')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'query_plans.db')
+        print(f'Generating synthetic database ({args.preset})...')
+        synthetic.generate(path, args.preset, seed=args.seed)
+        if args.analyze:
+            analyze(path)
+        db = HopperDatabase(path)
+        try:
+            failures = check(db, verbose=args.verbose)
+        finally:
+            db.close()
+
+    print(f'{failures} hot queries fall back to a full table scan.' if failures else 'All hot queries use an index.')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
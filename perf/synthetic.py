@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Synthetic guild and database generator for load tests and benchmarks.
+
+Fills a HopperDatabase file with leagues, clubs, stadiums, profiles, expert
+links, tags and activity, and writes the matching guild member list next to
+it (<database>.members.json). Club popularity, tag use and user activity
+follow Zipf-like distributions, so a few clubs and users dominate like they
+do on a real server.
+
+Usage:
+    python perf/synthetic.py out.db --preset huge [--members 80000] [--skew 1.2] [--seed 7]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import HopperDatabase  # noqa: E402
+from search_index import normalize_text  # noqa: E402
+
+GUILD_ID = 1
+GUILD_NAME = 'Synthetic Hoppers'
+APPRENTICE_ROLE_ID = 2
+
+# Size presets; every value can be overridden by a keyword/CLI option
+PRESETS = {
+    'small': {'members': 1000, 'clubs': 500, 'activity_days': 90},
+    'medium': {'members': 10000, 'clubs': 5000, 'activity_days': 365},
+    'huge': {'members': 50000, 'clubs': 20000, 'activity_days': 730},
+}
+
+DEFAULTS = {
+    'seed': 1,
+    'skew': 1.1,  # Zipf exponent for club popularity, tags and activity
+    'profile_ratio': 0.8,  # share of members with a home club
+    'expert_ratio': 0.1,  # share of members with expert clubs (up to 10 each)
+    'apprentice_ratio': 0.05,
+    'bot_members': 5,
+    'tags_per_user': 2,
+    'active_day_rate': 0.05,  # mean share of days a member is active
+    'league_ratio': 0.95,  # share of clubs with a league
+}
+
+# (country, flag, number of tiers)
+COUNTRIES = [
+    ('Germany', '🇩🇪', 6), ('England', '🏴', 6), ('Spain', '🇪🇸', 5), ('Italy', '🇮🇹', 5),
+    ('France', '🇫🇷', 5), ('Netherlands', '🇳🇱', 4), ('Portugal', '🇵🇹', 4), ('Austria', '🇦🇹', 4),
+    ('Switzerland', '🇨🇭', 3), ('Belgium', '🇧🇪', 3), ('Scotland', '🏴', 4), ('Poland', '🇵🇱', 4),
+    ('Czechia', '🇨🇿', 3), ('Denmark', '🇩🇰', 3), ('Sweden', '🇸🇪', 3), ('Norway', '🇳🇴', 3),
+    ('Turkey', '🇹🇷', 3), ('Greece', '🇬🇷', 2), ('Croatia', '🇭🇷', 2), ('Luxembourg', '🇱🇺', 2),
+]
+
+_PREFIXES = ['FC', 'SV', 'SC', 'VfB', 'VfL', 'TSV', 'SpVgg', 'Real', 'Sporting', 'Union', 'Racing', 'AS', 'Dynamo']
+_SUFFIXES = ['', '', '', ' United', ' City', ' 04', ' 1899', ' Rovers', ' Athletic', ' II']
+_SYLLABLES = ['ber', 'lin', 'mün', 'ster', 'dorf', 'kö', 'bach', 'wald', 'ham', 'burg', 'sa', 'ra', 'go',
+              'za', 'vi', 'lla', 'mar', 'ti', 'por', 'to', 'ś', 'ło', 'já', 'ne', 'ri', 'ka', 'stad', 'heim']
+_TAGS = ['Ultras', 'Away days', 'Groundhopper', 'Stadium tours', 'Lower leagues', 'Women football',
+         'Futsal', 'Retro kits', 'Photography', 'Scarves', 'Pins', 'Programmes', 'Tickets', 'Train travel',
+         'Road trips', 'Europe', 'Cup games', 'Derbies', 'Youth football', 'Stats', 'Tifo', 'Beer', 'Food']
+
+
+def _zipf_weights(count, skew):
+    """Cumulative Zipf weights for ranks 1..count."""
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def _pick(rng, cumulative):
+    """Picks an index according to cumulative weights."""
+    return bisect_left(cumulative, rng.random() * cumulative[-1])
+
+
+def _town(rng):
+    name = ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return name[:1].upper() + name[1:]
+
+
+def members_path(path):
+    """Returns the path of the member list that belongs to a generated database."""
+    return f'{path}.members.json'
+
+
+def load_members(path):
+    """Loads the guild member list written by generate().
+
+    Args:
+        path: Path of the generated database
+
+    Returns:
+        Dict with guild_id, guild_name, apprentice_role_id and members, a list of
+        {"id", "name", "bot", "apprentice"} dicts
+    """
+    with open(members_path(path), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generate(path, preset='small', **options):
+    """Creates a synthetic HopperDatabase file and its guild member list.
+
+    Args:
+        path: Path of the database file; an existing file is replaced
+        preset: Name of a PRESETS entry
+        **options: Overrides for PRESETS/DEFAULTS entries (members, clubs,
+            activity_days, seed, skew, profile_ratio, ...)
+
+    Returns:
+        Dict with the options used and the number of generated rows per table
+    """
+    config = dict(DEFAULTS, **PRESETS[preset])
+    unknown = set(options) - set(config)
+    if unknown:
+        raise ValueError(f'Unknown synthetic options: {", ".join(sorted(unknown))}')
+    config.update(options)
+    rng = random.Random(config['seed'])
+    for suffix in ('', '-wal', '-shm', '.members.json'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    started = time.monotonic()
+    counts = {}
+    db = HopperDatabase(path)
+    try:
+        with db.pool.writer() as conn:
+            cursor = conn.cursor()
+
+            leagues = []
+            for country, flag, tiers in COUNTRIES:
+                for tier in range(1, tiers + 1):
+                    leagues.append((f'{country} League {tier}', country, tier, flag, f'league_{country.lower()}_{tier}.png'))
+            cursor.executemany('INSERT INTO leagues (name, country, tier, flag, logo) VALUES (?, ?, ?, ?, ?)', leagues)
+            # Top tiers of big countries hold most clubs
+            league_ids = [row[0] for row in cursor.execute('SELECT id FROM leagues ORDER BY tier, id')]
+            league_weights = _zipf_weights(len(league_ids), 0.6)
+            counts['leagues'] = len(league_ids)
+
+            club_names = set()
+            while len(club_names) < config['clubs']:
+                club_names.add(f'{rng.choice(_PREFIXES)} {_town(rng)}{rng.choice(_SUFFIXES)}')
+            club_names = sorted(club_names)
+            rng.shuffle(club_names)
+
+            stadium_count = max(1, int(config['clubs'] * 0.9))  # some clubs share a ground
+            cursor.executemany('''
+                INSERT INTO stadiums (name, capacity, built_year, how_to_get_there)
+                VALUES (?, ?, ?, ?)
+            ''', [(f'Stadion {_town(rng)} {i}', rng.randint(500, 80000), rng.randint(1890, 2024),
+                   'Tram to the main stand.' if rng.random() < 0.3 else None)
+                  for i in range(stadium_count)])
+            counts['stadiums'] = stadium_count
+
+            clubs = []
+            for name in club_names:
+                league_id = league_ids[_pick(rng, league_weights)] if rng.random() < config['league_ratio'] else None
+                color = f'#{rng.randrange(0x1000000):06x}' if rng.random() < 0.7 else None
+                logo = f'{normalize_text(name).replace(" ", "_")}.png' if rng.random() < 0.6 else None
+                clubs.append((name, normalize_text(name), league_id, rng.randint(1, stadium_count), color, logo))
+            cursor.executemany('''
+                INSERT INTO clubs (name, name_norm, league_id, stadium_id, color, logo)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', clubs)
+            club_ids = [row[0] for row in cursor.execute('SELECT id FROM clubs ORDER BY id')]
+            for club_id, (name, *_) in zip(club_ids, clubs):
+                db._index_club_term(cursor, club_id, name)
+            counts['clubs'] = len(club_ids)
+
+            # Popular clubs get most members; the ranking is independent of the ID order
+            popularity = list(club_ids)
+            rng.shuffle(popularity)
+            club_weights = _zipf_weights(len(popularity), config['skew'])
+
+            member_ids = [10 ** 17 + index for index in range(config['members'])]
+            first_joined = date.today() - timedelta(days=config['activity_days'])
+            profiles = []
+            for user_id in member_ids:
+                if rng.random() < config['profile_ratio']:
+                    joined = first_joined + timedelta(days=rng.randrange(config['activity_days'] + 1))
+                    profiles.append((user_id, GUILD_ID, popularity[_pick(rng, club_weights)], f'{joined} 12:00:00'))
+            cursor.executemany('''
+                INSERT INTO user_profiles (user_id, guild_id, club_id, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', profiles)
+            counts['user_profiles'] = len(profiles)
+
+            experts = set()
+            for user_id in member_ids:
+                if rng.random() < config['expert_ratio']:
+                    for _ in range(rng.randint(1, 10)):
+                        experts.add((user_id, GUILD_ID, popularity[_pick(rng, club_weights)]))
+            cursor.executemany('INSERT INTO expert_clubs (user_id, guild_id, club_id) VALUES (?, ?, ?)', sorted(experts))
+            counts['expert_clubs'] = len(experts)
+
+            tag_weights = _zipf_weights(len(_TAGS), config['skew'])
+            tags = []
+            for user_id in member_ids:
+                chosen = {_TAGS[_pick(rng, tag_weights)] for _ in range(rng.randint(0, 2 * config['tags_per_user']))}
+                tags.extend((user_id, tag) for tag in sorted(chosen))
+            cursor.executemany('INSERT INTO tags (user_id, tag) VALUES (?, ?)', tags)
+            counts['tags'] = len(tags)
+
+            # A member's share of active days falls off with their activity rank
+            activity_weights = [1 / (rank ** config['skew']) for rank in range(1, len(member_ids) + 1)]
+            scale = config['active_day_rate'] * len(member_ids) / sum(activity_weights)
+            days = [(date.today() - timedelta(days=offset)).isoformat() for offset in range(config['activity_days'])]
+            active_order = list(member_ids)
+            rng.shuffle(active_order)
+            counts['activity'] = 0
+            batch = []
+            for user_id, weight in zip(active_order, activity_weights):
+                rate = min(1.0, weight * scale)
+                active_days = min(len(days), int(rate * len(days) + rng.random()))
+                for day in rng.sample(days, active_days):
+                    batch.append((user_id, day, rng.randint(1, 30)))
+                if len(batch) >= 50000:
+                    cursor.executemany('INSERT INTO activity (user_id, date, hits) VALUES (?, ?, ?)', batch)
+                    counts['activity'] += len(batch)
+                    batch = []
+            cursor.executemany('INSERT INTO activity (user_id, date, hits) VALUES (?, ?, ?)', batch)
+            counts['activity'] += len(batch)
+
+        db.rebuild_user_levels()
+    finally:
+        db.close()
+
+    members = [{
+        'id': user_id,
+        'name': f'hopper{index}',
+        'bot': False,
+        'apprentice': rng.random() < config['apprentice_ratio'],
+    } for index, user_id in enumerate(member_ids)]
+    members.extend({'id': 10 ** 16 + index, 'name': f'bot{index}', 'bot': True, 'apprentice': False}
+                   for index in range(config['bot_members']))
+    with open(members_path(path), 'w', encoding='utf-8') as f:
+        json.dump({
+            'guild_id': GUILD_ID,
+            'guild_name': GUILD_NAME,
+            'apprentice_role_id': APPRENTICE_ROLE_ID,
+            'members': members,
+        }, f)
+    counts['members'] = len(members)
+
+    return {'options': dict(config, preset=preset), 'counts': counts, 'seconds': time.monotonic() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Hopper Bot database and guild member list.')
+    parser.add_argument('path', help='Database file to create (replaced if it exists)')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    for name, value in {**DEFAULTS, **PRESETS['small']}.items():
+        parser.add_argument(f'--{name.replace("_", "-")}', dest=name, type=type(value), default=None)
+    args = vars(parser.parse_args())
+    path = args.pop('path')
+    preset = args.pop('preset')
+    result = generate(path, preset, **{name: value for name, value in args.items() if value is not None})
+
+    print(f'Generated {path} ({preset}) in {result["seconds"]:.1f}s:')
+    for table, count in result['counts'].items():
+        print(f'  {table}: {count}')
+    print(f'Member list: {members_path(path)}')
+
+
+if __name__ == '__main__':
+    main()
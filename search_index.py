@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Resident search index for slash command autocomplete.
+
+Countries, leagues, clubs and tags are kept in memory and updated from
+HopperDatabase change events, so autocomplete never touches SQLite.
+Each search scope (e.g. "clubs of Germany") keeps its normalized names
+joined into one string; a query is a handful of str.find calls over it.
+"""
+import heapq
+import re
+import threading
+from bisect import bisect_right
+from collections import Counter
+
+from unidecode import unidecode
+
+
+def normalize_text(text):
+    """Returns the search form of a name: ASCII transliteration, case-folded."""
+    return unidecode(text or '').casefold()
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a name, for fuzzy matching.
+
+    Punctuation is dropped and words are padded with spaces, so word starts
+    and ends carry their own trigrams ("bvb" -> " bv", "bvb", "vb ").
+    """
+    words = re.sub(r'[^a-z0-9]+', ' ', normalize_text(text)).strip()
+    if not words:
+        return set()
+    padded = f' {words} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Scope:
+    """A searchable list of names in a fixed display order."""
+
+    def __init__(self, entries):
+        """Args:
+            entries: Iterable of (sort_key, name)
+        """
+        self.items = sorted(set(entries))
+        keys = [normalize_text(name) for _, name in self.items]
+        self.starts = []
+        position = 1
+        for key in keys:
+            self.starts.append(position)
+            position += len(key) + 1
+        # Separators keep matches from spanning two names
+        self.blob = '\n' + '\n'.join(keys) + '\n'
+
+    def search(self, query, limit):
+        """Returns up to `limit` (rank, sort_key, name) tuples; prefix matches rank first.
+
+        Args:
+            query: Normalized query text
+            limit: Maximum number of results
+        """
+        if not query:
+            return [(0, sort_key, name) for sort_key, name in self.items[:limit]]
+
+        prefix = []
+        other = []
+        seen = set()
+        position = self.blob.find(query)
+        while position != -1:
+            index = bisect_right(self.starts, position) - 1
+            if index not in seen:
+                seen.add(index)
+                if position == self.starts[index]:
+                    prefix.append(index)
+                elif len(other) < limit:
+                    other.append(index)
+            if len(prefix) >= limit:
+                break
+            position = self.blob.find(query, position + 1)
+
+        ranked = [(0, index) for index in prefix] + [(1, index) for index in other]
+        ranked.sort()
+        return [(rank, *self.items[index]) for rank, index in ranked[:limit]]
+
+
+class AutocompleteIndex:
+    """In-memory index for country, league, club and tag autocomplete.
+
+    Load it once with load() and register handle_event() as a
+    HopperDatabase listener. Scopes are rebuilt lazily after a change;
+    queries in between only read prebuilt scopes. A renamed or moved club
+    only rebuilds the club scopes of its old and new country and league.
+
+    Args:
+        extra_countries: Countries that are always offered, even without leagues
+    """
+
+    def __init__(self, extra_countries=()):
+        self.extra_countries = set(extra_countries)
+        self._lock = threading.Lock()
+        self._leagues = {}  # league_id -> (name, country, tier)
+        self._clubs = {}  # club_id -> (name, league_id)
+        self._tags = Counter()  # tag -> number of users
+        self._scopes = None
+        self._dirty_clubs = set()  # (country, league name) whose club scopes are out of date
+
+    def load(self, data):
+        """Replaces the index content.
+
+        Args:
+            data: Dict from HopperDatabase.get_search_index_data()
+        """
+        with self._lock:
+            self._leagues = {row[0]: (row[1], row[2], row[3]) for row in data['leagues']}
+            self._clubs = {row[0]: (row[1], row[2]) for row in data['clubs']}
+            self._tags = Counter(dict(data['tags']))
+            self._scopes = None
+
+    def handle_event(self, event, data):
+        """HopperDatabase listener: applies a committed change to the index."""
+        with self._lock:
+            if event == 'league':
+                tier = data['tier'] if data['tier'] is not None else 99
+                self._leagues[data['league_id']] = (data['name'], data['country'], tier)
+            elif event == 'club':
+                old = self._clubs.get(data['club_id'])
+                if 'name' not in data and ('league_id' not in data or old is None):
+                    return  # logo, color, tickets or stadium, or a club the index cannot name
+                name, league_id = old or (None, None)
+                new = (data.get('name', name), data.get('league_id', league_id))
+                if new == old:
+                    return
+                self._clubs[data['club_id']] = new
+                if self._scopes is not None:
+                    self._dirty_clubs.update(self._club_scope_key(entry[1]) for entry in (old, new) if entry)
+                return
+            elif event == 'tags':
+                self._tags.subtract(data['old'])
+                self._tags.update(data['new'])
+                self._tags = +self._tags  # drop tags nobody uses anymore
+            else:
+                return
+            self._scopes = None
+
+    def _get_scopes(self):
+        with self._lock:
+            if self._scopes is None:
+                self._scopes = self._build_scopes()
+                self._dirty_clubs.clear()
+            elif self._dirty_clubs:
+                self._rebuild_club_scopes(self._dirty_clubs)
+                self._dirty_clubs.clear()
+            return self._scopes
+
+    def _club_scope_key(self, league_id):
+        # Clubs without a league are offered in every country (scope key None)
+        league_name, country, _ = self._leagues.get(league_id, (None, None, None))
+        return country, league_name
+
+    def _club_entries(self, keys=None):
+        """Returns the club scope entries by country and by (country, league).
+
+        Args:
+            keys: Set of (country, league name) to collect, or None for all clubs
+        """
+        countries = None if keys is None else {country for country, _ in keys}
+        clubs_by_country = {}
+        clubs_by_league = {}
+        for name, league_id in self._clubs.values():
+            key = self._club_scope_key(league_id)
+            if countries is None or key[0] in countries:
+                clubs_by_country.setdefault(key[0], []).append((name, name))
+            if keys is None or key in keys:
+                clubs_by_league.setdefault(key, []).append((name, name))
+        return clubs_by_country, clubs_by_league
+
+    def _rebuild_club_scopes(self, keys):
+        clubs_by_country, clubs_by_league = self._club_entries(keys)
+        for country in {country for country, _ in keys}:
+            if country in clubs_by_country:
+                self._scopes['clubs'][country] = _Scope(clubs_by_country[country])
+            else:
+                self._scopes['clubs'].pop(country, None)
+        for key in keys:
+            if key in clubs_by_league:
+                self._scopes['clubs_by_league'][key] = _Scope(clubs_by_league[key])
+            else:
+                self._scopes['clubs_by_league'].pop(key, None)
+
+    def _build_scopes(self):
+        countries = set(self.extra_countries)
+        leagues = {}
+        for name, country, tier in self._leagues.values():
+            countries.add(country)
+            leagues.setdefault(country, []).append(((tier if tier is not None else 99, name), name))
+
+        clubs_by_country, clubs_by_league = self._club_entries()
+
+        return {
+            'countries': _Scope((country, country) for country in countries),
+            'leagues': {country: _Scope(entries) for country, entries in leagues.items()},
+            'clubs': {country: _Scope(entries) for country, entries in clubs_by_country.items()},
+            'clubs_by_league': {key: _Scope(entries) for key, entries in clubs_by_league.items()},
+            'tags': _Scope((tag, tag) for tag in self._tags),
+        }
+
+    @staticmethod
+    def _search(scopes, current, limit):
+        query = normalize_text(current)
+        results = heapq.merge(*(scope.search(query, limit) for scope in scopes if scope))
+        names = []
+        for _, _, name in results:
+            if name not in names:
+                names.append(name)
+                if len(names) >= limit:
+                    break
+        return names
+
+    def countries(self, current='', limit=25):
+        """Returns country names matching `current`."""
+        return self._search([self._get_scopes()['countries']], current, limit)
+
+    def leagues(self, country, current='', limit=25):
+        """Returns the leagues of a country matching `current`, ordered by tier."""
+        return self._search([self._get_scopes()['leagues'].get(country)], current, limit)
+
+    def clubs(self, country, league=None, current='', limit=25):
+        """Returns clubs of a country (and league) matching `current`.
+
+        Clubs without a league are included, like get_clubs_by_country does.
+        """
+        scopes = self._get_scopes()
+        if league:
+            candidates = [scopes['clubs_by_league'].get((country, league)),
+                          scopes['clubs_by_league'].get((None, None))]
+        else:
+            candidates = [scopes['clubs'].get(country), scopes['clubs'].get(None)]
+        return self._search(candidates, current, limit)
+
+    def tags(self, current='', limit=25):
+        """Returns tags in use matching `current`."""
+        return self._search([self._get_scopes()['tags']], current, limit)
@@ -0,0 +1,50 @@
+"""Query plan regression tests: hot HopperDatabase queries must not scan whole tables.
+
+Each entry of perf/query_plans.HOT_CALLS is one test case per database:
+
+- medium: the medium synthetic preset without statistics, as the bot runs it
+- medium-analyzed: the same after ANALYZE, so the planner costs by real row counts
+- huge-analyzed: the huge preset after ANALYZE; slow, runs only with HOPPER_SLOW_TESTS=1
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'perf'))
+
+import query_plans  # noqa: E402
+import synthetic  # noqa: E402
+from database import HopperDatabase  # noqa: E402
+
+SLOW = pytest.mark.skipif(not os.environ.get('HOPPER_SLOW_TESTS'),
+                          reason='slow; set HOPPER_SLOW_TESTS=1 to run')
+
+DATABASES = [
+    pytest.param(('medium', False), id='medium'),
+    pytest.param(('medium', True), id='medium-analyzed'),
+    pytest.param(('huge', True), id='huge-analyzed', marks=SLOW),
+]
+
+
+@pytest.fixture(scope='module', params=DATABASES)
+def checker(request, tmp_path_factory):
+    preset, analyze = request.param
+    path = str(tmp_path_factory.mktemp('query_plans') / f'{preset}.db')
+    synthetic.generate(path, preset, seed=1)
+    if analyze:
+        query_plans.analyze(path)
+    db = HopperDatabase(path)
+    plan_checker = query_plans.PlanChecker(db)
+    yield plan_checker
+    plan_checker.close()
+    db.close()
+
+
+@pytest.mark.parametrize('call, allowed', [(call, allowed) for _, call, allowed in query_plans.HOT_CALLS],
+                         ids=[label for label, _, _ in query_plans.HOT_CALLS])
+def test_query_plan_uses_indexes(checker, call, allowed):
+    problems, _ = checker.run(call, allowed)
+    assert not problems, 'Full table scan:\n' + query_plans.format_plans(problems)